@@ -5,3 +5,6 @@ class AbsenceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.absence"
     verbose_name = "Quản lý Vắng mặt"
+
+    def ready(self):
+        import apps.absence.signals
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.absence.sla import process_due_steps, schedule_unscheduled_steps
+
+
+class Command(BaseCommand):
+    help = "Nhắc nhở và chuyển cấp các bước phê duyệt đơn vắng mặt đã đến hạn"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Số bước xử lý mỗi lô",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Chạy liên tục như daemon thay vì chạy một lần",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=300,
+            help="Số giây nghỉ giữa các lần quét khi dùng --loop",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        # Bước chờ duyệt có từ trước khi có SLA
+        scheduled = schedule_unscheduled_steps()
+        if scheduled:
+            self.stdout.write(f"Đã lên lịch SLA cho {scheduled} bước chưa có hạn")
+
+        while True:
+            stats = process_due_steps(batch_size=options["batch_size"])
+            self.stdout.write(
+                f"Đã nhắc nhở {stats['reminded']}, chuyển cấp {stats['escalated']}, "
+                f"quá hạn ở bước cuối {stats['stalled']}"
+            )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
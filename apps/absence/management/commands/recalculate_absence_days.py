@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.absence.models import AbsenceRequest
+from apps.absence.working_days import absence_days, parse_work_schedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Tính lại total_days của các đơn vắng mặt theo lịch ngày làm việc "
+        "(lịch làm việc của nhân viên và bảng ngày lễ)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="append",
+            dest="statuses",
+            help="Chỉ tính lại đơn ở trạng thái này (có thể lặp lại)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số đơn xử lý mỗi lô",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Chỉ thống kê số đơn thay đổi, không ghi DB",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        requests = AbsenceRequest.objects.all()
+        if options["statuses"]:
+            requests = requests.filter(status__in=options["statuses"])
+        requests = requests.only(
+            "id",
+            "start_date",
+            "end_date",
+            "start_time",
+            "end_time",
+            "total_days",
+            "user__work_schedule",
+        ).select_related("user")
+
+        masks = {}
+        checked = changed = 0
+        last_pk = 0
+        while True:
+            batch = list(requests.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            updates = []
+            for absence_request in batch:
+                schedule = absence_request.user.work_schedule
+                if schedule not in masks:
+                    masks[schedule] = parse_work_schedule(schedule)
+                total_days = Decimal(
+                    str(
+                        absence_days(
+                            absence_request.start_date,
+                            absence_request.end_date,
+                            absence_request.start_time,
+                            absence_request.end_time,
+                            mask=masks[schedule],
+                        )
+                    )
+                )
+                if total_days != absence_request.total_days:
+                    absence_request.total_days = total_days
+                    updates.append(absence_request)
+
+            checked += len(batch)
+            changed += len(updates)
+            if updates and not options["dry_run"]:
+                AbsenceRequest.objects.bulk_update(updates, ["total_days"])
+
+        action = "Sẽ cập nhật" if options["dry_run"] else "Đã cập nhật"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {changed}/{checked} đơn vắng mặt")
+        )
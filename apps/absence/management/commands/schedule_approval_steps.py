@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.absence.sla import schedule_unscheduled_steps
+
+
+class Command(BaseCommand):
+    help = "Tính hạn SLA cho các bước phê duyệt đang chờ nhưng chưa có hạn"
+
+    def handle(self, *args, **options):
+        scheduled = schedule_unscheduled_steps()
+        self.stdout.write(self.style.SUCCESS(f"Đã lên lịch {scheduled} bước"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("absence", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="absencerequest",
+            index=models.Index(
+                fields=["status", "user", "start_date"],
+                name="absence_abs_status_9fd629_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,143 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_steps_for_pending_requests(apps, schema_editor):
+    """Đơn đang chờ duyệt trước đây: tạo một bước cho người phê duyệt hiện tại"""
+    AbsenceRequest = apps.get_model("absence", "AbsenceRequest")
+    ApprovalStep = apps.get_model("absence", "ApprovalStep")
+
+    pending = AbsenceRequest.objects.filter(
+        status="pending", current_approver__isnull=False, current_step__isnull=True
+    )
+    for absence_request in pending.iterator():
+        step = ApprovalStep.objects.create(
+            absence_request=absence_request,
+            order=1,
+            approver_id=absence_request.current_approver_id,
+            level=absence_request.approval_level,
+            status="pending",
+        )
+        AbsenceRequest.objects.filter(pk=absence_request.pk).update(current_step=step)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("absence", "0002_absencerequest_availability_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApprovalStep",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "order",
+                    models.PositiveSmallIntegerField(
+                        help_text="Thứ tự trong chuỗi (từ 1)"
+                    ),
+                ),
+                ("level", models.CharField(help_text="Cấp phê duyệt", max_length=50)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("waiting", "Chưa đến lượt"),
+                            ("pending", "Chờ duyệt"),
+                            ("approved", "Đã duyệt"),
+                            ("rejected", "Từ chối"),
+                            ("skipped", "Bỏ qua"),
+                        ],
+                        default="waiting",
+                        help_text="Trạng thái bước",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "due_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Hạn phê duyệt (khi đang chờ duyệt)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "acted_at",
+                    models.DateTimeField(
+                        blank=True, help_text="Thời gian xử lý", null=True
+                    ),
+                ),
+                ("comment", models.TextField(blank=True, help_text="Ghi chú")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "absence_request",
+                    models.ForeignKey(
+                        help_text="Đơn vắng mặt",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="approval_steps",
+                        to="absence.absencerequest",
+                    ),
+                ),
+                (
+                    "approver",
+                    models.ForeignKey(
+                        help_text="Người phê duyệt",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="approval_steps",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Bước phê duyệt",
+                "verbose_name_plural": "Bước phê duyệt",
+                "ordering": ["absence_request", "order"],
+            },
+        ),
+        migrations.AddField(
+            model_name="absencerequest",
+            name="current_step",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Bước phê duyệt đang chờ xử lý",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="absence.approvalstep",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="approvalstep",
+            index=models.Index(
+                fields=["approver", "status"], name="absence_app_approve_21aa63_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="approvalstep",
+            index=models.Index(
+                fields=["status", "due_at"], name="absence_app_status_899816_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="approvalstep",
+            constraint=models.UniqueConstraint(
+                fields=("absence_request", "order"), name="uniq_approval_step_order"
+            ),
+        ),
+        migrations.RunPython(
+            create_steps_for_pending_requests, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("absence", "0003_approval_steps"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="approvalstep",
+            name="absence_app_status_899816_idx",
+        ),
+        migrations.AddField(
+            model_name="approvalstep",
+            name="next_action_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Thời điểm scheduler cần nhắc nhở hoặc chuyển cấp tiếp theo",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="approvalstep",
+            name="reminder_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Số lần đã nhắc nhở"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="approvalstep",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("waiting", "Chưa đến lượt"),
+                    ("pending", "Chờ duyệt"),
+                    ("approved", "Đã duyệt"),
+                    ("rejected", "Từ chối"),
+                    ("skipped", "Bỏ qua"),
+                    ("escalated", "Quá hạn, đã chuyển cấp"),
+                ],
+                default="waiting",
+                help_text="Trạng thái bước",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="approvalstep",
+            index=models.Index(
+                fields=["status", "next_action_at"],
+                name="absence_app_status_ac221d_idx",
+            ),
+        ),
+    ]
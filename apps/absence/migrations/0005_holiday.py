@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("absence", "0004_approval_step_sla"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Holiday",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(help_text="Ngày", unique=True)),
+                ("name", models.CharField(help_text="Tên ngày lễ", max_length=200)),
+                (
+                    "is_working_day",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Ngày làm bù (đi làm dù là ngày nghỉ theo lịch làm việc)",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ngày lễ",
+                "verbose_name_plural": "Ngày lễ",
+                "ordering": ["date"],
+            },
+        ),
+    ]
@@ -104,6 +104,17 @@ class ApprovalWorkflow(models.Model):
     def __str__(self):
         return f"{self.department.full_name} - {self.absence_type.name}"
 
+    def get_timeout_hours(self, level):
+        """Số giờ timeout cho một cấp phê duyệt"""
+        timeout_map = {
+            "department_manager": self.department_manager_timeout_hours,
+            "department_deputy": self.department_deputy_timeout_hours,
+            "office_director": self.office_director_timeout_hours,
+            "office_deputy": self.office_deputy_timeout_hours,
+            "hr": self.hr_timeout_hours,
+        }
+        return timeout_map.get(level)
+
 
 class AbsenceRequest(models.Model):
     """Đơn xin vắng mặt"""
@@ -151,6 +162,14 @@ class AbsenceRequest(models.Model):
     approval_level = models.CharField(
         max_length=50, default="department_manager", help_text="Cấp phê duyệt hiện tại"
     )
+    current_step = models.ForeignKey(
+        "ApprovalStep",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Bước phê duyệt đang chờ xử lý",
+    )
 
     # Phê duyệt cuối cùng
     status = models.CharField(
@@ -176,6 +195,10 @@ class AbsenceRequest(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Đơn vắng mặt"
         verbose_name_plural = "Đơn vắng mặt"
+        indexes = [
+            # Kiểm tra vắng mặt của người phê duyệt (giao khoảng ngày)
+            models.Index(fields=["status", "user", "start_date"]),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.absence_type.name} ({self.start_date} - {self.end_date})"
@@ -207,14 +230,85 @@ class AbsenceRequest(models.Model):
 
     def _get_timeout_hours(self):
         """Lấy số giờ timeout cho cấp phê duyệt hiện tại"""
-        timeout_map = {
-            "department_manager": self.workflow.department_manager_timeout_hours,
-            "department_deputy": self.workflow.department_deputy_timeout_hours,
-            "office_director": self.workflow.office_director_timeout_hours,
-            "office_deputy": self.workflow.office_deputy_timeout_hours,
-            "hr": self.workflow.hr_timeout_hours,
-        }
-        return timeout_map.get(self.approval_level)
+        return self.workflow.get_timeout_hours(self.approval_level)
+
+
+class ApprovalStep(models.Model):
+    """
+    Một bước trong chuỗi phê duyệt của đơn vắng mặt
+
+    Chuỗi được xác định một lần khi tạo đơn; mỗi lần phê duyệt chỉ chuyển
+    AbsenceRequest.current_step sang bước có order kế tiếp.
+    """
+
+    STATUS_WAITING = "waiting"
+    STATUS_PENDING = "pending"
+    STATUS_APPROVED = "approved"
+    STATUS_REJECTED = "rejected"
+    STATUS_SKIPPED = "skipped"
+    STATUS_ESCALATED = "escalated"
+    STATUS_CHOICES = [
+        (STATUS_WAITING, "Chưa đến lượt"),
+        (STATUS_PENDING, "Chờ duyệt"),
+        (STATUS_APPROVED, "Đã duyệt"),
+        (STATUS_REJECTED, "Từ chối"),
+        (STATUS_SKIPPED, "Bỏ qua"),
+        (STATUS_ESCALATED, "Quá hạn, đã chuyển cấp"),
+    ]
+
+    absence_request = models.ForeignKey(
+        AbsenceRequest,
+        on_delete=models.CASCADE,
+        related_name="approval_steps",
+        help_text="Đơn vắng mặt",
+    )
+    order = models.PositiveSmallIntegerField(help_text="Thứ tự trong chuỗi (từ 1)")
+    approver = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="approval_steps",
+        help_text="Người phê duyệt",
+    )
+    level = models.CharField(max_length=50, help_text="Cấp phê duyệt")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_WAITING,
+        help_text="Trạng thái bước",
+    )
+    due_at = models.DateTimeField(
+        null=True, blank=True, help_text="Hạn phê duyệt (khi đang chờ duyệt)"
+    )
+    next_action_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Thời điểm scheduler cần nhắc nhở hoặc chuyển cấp tiếp theo",
+    )
+    reminder_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Số lần đã nhắc nhở"
+    )
+    acted_at = models.DateTimeField(null=True, blank=True, help_text="Thời gian xử lý")
+    comment = models.TextField(blank=True, help_text="Ghi chú")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["absence_request", "order"]
+        verbose_name = "Bước phê duyệt"
+        verbose_name_plural = "Bước phê duyệt"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["absence_request", "order"], name="uniq_approval_step_order"
+            )
+        ]
+        indexes = [
+            # Hộp thư "chờ tôi duyệt"
+            models.Index(fields=["approver", "status"]),
+            # Scheduler SLA chỉ lấy các bước đã đến hạn
+            models.Index(fields=["status", "next_action_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.absence_request_id} #{self.order} {self.level} - {self.status}"
 
 
 class ApprovalHistory(models.Model):
@@ -246,3 +340,22 @@ class ApprovalHistory(models.Model):
 
     def __str__(self):
         return f"{self.approver.get_full_name()} - {self.get_action_display()} - {self.absence_request}"
+
+
+class Holiday(models.Model):
+    """Ngày nghỉ lễ / ngày làm bù (dùng khi tính số ngày làm việc)"""
+
+    date = models.DateField(unique=True, help_text="Ngày")
+    name = models.CharField(max_length=200, help_text="Tên ngày lễ")
+    is_working_day = models.BooleanField(
+        default=False,
+        help_text="Ngày làm bù (đi làm dù là ngày nghỉ theo lịch làm việc)",
+    )
+
+    class Meta:
+        ordering = ["date"]
+        verbose_name = "Ngày lễ"
+        verbose_name_plural = "Ngày lễ"
+
+    def __str__(self):
+        return f"{self.date:%d/%m/%Y} - {self.name}"
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Holiday
+from .working_days import invalidate_calendars
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def invalidate_working_day_calendars(sender, **kwargs):
+    """Dựng lại lịch ngày làm việc khi ngày lễ thay đổi"""
+    invalidate_calendars()
+    transaction.on_commit(invalidate_calendars)
@@ -0,0 +1,180 @@
+"""
+Scheduler SLA cho các bước phê duyệt đơn vắng mặt
+
+Mỗi bước đang chờ duyệt có next_action_at: thời điểm cần nhắc nhở hoặc chuyển
+cấp tiếp theo. Scheduler chỉ truy vấn các bước có next_action_at đã qua (index
+status/next_action_at), nên mỗi lần chạy chỉ chạm tới các dòng thực sự đến hạn.
+
+Vòng đời một bước (timeout 24h, nhắc trước 2h, tối đa 3 lần):
+nhắc lần 1 ở giờ 22, lần 2 ở giờ 24 (hạn), lần 3 ở giờ 26, chuyển cấp ở giờ 28.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications.services import NotificationService
+
+from .models import ApprovalStep
+
+logger = logging.getLogger(__name__)
+
+
+def _reminder_interval(workflow):
+    return timedelta(hours=max(1, workflow.send_reminder_before_hours))
+
+
+def schedule_step(step, workflow, now=None):
+    """Tính due_at và next_action_at khi một bước bắt đầu chờ duyệt"""
+    now = now or timezone.now()
+    timeout_hours = workflow.get_timeout_hours(step.level)
+
+    step.reminder_count = 0
+    if not timeout_hours:
+        step.due_at = None
+        step.next_action_at = None
+        return step
+
+    step.due_at = now + timedelta(hours=timeout_hours)
+    if workflow.max_reminders > 0:
+        remind_at = step.due_at - timedelta(hours=workflow.send_reminder_before_hours)
+        step.next_action_at = max(now, remind_at)
+    else:
+        step.next_action_at = step.due_at
+    return step
+
+
+def schedule_unscheduled_steps(batch_size=500):
+    """
+    Tính hạn cho các bước đang chờ duyệt chưa từng được lên lịch SLA
+
+    Bước tạo bởi migration 0003 (đơn chờ duyệt trước khi có SLA) không có
+    due_at/next_action_at nên scheduler không bao giờ thấy. Đồng hồ SLA của
+    chúng tính từ lúc bước được tạo.
+
+    Returns:
+        int: số bước đã được lên lịch
+    """
+    unscheduled = ApprovalStep.objects.filter(
+        status=ApprovalStep.STATUS_PENDING,
+        due_at__isnull=True,
+        next_action_at__isnull=True,
+    ).select_related("absence_request__workflow")
+
+    scheduled = 0
+    last_pk = 0
+    while True:
+        steps = list(unscheduled.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not steps:
+            break
+        last_pk = steps[-1].pk
+        changed = []
+        for step in steps:
+            schedule_step(step, step.absence_request.workflow, step.created_at)
+            # Cấp không có timeout thì không cần theo dõi
+            if step.due_at:
+                changed.append(step)
+        ApprovalStep.objects.bulk_update(
+            changed, ["due_at", "next_action_at", "reminder_count"]
+        )
+        scheduled += len(changed)
+    return scheduled
+
+
+def process_due_steps(now=None, batch_size=200):
+    """
+    Nhắc nhở hoặc chuyển cấp cho các bước đã đến hạn
+
+    Returns:
+        dict: số lần nhắc nhở, số bước đã chuyển cấp, số bước dừng theo dõi
+    """
+    now = now or timezone.now()
+    stats = {"reminded": 0, "escalated": 0, "stalled": 0}
+    # Bước vừa được kích hoạt do chuyển cấp sẽ được xét ở lần chạy sau
+    activated = set()
+
+    while True:
+        with transaction.atomic():
+            steps = list(
+                ApprovalStep.objects.select_for_update(skip_locked=True, of=("self",))
+                .filter(status=ApprovalStep.STATUS_PENDING, next_action_at__lte=now)
+                .exclude(pk__in=activated)
+                .select_related(
+                    "approver",
+                    "absence_request__user",
+                    "absence_request__workflow",
+                )
+                .order_by("next_action_at")[:batch_size]
+            )
+            if not steps:
+                break
+
+            reminders = []
+            to_escalate = []
+            for step in steps:
+                workflow = step.absence_request.workflow
+                if step.reminder_count < workflow.max_reminders:
+                    step.reminder_count += 1
+                    step.next_action_at = (
+                        step.due_at
+                        if now < step.due_at
+                        else now + _reminder_interval(workflow)
+                    )
+                    reminders.append(
+                        (step.absence_request, step.approver, step.reminder_count)
+                    )
+                elif now < step.due_at:
+                    step.next_action_at = step.due_at
+                else:
+                    to_escalate.append(step)
+
+            ApprovalStep.objects.bulk_update(
+                steps, ["reminder_count", "next_action_at"]
+            )
+            if reminders:
+                NotificationService.send_reminder_notifications(reminders)
+                stats["reminded"] += len(reminders)
+
+            for step in to_escalate:
+                next_step = escalate_step(step, now)
+                if next_step:
+                    activated.add(next_step.pk)
+                    stats["escalated"] += 1
+                else:
+                    stats["stalled"] += 1
+
+    return stats
+
+
+def escalate_step(step, now=None):
+    """
+    Bỏ qua người phê duyệt quá hạn và chuyển đơn sang bước kế tiếp
+
+    Returns:
+        ApprovalStep: bước mới được kích hoạt, None nếu đây là bước cuối
+        (bước vẫn chờ duyệt nhưng ngừng theo dõi)
+    """
+    from .workflow_engine import WorkflowEngine
+
+    now = now or timezone.now()
+    absence_request = step.absence_request
+    next_step = ApprovalStep.objects.filter(
+        absence_request=absence_request, order=step.order + 1
+    ).first()
+
+    if next_step is None:
+        ApprovalStep.objects.filter(pk=step.pk).update(next_action_at=None)
+        logger.warning(
+            "Absence request %s is overdue at the last approval step",
+            absence_request.pk,
+        )
+        return None
+
+    step.status = ApprovalStep.STATUS_ESCALATED
+    step.acted_at = now
+    step.next_action_at = None
+    step.save(update_fields=["status", "acted_at", "next_action_at"])
+    WorkflowEngine._activate_step(absence_request, next_step, now)
+    return next_step
@@ -1,3 +1,334 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.users.models import Department, Office
+
+from .models import AbsenceRequest, AbsenceType, ApprovalWorkflow
+from .workflow_engine import WorkflowEngine
+
+User = get_user_model()
+
+
+class ApproverAvailabilityTest(TestCase):
+    """Test cases for resolving available approvers"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(username="manager")
+        self.director = User.objects.create_user(username="director")
+        self.deputy_director = User.objects.create_user(username="deputy")
+        self.office = Office.objects.create(
+            name="Hà Nội",
+            director=self.director,
+            deputy_director=self.deputy_director,
+        )
+        self.department = Department.objects.create(
+            name="Kinh doanh", office=self.office, manager=self.manager
+        )
+        self.employee = User.objects.create_user(
+            username="employee", department=self.department
+        )
+        self.absence_type = AbsenceType.objects.create(name="Nghỉ phép", code="AL")
+        self.workflow = ApprovalWorkflow.objects.create(
+            department=self.department,
+            absence_type=self.absence_type,
+            requires_department_manager=True,
+            requires_office_director=True,
+            requires_office_deputy=True,
+            requires_hr_approval=True,
+        )
+        self.request = self._absence(self.employee, status="pending")
+
+    def _absence(self, user, status="approved"):
+        return AbsenceRequest.objects.create(
+            user=user,
+            absence_type=self.absence_type,
+            workflow=self.workflow,
+            start_date=date(2024, 5, 6),
+            end_date=date(2024, 5, 8),
+            total_days=3,
+            reason="Việc riêng",
+            status=status,
+        )
+
+    def _add_hr_users(self, count):
+        for _ in range(count):
+            User.objects.create_user(username=f"hr{User.objects.count()}", role="hr")
+
+    def _count_queries(self):
+        absence_request = AbsenceRequest.objects.get(pk=self.request.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            approvers = WorkflowEngine.get_available_approvers(absence_request)
+        return len(ctx.captured_queries), approvers
+
+    def test_query_count_does_not_grow_with_hr_users(self):
+        """Availability of every candidate is resolved in one query"""
+        self._add_hr_users(1)
+        small_count, small = self._count_queries()
+
+        self._add_hr_users(5)
+        large_count, large = self._count_queries()
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len([a for a in large if a["level"] == "hr"]), 6)
+
+    def test_absent_approvers_are_skipped(self):
+        """Approved overlapping absences remove approvers from the list"""
+        self._absence(self.manager)
+        self._absence(self.director)
+
+        approvers = WorkflowEngine.get_available_approvers(self.request)
+        levels = [a["level"] for a in approvers]
+
+        self.assertNotIn("department_manager", levels)
+        self.assertNotIn("office_director", levels)
+        self.assertEqual(
+            WorkflowEngine.get_next_approver(self.request)["user"],
+            self.deputy_director,
+        )
+
+
+class ApprovalChainTest(TestCase):
+    """Test cases for the materialized approval chain"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.manager = User.objects.create_user(
+            username="manager", email="manager@example.com"
+        )
+        self.director = User.objects.create_user(username="director")
+        self.hr = User.objects.create_user(username="hr", role="hr")
+        User.objects.create_user(username="hr2", role="hr")
+        office = Office.objects.create(name="Hà Nội", director=self.director)
+        department = Department.objects.create(
+            name="Kinh doanh", office=office, manager=self.manager
+        )
+        self.employee = User.objects.create_user(
+            username="employee", department=department
+        )
+        self.absence_type = AbsenceType.objects.create(name="Nghỉ phép", code="AL")
+        ApprovalWorkflow.objects.create(
+            department=department,
+            absence_type=self.absence_type,
+            requires_department_manager=True,
+            requires_office_director=True,
+            requires_hr_approval=True,
+        )
+
+    def _create(self):
+        return WorkflowEngine.create_absence_request(
+            user=self.employee,
+            absence_type=self.absence_type,
+            start_date=date(2024, 5, 6),
+            end_date=date(2024, 5, 7),
+            reason="Việc riêng",
+        )
+
+    def test_chain_is_resolved_once_and_advanced(self):
+        """Each approval moves to the next stored step until completion"""
+        absence_request = self._create()
+
+        steps = list(absence_request.approval_steps.all())
+        self.assertEqual(
+            [(s.approver, s.level) for s in steps],
+            [
+                (self.manager, "department_manager"),
+                (self.director, "office_director"),
+                (self.hr, "hr"),
+            ],
+        )
+        self.assertEqual(absence_request.current_step, steps[0])
+        self.assertIsNotNone(steps[0].due_at)
+        self.assertEqual(
+            list(WorkflowEngine.get_pending_requests_for(self.manager)),
+            [absence_request],
+        )
+
+        for step in steps:
+            absence_request.refresh_from_db()
+            self.assertEqual(absence_request.current_approver, step.approver)
+            WorkflowEngine.process_approval(absence_request, step.approver, "approved")
+
+        absence_request.refresh_from_db()
+        self.assertEqual(absence_request.status, "approved")
+        self.assertIsNone(absence_request.current_step)
+        self.assertFalse(WorkflowEngine.get_pending_requests_for(self.hr).exists())
+
+    def test_rejection_skips_remaining_steps(self):
+        """Rejecting ends the chain and marks waiting steps as skipped"""
+        absence_request = self._create()
+
+        WorkflowEngine.process_approval(
+            absence_request, self.manager, "rejected", "Không đủ người"
+        )
+
+        statuses = list(absence_request.approval_steps.values_list("status", flat=True))
+        self.assertEqual(statuses, ["rejected", "skipped", "skipped"])
+        self.assertEqual(absence_request.status, "rejected")
+
+    def test_sla_reminds_then_escalates(self):
+        """Due steps get reminders, then move to the next approver"""
+        from datetime import timedelta
+
+        from django.core import mail
+
+        from apps.notifications.models import Notification
+        from apps.notifications.outbox import deliver_pending_emails
+
+        from .sla import process_due_steps
+
+        absence_request = self._create()
+        step = absence_request.current_step
+        start = step.due_at - timedelta(hours=24)
+        self.assertEqual(step.next_action_at, step.due_at - timedelta(hours=2))
+
+        # Chưa đến hạn nhắc: không chạm tới bước nào
+        self.assertEqual(
+            process_due_steps(now=start + timedelta(hours=21))["reminded"], 0
+        )
+
+        deliver_pending_emails()
+        mail.outbox = []
+        for hours in (22, 24, 26):
+            stats = process_due_steps(now=start + timedelta(hours=hours))
+            self.assertEqual(stats["reminded"], 1)
+        step.refresh_from_db()
+        self.assertEqual(step.reminder_count, 3)
+        self.assertEqual(
+            Notification.objects.filter(user=self.manager, type="reminder").count(), 3
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        deliver_pending_emails()
+        self.assertEqual(len(mail.outbox), 3)
+
+        stats = process_due_steps(now=start + timedelta(hours=28))
+        self.assertEqual(stats["escalated"], 1)
+        step.refresh_from_db()
+        absence_request.refresh_from_db()
+        self.assertEqual(step.status, "escalated")
+        self.assertEqual(absence_request.current_approver, self.director)
+
+    def test_legacy_pending_steps_get_scheduled(self):
+        """Pending steps created without SLA fields are picked up by the scheduler"""
+        from datetime import timedelta
+
+        from .models import ApprovalStep
+        from .sla import process_due_steps, schedule_unscheduled_steps
+
+        absence_request = self._create()
+        step = absence_request.current_step
+        ApprovalStep.objects.filter(pk=step.pk).update(due_at=None, next_action_at=None)
+
+        self.assertEqual(schedule_unscheduled_steps(), 1)
+        step.refresh_from_db()
+        self.assertEqual(step.due_at, step.created_at + timedelta(hours=24))
+        self.assertEqual(step.next_action_at, step.due_at - timedelta(hours=2))
+        self.assertEqual(schedule_unscheduled_steps(), 0)
+
+        stats = process_due_steps(now=step.next_action_at)
+        self.assertEqual(stats["reminded"], 1)
+
+
+class WorkingDayCalendarTest(TestCase):
+    """Test cases for the working-day calendar"""
+
+    def setUp(self):
+        """Rollback giữa các test không phát signal của Holiday"""
+        from .working_days import invalidate_calendars
+
+        invalidate_calendars()
+        self.addCleanup(invalidate_calendars)
+
+    def test_weekends_and_holidays_are_skipped(self):
+        """Counts only working days of the user's schedule"""
+        from .models import Holiday
+        from .working_days import parse_work_schedule, working_days_between
+
+        # 29/4/2024 (thứ Hai) -> 5/5/2024 (Chủ nhật)
+        start, end = date(2024, 4, 29), date(2024, 5, 5)
+        self.assertEqual(working_days_between(start, end), 5)
+        self.assertEqual(
+            working_days_between(start, end, parse_work_schedule("Thứ 2 - Thứ 7")), 6
+        )
+
+        Holiday.objects.create(date=date(2024, 4, 30), name="Giải phóng miền Nam")
+        Holiday.objects.create(date=date(2024, 5, 1), name="Quốc tế Lao động")
+        Holiday.objects.create(
+            date=date(2024, 5, 4), name="Làm bù", is_working_day=True
+        )
+        self.assertEqual(working_days_between(start, end), 4)
+
+        # Qua năm mới
+        self.assertEqual(working_days_between(date(2024, 12, 30), date(2025, 1, 3)), 5)
+
+    def test_parse_work_schedule(self):
+        """Free-text schedules become weekday masks"""
+        from .working_days import DEFAULT_WORK_WEEK, parse_work_schedule
+
+        self.assertEqual(parse_work_schedule(""), DEFAULT_WORK_WEEK)
+        self.assertEqual(parse_work_schedule("T2-T6"), DEFAULT_WORK_WEEK)
+        self.assertEqual(parse_work_schedule("Thứ Hai đến Thứ Sáu"), DEFAULT_WORK_WEEK)
+        self.assertEqual(parse_work_schedule("T2, T4, T6"), 0b0010101)
+        with self.assertLogs("apps.absence.working_days", "WARNING"):
+            self.assertEqual(parse_work_schedule("linh hoạt"), DEFAULT_WORK_WEEK)
+
+    def test_parse_numeric_day_ranges(self):
+        """'Thứ N' and 'T2-T6' forms are parsed, not left to the fallback"""
+        from .working_days import parse_work_schedule
+
+        mon_sat = 0b0111111
+        self.assertEqual(parse_work_schedule("Thứ 2-7"), mon_sat)
+        self.assertEqual(parse_work_schedule("Thứ 2 - Thứ 7"), mon_sat)
+        self.assertEqual(parse_work_schedule("Thứ 2 – Thứ 7"), mon_sat)
+        self.assertEqual(parse_work_schedule("thứ 2 đến 7"), mon_sat)
+        self.assertEqual(parse_work_schedule("T2-T7"), mon_sat)
+        self.assertEqual(parse_work_schedule("T2-7"), mon_sat)
+        self.assertEqual(parse_work_schedule("Thứ 2, 3, 4"), 0b0000111)
+        self.assertEqual(parse_work_schedule("Thứ 5"), 0b0001000)
+        self.assertEqual(parse_work_schedule("Thursday"), 0b0001000)
+
+    def test_ambiguous_schedule_logs_warning(self):
+        """A bare 'thu' is not Thursday; unknown text warns before the fallback"""
+        from .working_days import DEFAULT_WORK_WEEK, parse_work_schedule
+
+        for text in ("Thu", "6", "ca xoay"):
+            with self.assertLogs("apps.absence.working_days", "WARNING") as logs:
+                self.assertEqual(parse_work_schedule(text), DEFAULT_WORK_WEEK)
+            self.assertIn(repr(text), logs.output[0])
+
+    def test_total_days_and_recalculation(self):
+        """New requests use working days and the command fixes old ones"""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        user = User.objects.create_user(username="employee", work_schedule="T2-T6")
+        absence_type = AbsenceType.objects.create(name="Nghỉ phép", code="AL")
+
+        # Thứ Sáu -> thứ Hai
+        self.assertEqual(
+            WorkflowEngine._calculate_total_days(date(2024, 5, 3), date(2024, 5, 6)), 2
+        )
+        legacy = AbsenceRequest.objects.create(
+            user=user,
+            absence_type=absence_type,
+            workflow=ApprovalWorkflow.objects.create(
+                department=Department.objects.create(
+                    name="Kinh doanh", office=Office.objects.create(name="Hà Nội")
+                ),
+                absence_type=absence_type,
+            ),
+            start_date=date(2024, 5, 3),
+            end_date=date(2024, 5, 6),
+            total_days=4,
+            reason="Việc riêng",
+        )
+
+        call_command("recalculate_absence_days", stdout=StringIO())
 
-# Create your tests here.
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.total_days, 2)
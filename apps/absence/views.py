@@ -171,9 +171,9 @@ def absence_detail_view(request, absence_id):
 def approval_view(request):
     """Trang phê duyệt đơn vắng mặt"""
     # Lấy danh sách đơn cần phê duyệt
-    pending_requests = AbsenceRequest.objects.filter(
-        current_approver=request.user, status="pending"
-    ).order_by("-created_at")
+    pending_requests = WorkflowEngine.get_pending_requests_for(request.user).order_by(
+        "-created_at"
+    )
 
     # Pagination
     paginator = Paginator(pending_requests, 10)
@@ -1,10 +1,12 @@
-from django.db import models
+from django.db import transaction
 from django.utils import timezone
 
 from apps.notifications.models import Notification
 from apps.notifications.services import NotificationService
 
-from .models import AbsenceRequest, ApprovalHistory
+from .models import AbsenceRequest, ApprovalHistory, ApprovalStep
+from .sla import process_due_steps, schedule_step
+from .working_days import absence_days, parse_work_schedule
 
 
 class WorkflowEngine:
@@ -13,21 +15,57 @@ class WorkflowEngine:
     @staticmethod
     def get_next_approver(absence_request):
         """Lấy người phê duyệt tiếp theo"""
+        approvers = WorkflowEngine.get_available_approvers(absence_request)
+        return approvers[0] if approvers else None
+
+    @staticmethod
+    def get_available_approvers(absence_request):
+        """
+        Danh sách người phê duyệt đang có mặt, sắp xếp theo priority
+
+        Tình trạng vắng mặt của tất cả ứng viên (quản lý, phó phòng, giám đốc,
+        phó giám đốc, HR) được kiểm tra bằng một truy vấn duy nhất, nên số truy
+        vấn không phụ thuộc vào số lượng HR.
+        """
+        from apps.users.models import Department, User
+
         workflow = absence_request.workflow
-        department = absence_request.user.department
+        department = None
+        if absence_request.user.department_id:
+            department = Department.objects.select_related(
+                "manager",
+                "deputy_manager",
+                "office__director",
+                "office__deputy_director",
+            ).get(pk=absence_request.user.department_id)
         office = department.office if department else None
 
+        hr_users = []
+        if workflow.requires_hr_approval:
+            hr_users = list(User.objects.filter(role="hr", is_active=True))
+
+        # Tất cả ứng viên có thể được xét, kiểm tra vắng mặt một lần
+        candidates = hr_users[:]
+        if department:
+            candidates += [department.manager, department.deputy_manager]
+        if office:
+            candidates += [office.director, office.deputy_director]
+        absent_ids = WorkflowEngine._absent_user_ids(
+            [user.pk for user in candidates if user],
+            absence_request.start_date,
+            absence_request.end_date,
+        )
+
+        def is_available(user):
+            return user is not None and user.pk not in absent_ids
+
         # Kiểm tra từng cấp theo thứ tự ưu tiên
         approvers = []
 
         # 1. Department Manager/Deputy
         if workflow.requires_department_manager:
             if department and department.manager:
-                if not WorkflowEngine._is_absent(
-                    department.manager,
-                    absence_request.start_date,
-                    absence_request.end_date,
-                ):
+                if is_available(department.manager):
                     approvers.append(
                         {
                             "user": department.manager,
@@ -38,26 +76,19 @@ class WorkflowEngine:
             elif (
                 workflow.requires_department_deputy
                 and department
-                and department.deputy_manager
+                and is_available(department.deputy_manager)
             ):
-                if not WorkflowEngine._is_absent(
-                    department.deputy_manager,
-                    absence_request.start_date,
-                    absence_request.end_date,
-                ):
-                    approvers.append(
-                        {
-                            "user": department.deputy_manager,
-                            "level": "department_deputy",
-                            "priority": workflow.department_deputy_priority,
-                        }
-                    )
+                approvers.append(
+                    {
+                        "user": department.deputy_manager,
+                        "level": "department_deputy",
+                        "priority": workflow.department_deputy_priority,
+                    }
+                )
 
         # 2. Office Director/Deputy
         if workflow.requires_office_director and office:
-            if office.director and not WorkflowEngine._is_absent(
-                office.director, absence_request.start_date, absence_request.end_date
-            ):
+            if is_available(office.director):
                 approvers.append(
                     {
                         "user": office.director,
@@ -65,46 +96,104 @@ class WorkflowEngine:
                         "priority": workflow.office_director_priority,
                     }
                 )
-            elif workflow.requires_office_deputy and office.deputy_director:
-                if not WorkflowEngine._is_absent(
-                    office.deputy_director,
-                    absence_request.start_date,
-                    absence_request.end_date,
-                ):
-                    approvers.append(
-                        {
-                            "user": office.deputy_director,
-                            "level": "office_deputy",
-                            "priority": workflow.office_deputy_priority,
-                        }
-                    )
+            elif workflow.requires_office_deputy and is_available(
+                office.deputy_director
+            ):
+                approvers.append(
+                    {
+                        "user": office.deputy_director,
+                        "level": "office_deputy",
+                        "priority": workflow.office_deputy_priority,
+                    }
+                )
 
         # 3. HR (nếu cần)
-        if workflow.requires_hr_approval:
-            from apps.users.models import User
+        for hr in hr_users:
+            if is_available(hr):
+                approvers.append({"user": hr, "level": "hr", "priority": 5})
 
-            hr_users = User.objects.filter(role="hr", is_active=True)
-            for hr in hr_users:
-                if not WorkflowEngine._is_absent(
-                    hr, absence_request.start_date, absence_request.end_date
-                ):
-                    approvers.append({"user": hr, "level": "hr", "priority": 5})
-
-        # Sắp xếp theo priority và trả về người đầu tiên
+        # Sắp xếp theo priority
         approvers.sort(key=lambda x: x["priority"])
-        return approvers[0] if approvers else None
+        return approvers
+
+    @staticmethod
+    def _absent_user_ids(user_ids, start_date, end_date):
+        """Tập id trong user_ids có đơn vắng mặt đã duyệt giao với khoảng ngày"""
+        if not user_ids:
+            return set()
+        return set(
+            AbsenceRequest.objects.filter(
+                user_id__in=set(user_ids),
+                status="approved",
+                start_date__lte=end_date,
+                end_date__gte=start_date,
+            ).values_list("user_id", flat=True)
+        )
 
     @staticmethod
     def _is_absent(user, start_date, end_date):
         """Kiểm tra user có vắng mặt trong khoảng thời gian không"""
+        return user.pk in WorkflowEngine._absent_user_ids(
+            [user.pk], start_date, end_date
+        )
+
+    @staticmethod
+    def build_approval_chain(absence_request):
+        """
+        Xác định toàn bộ chuỗi phê duyệt một lần và lưu thành ApprovalStep
+
+        Mỗi người phê duyệt chỉ xuất hiện một lần, cấp HR chỉ cần một người.
+
+        Returns:
+            list: các ApprovalStep theo thứ tự, bước đầu chưa được kích hoạt
+        """
+        steps = []
+        seen_users = set()
+        seen_levels = set()
+        for approver in WorkflowEngine.get_available_approvers(absence_request):
+            user = approver["user"]
+            if user.pk in seen_users or approver["level"] in seen_levels:
+                continue
+            seen_users.add(user.pk)
+            seen_levels.add(approver["level"])
+            steps.append(
+                ApprovalStep(
+                    absence_request=absence_request,
+                    order=len(steps) + 1,
+                    approver=user,
+                    level=approver["level"],
+                )
+            )
+        return ApprovalStep.objects.bulk_create(steps)
+
+    @staticmethod
+    def _activate_step(absence_request, step, now=None):
+        """Chuyển con trỏ của đơn sang step và tính hạn phê duyệt"""
+        step.status = ApprovalStep.STATUS_PENDING
+        schedule_step(step, absence_request.workflow, now)
+        step.save(
+            update_fields=["status", "due_at", "next_action_at", "reminder_count"]
+        )
+
+        absence_request.current_step = step
+        absence_request.current_approver = step.approver
+        absence_request.approval_level = step.level
+        absence_request.save()
+
+        # Gửi thông báo
+        NotificationService.send_approval_notification(absence_request, step.approver)
+
+    @staticmethod
+    def get_pending_requests_for(user):
+        """Các đơn đang chờ user duyệt (dùng index approver/status của bước)"""
         return AbsenceRequest.objects.filter(
-            user=user,
-            status="approved",
-            start_date__lte=end_date,
-            end_date__gte=start_date,
-        ).exists()
+            approval_steps__approver=user,
+            approval_steps__status=ApprovalStep.STATUS_PENDING,
+            status="pending",
+        )
 
     @staticmethod
+    @transaction.atomic
     def process_approval(absence_request, approver, action, comment=""):
         """Xử lý phê duyệt"""
         # Lưu lịch sử
@@ -116,25 +205,32 @@ class WorkflowEngine:
             comment=comment,
         )
 
+        step = absence_request.current_step
+        if step:
+            step.status = action
+            step.acted_at = timezone.now()
+            step.comment = comment
+            step.next_action_at = None
+            step.save(update_fields=["status", "acted_at", "comment", "next_action_at"])
+
         if action == "approved":
-            # Kiểm tra có cần phê duyệt thêm không
-            next_approver = WorkflowEngine.get_next_approver(absence_request)
-            if next_approver:
+            # Bước kế tiếp trong chuỗi đã xác định sẵn
+            next_step = None
+            if step:
+                next_step = ApprovalStep.objects.filter(
+                    absence_request=absence_request, order=step.order + 1
+                ).first()
+
+            if next_step:
                 # Chuyển cho người tiếp theo
-                absence_request.current_approver = next_approver["user"]
-                absence_request.approval_level = next_approver["level"]
-                absence_request.save()
-
-                # Gửi thông báo
-                NotificationService.send_approval_notification(
-                    absence_request, next_approver["user"]
-                )
+                WorkflowEngine._activate_step(absence_request, next_step)
             else:
                 # Hoàn thành workflow
                 absence_request.status = "approved"
                 absence_request.approved_by = approver
                 absence_request.approved_at = timezone.now()
                 absence_request.current_approver = None
+                absence_request.current_step = None
                 absence_request.save()
 
                 # Gửi thông báo hoàn thành
@@ -146,12 +242,19 @@ class WorkflowEngine:
             absence_request.approved_at = timezone.now()
             absence_request.rejection_reason = comment
             absence_request.current_approver = None
+            absence_request.current_step = None
             absence_request.save()
 
+            # Các bước còn lại không cần xử lý nữa
+            ApprovalStep.objects.filter(
+                absence_request=absence_request, status=ApprovalStep.STATUS_WAITING
+            ).update(status=ApprovalStep.STATUS_SKIPPED)
+
             # Gửi thông báo từ chối
             NotificationService.send_rejection_notification(absence_request)
 
     @staticmethod
+    @transaction.atomic
     def create_absence_request(
         user,
         absence_type,
@@ -167,7 +270,7 @@ class WorkflowEngine:
 
         # Tính tổng số ngày
         total_days = WorkflowEngine._calculate_total_days(
-            start_date, end_date, start_time, end_time
+            start_date, end_date, start_time, end_time, user.work_schedule
         )
 
         # Lấy workflow cho phòng ban và loại vắng mặt
@@ -198,17 +301,10 @@ class WorkflowEngine:
             attachment=attachment,
         )
 
-        # Lấy người phê duyệt đầu tiên
-        next_approver = WorkflowEngine.get_next_approver(absence_request)
-        if next_approver:
-            absence_request.current_approver = next_approver["user"]
-            absence_request.approval_level = next_approver["level"]
-            absence_request.save()
-
-            # Gửi thông báo
-            NotificationService.send_approval_notification(
-                absence_request, next_approver["user"]
-            )
+        # Xác định chuỗi phê duyệt một lần và kích hoạt bước đầu tiên
+        steps = WorkflowEngine.build_approval_chain(absence_request)
+        if steps:
+            WorkflowEngine._activate_step(absence_request, steps[0])
         else:
             # Tự động duyệt nếu không cần phê duyệt
             absence_request.status = "approved"
@@ -220,41 +316,22 @@ class WorkflowEngine:
         return absence_request
 
     @staticmethod
-    def _calculate_total_days(start_date, end_date, start_time=None, end_time=None):
-        """Tính tổng số ngày nghỉ"""
-        from datetime import timedelta
-
-        # Tính số ngày cơ bản
-        total_days = (end_date - start_date).days + 1
-
-        # Nếu có thời gian cụ thể, tính theo giờ
-        if start_time and end_time:
-            # Tính số giờ nghỉ trong ngày
-            start_hour = start_time.hour + start_time.minute / 60
-            end_hour = end_time.hour + end_time.minute / 60
-
-            # Nếu nghỉ nửa ngày (4 giờ)
-            if end_hour - start_hour <= 4:
-                total_days = 0.5
-            else:
-                total_days = 1
-
-        return total_days
+    def _calculate_total_days(
+        start_date, end_date, start_time=None, end_time=None, work_schedule=""
+    ):
+        """Tính tổng số ngày nghỉ theo ngày làm việc (bỏ cuối tuần, ngày lễ)"""
+        return absence_days(
+            start_date,
+            end_date,
+            start_time,
+            end_time,
+            mask=parse_work_schedule(work_schedule),
+        )
 
     @staticmethod
     def check_overdue_requests():
-        """Kiểm tra và xử lý các đơn quá hạn"""
-        overdue_requests = AbsenceRequest.objects.filter(
-            status="pending",
-            created_at__lt=timezone.now() - timezone.timedelta(hours=24),  # Quá 24 giờ
-        )
-
-        for request in overdue_requests:
-            if request.is_overdue:
-                # Gửi thông báo nhắc nhở
-                NotificationService.send_reminder_notification(
-                    request, request.current_approver, 1
-                )
+        """Nhắc nhở/chuyển cấp các bước phê duyệt đã đến hạn (xem apps.absence.sla)"""
+        return process_due_steps()
 
     @staticmethod
     def get_workflow_status(absence_request):
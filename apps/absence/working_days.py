@@ -0,0 +1,213 @@
+"""
+Lịch ngày làm việc cho việc tính số ngày vắng mặt
+
+Mỗi lịch làm việc được biểu diễn bằng mask 7 bit (bit 0 = thứ Hai). Với mỗi
+(năm, mask) ta dựng một lần bitmap ngày làm việc của cả năm (đã áp dụng bảng
+Holiday) và mảng tổng tiền tố, nên "số ngày làm việc từ A đến B" chỉ là phép
+trừ hai phần tử cho mỗi năm đi qua.
+
+Cache nằm trong bộ nhớ process, gắn với số phiên bản HOLIDAY_VERSION_KEY trên
+cache dùng chung; signal của Holiday tăng phiên bản để mọi worker dựng lại.
+"""
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Thứ Hai..thứ Sáu
+DEFAULT_WORK_WEEK = 0b0011111
+
+# Nghỉ nửa ngày khi số giờ nghỉ trong ngày không quá ngưỡng này
+HALF_DAY_HOURS = 4
+
+_DAY_ALIASES = {
+    "t2": 0,
+    "thu2": 0,
+    "thuhai": 0,
+    "mon": 0,
+    "t3": 1,
+    "thu3": 1,
+    "thuba": 1,
+    "tue": 1,
+    "t4": 2,
+    "thu4": 2,
+    "thutu": 2,
+    "wed": 2,
+    "t5": 3,
+    "thu5": 3,
+    "thunam": 3,
+    "thursday": 3,
+    "t6": 4,
+    "thu6": 4,
+    "thusau": 4,
+    "fri": 4,
+    "t7": 5,
+    "thu7": 5,
+    "thubay": 5,
+    "sat": 5,
+    "cn": 6,
+    "chunhat": 6,
+    "sun": 6,
+}
+# Số thứ đứng một mình ("Thứ 2-6", "T2, 4, 6"): chỉ hiểu sau một ngày đã nhận ra
+_DAY_NUMBERS = {str(n): n - 2 for n in range(2, 8)}
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\s*-\s*[a-z0-9]+)?")
+
+HOLIDAY_VERSION_KEY = "absence:holidays:version"
+
+# (version, {(year, mask): (bitmap, prefix)})
+_state = (None, {})
+_lock = threading.Lock()
+
+
+def _normalize(text):
+    """Bỏ dấu tiếng Việt và gộp "thứ 2" -> "thu2", "T2 đến T6" -> "t2-t6" """
+    text = text.lower().replace("đ", "d").replace("–", "-").replace("—", "-")
+    text = "".join(
+        c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+    )
+    text = re.sub(r"\b(thu|chu)\s+(\d|hai|ba|tu|nam|sau|bay|nhat)\b", r"\1\2", text)
+    return re.sub(r"\s+(den|toi)\s+", "-", text)
+
+
+def parse_work_schedule(text):
+    """
+    Chuyển User.work_schedule (văn bản tự do) thành mask ngày làm việc
+
+    Hỗ trợ "T2-T6", "T2-6", "Thứ 2-6", "Thứ 2 - Thứ 7", "T2, T4, T6",
+    "Mon-Fri"... Không đọc được thì ghi cảnh báo và dùng lịch mặc định thứ Hai -
+    thứ Sáu.
+    """
+    if not text:
+        return DEFAULT_WORK_WEEK
+
+    mask = 0
+    for token in _TOKEN_RE.findall(_normalize(text)):
+        parts = [part.strip() for part in token.split("-")]
+        days = [
+            _DAY_ALIASES.get(part, _DAY_NUMBERS.get(part) if mask or i else None)
+            for i, part in enumerate(parts)
+        ]
+        if None in days:
+            continue
+        if len(days) == 1:
+            mask |= 1 << days[0]
+            continue
+        day = days[0]
+        while True:
+            mask |= 1 << day
+            if day == days[1]:
+                break
+            day = (day + 1) % 7
+
+    if not mask:
+        logger.warning("Unrecognised work schedule %r, using Mon-Fri", text)
+        return DEFAULT_WORK_WEEK
+    return mask
+
+
+def _holidays(year):
+    from .models import Holiday
+
+    return dict(
+        Holiday.objects.filter(
+            date__gte=date(year, 1, 1), date__lte=date(year, 12, 31)
+        ).values_list("date", "is_working_day")
+    )
+
+
+def _build(year, mask):
+    start = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start).days
+    holidays = _holidays(year)
+
+    bitmap = bytearray((days + 7) // 8)
+    prefix = array("H", [0]) * (days + 1)
+    weekday = start.weekday()
+    for i in range(days):
+        working = bool(mask >> ((weekday + i) % 7) & 1)
+        override = holidays.get(start + timedelta(days=i))
+        if override is not None:
+            working = override
+        if working:
+            bitmap[i >> 3] |= 1 << (i & 7)
+        prefix[i + 1] = prefix[i] + working
+    return bytes(bitmap), prefix
+
+
+def get_calendar(year, mask=DEFAULT_WORK_WEEK):
+    """(bitmap, prefix) của năm theo lịch làm việc, dựng một lần rồi cache"""
+    global _state
+
+    version = cache.get(HOLIDAY_VERSION_KEY)
+    cached_version, calendars = _state
+    if cached_version != version:
+        calendars = {}
+    calendar = calendars.get((year, mask))
+    if calendar is None:
+        with _lock:
+            if _state[0] == version:
+                calendars = _state[1]
+            calendar = calendars.get((year, mask))
+            if calendar is None:
+                calendar = calendars[(year, mask)] = _build(year, mask)
+            _state = (version, calendars)
+    return calendar
+
+
+def invalidate_calendars():
+    """Huỷ cache ở mọi process (gọi khi bảng Holiday thay đổi)"""
+    global _state
+
+    with _lock:
+        _state = (None, {})
+    cache.set(HOLIDAY_VERSION_KEY, time.time_ns(), None)
+
+
+def is_working_day(day, mask=DEFAULT_WORK_WEEK):
+    bitmap, _ = get_calendar(day.year, mask)
+    i = day.timetuple().tm_yday - 1
+    return bool(bitmap[i >> 3] >> (i & 7) & 1)
+
+
+def working_days_between(start_date, end_date, mask=DEFAULT_WORK_WEEK):
+    """Số ngày làm việc trong [start_date, end_date] (tính cả hai đầu)"""
+    if end_date < start_date:
+        return 0
+
+    total = 0
+    for year in range(start_date.year, end_date.year + 1):
+        _, prefix = get_calendar(year, mask)
+        first = start_date.timetuple().tm_yday - 1 if year == start_date.year else 0
+        last = (
+            end_date.timetuple().tm_yday if year == end_date.year else len(prefix) - 1
+        )
+        total += prefix[last] - prefix[first]
+    return total
+
+
+def absence_days(
+    start_date, end_date, start_time=None, end_time=None, mask=DEFAULT_WORK_WEEK
+):
+    """
+    Số ngày vắng mặt tính theo ngày làm việc
+
+    Đơn trong một ngày có giờ bắt đầu/kết thúc: 0.5 nếu nghỉ không quá 4 giờ,
+    ngược lại 1 (0 nếu ngày đó không phải ngày làm việc).
+    """
+    days = working_days_between(start_date, end_date, mask)
+    if start_time and end_time and start_date == end_date and days:
+        hours = (end_time.hour + end_time.minute / 60) - (
+            start_time.hour + start_time.minute / 60
+        )
+        if hours <= HALF_DAY_HOURS:
+            return 0.5
+    return days
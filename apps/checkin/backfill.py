@@ -0,0 +1,253 @@
+"""
+Engine cập nhật lại địa điểm (location, location_name, distance_m) hàng loạt
+cho check-in/checkout
+
+Dữ liệu được quét theo từng khoảng khóa chính (primary-key range), mỗi khoảng
+đọc bằng iterator(chunk_size=...) và ghi bằng bulk_update, nên bộ nhớ không
+phụ thuộc kích thước bảng. Các khoảng có thể chạy song song trên process pool;
+khóa chính cuối cùng đã xử lý xong được ghi vào file checkpoint để chạy tiếp
+khi bị gián đoạn.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from django.db import connections, transaction
+from django.db.models import Max, Min
+
+from apps.location.models import Location
+
+from .location_index import build_location_index
+from .models import Checkin, Checkout
+from .utils import UNKNOWN_LOCATION_NAME
+
+BACKFILL_MODELS = {
+    "checkin": Checkin,
+    "checkout": Checkout,
+}
+
+UPDATE_FIELDS = ["location", "location_name", "distance_m"]
+
+
+@dataclass
+class RangeResult:
+    """Kết quả xử lý một khoảng khóa chính"""
+
+    start: int
+    end: int
+    scanned: int = 0
+    matched: int = 0
+    unmatched: int = 0
+    updated: int = 0
+
+
+def _process_range(
+    model_name, start, end, chunk_size, only_missing, location_ids, dry_run
+):
+    """
+    Khớp địa điểm cho các dòng có start <= pk < end và ghi bằng bulk_update
+
+    Chỉ mục luôn gồm mọi địa điểm đang hoạt động. Khi giới hạn `location_ids`,
+    chỉ ghi các dòng khớp (hoặc đang gán) vào những địa điểm đó và không bao
+    giờ ghi "Không xác định", để không gán nhầm dòng thuộc địa điểm khác.
+    """
+    model = BACKFILL_MODELS[model_name]
+    index = build_location_index(Location.objects.filter(is_active=True))
+    restrict = set(location_ids or [])
+
+    queryset = model.objects.filter(pk__gte=start, pk__lt=end)
+    if only_missing:
+        queryset = queryset.filter(location__isnull=True)
+    queryset = queryset.order_by("pk").only(
+        "id", "lat", "lng", "location_id", "location_name", "distance_m"
+    )
+
+    result = RangeResult(start=start, end=end)
+    pending = []
+
+    def flush():
+        if pending and not dry_run:
+            with transaction.atomic():
+                model.objects.bulk_update(pending, UPDATE_FIELDS)
+        result.updated += len(pending)
+        pending.clear()
+
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        result.scanned += 1
+        location, distance = (None, None)
+        if obj.lat and obj.lng:
+            location, distance = index.find_best(obj.lat, obj.lng)
+
+        if (
+            location
+            and restrict
+            and location.id not in restrict
+            and obj.location_id not in restrict
+        ):
+            # Thuộc địa điểm khác ngoài phạm vi lần chạy này
+            continue
+
+        if location:
+            result.matched += 1
+            changed = (
+                obj.location_id != location.id
+                or obj.location_name != location.name
+                or obj.distance_m != distance
+            )
+            obj.location_id = location.id
+            obj.location_name = location.name
+            obj.distance_m = distance
+        else:
+            result.unmatched += 1
+            # Không xoá địa điểm cũ, chỉ ghi nhận là đã khớp
+            changed = not restrict and not obj.location_name
+            if changed:
+                obj.location_name = UNKNOWN_LOCATION_NAME
+
+        if changed:
+            pending.append(obj)
+            if len(pending) >= chunk_size:
+                flush()
+
+    flush()
+    return result
+
+
+def _init_worker():
+    """Khởi tạo Django trong process con (cần với start method 'spawn')"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+class LocationBackfill:
+    """Điều phối việc cập nhật địa điểm theo khoảng khóa chính"""
+
+    def __init__(
+        self,
+        model_name="checkin",
+        chunk_size=2000,
+        range_size=50000,
+        workers=1,
+        only_missing=False,
+        location_ids=None,
+        dry_run=False,
+        checkpoint_path=None,
+    ):
+        if model_name not in BACKFILL_MODELS:
+            raise ValueError(f"Unknown model: {model_name}")
+        self.model_name = model_name
+        self.model = BACKFILL_MODELS[model_name]
+        self.chunk_size = chunk_size
+        self.range_size = max(range_size, chunk_size)
+        self.workers = max(workers, 1)
+        if self.workers > 1 and connections["default"].vendor == "sqlite":
+            # SQLite chỉ cho phép một tiến trình ghi tại một thời điểm
+            self.workers = 1
+        self.only_missing = only_missing
+        self.location_ids = list(location_ids or [])
+        self.dry_run = dry_run
+        self.checkpoint_path = checkpoint_path
+
+    # Checkpoint -------------------------------------------------------------
+
+    def load_checkpoint(self):
+        """Khóa chính lớn nhất mà mọi dòng tới đó đã xử lý xong (0 nếu chưa có)"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as f:
+            data = json.load(f)
+        if data.get("model") != self.model_name:
+            return 0
+        return int(data.get("last_pk") or 0)
+
+    def save_checkpoint(self, last_pk):
+        """Ghi checkpoint (ghi file tạm rồi đổi tên để tránh file hỏng)"""
+        if not self.checkpoint_path or self.dry_run:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"model": self.model_name, "last_pk": last_pk}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    # Ranges -----------------------------------------------------------------
+
+    def pk_ranges(self, after=0):
+        """Chia các dòng có pk > after thành các khoảng [start, end)"""
+        queryset = self.model.objects.filter(pk__gt=after)
+        bounds = queryset.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            return []
+        return [
+            (start, start + self.range_size)
+            for start in range(bounds["low"], bounds["high"] + 1, self.range_size)
+        ]
+
+    def run(self, on_progress=None):
+        """
+        Chạy backfill, trả về tổng hợp kết quả
+
+        Checkpoint là khóa chính cuối cùng của dãy khoảng liên tiếp đã xong (các
+        khoảng chạy song song có thể xong không theo thứ tự), nên vẫn đúng khi
+        dòng bị xoá giữa hai lần chạy.
+
+        Args:
+            on_progress: callback(RangeResult, done, total) sau mỗi khoảng
+        """
+        ranges = self.pk_ranges(after=self.load_checkpoint())
+        total = len(ranges)
+        summary = RangeResult(start=0, end=0)
+        finished = set()
+        pending_starts = [start for start, _ in ranges]
+
+        def record(result, done):
+            summary.scanned += result.scanned
+            summary.matched += result.matched
+            summary.unmatched += result.unmatched
+            summary.updated += result.updated
+            finished.add(result.start)
+            last_pk = None
+            while pending_starts and pending_starts[0] in finished:
+                last_pk = pending_starts.pop(0) + self.range_size - 1
+            if last_pk is not None:
+                self.save_checkpoint(last_pk)
+            if on_progress:
+                on_progress(result, done, total)
+
+        args = [
+            (
+                self.model_name,
+                start,
+                end,
+                self.chunk_size,
+                self.only_missing,
+                self.location_ids,
+                self.dry_run,
+            )
+            for start, end in ranges
+        ]
+
+        if self.workers == 1:
+            for done, arg in enumerate(args, start=1):
+                record(_process_range(*arg), done)
+        else:
+            # Không chia sẻ kết nối DB của process cha cho các process con
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            ) as executor:
+                futures = [executor.submit(_process_range, *arg) for arg in args]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    record(future.result(), done)
+
+        if not self.dry_run:
+            self.clear_checkpoint()
+        return summary
@@ -5,6 +5,7 @@ Serializers for checkout module
 from rest_framework import serializers
 
 from .models import Checkout
+from .photos import thumbnail_url
 from .utils import get_location_name_for_checkin
 
 
@@ -26,6 +27,7 @@ class CheckoutSerializer(serializers.ModelSerializer):
             "checkin",
             "checkin_id",
             "checkin_location_name",
+            "location",
             "location_name",
             "lat",
             "lng",
@@ -62,11 +64,11 @@ class CheckoutSerializer(serializers.ModelSerializer):
         return value
 
     def get_checkin_location_name(self, obj):
-        """Get location name from related checkin"""
+        """Get location name stored on related checkin"""
         return get_location_name_for_checkin(obj.checkin)
 
     def get_location_name(self, obj):
-        """Get location name based on checkout lat/lng coordinates"""
+        """Get location name stored at checkout time"""
         return get_location_name_for_checkin(obj)
 
     def get_photo_url(self, obj):
@@ -104,6 +106,7 @@ class CheckoutListSerializer(serializers.ModelSerializer):
             "checkin",
             "checkin_id",
             "checkin_location_name",
+            "location",
             "location_name",
             "lat",
             "lng",
@@ -117,17 +120,13 @@ class CheckoutListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "user", "created_at", "distance_m"]
 
     def get_checkin_location_name(self, obj):
-        """Get location name from related checkin"""
+        """Get location name stored on related checkin"""
         return get_location_name_for_checkin(obj.checkin)
 
     def get_location_name(self, obj):
-        """Get location name based on checkout lat/lng coordinates"""
+        """Get location name stored at checkout time"""
         return get_location_name_for_checkin(obj)
 
     def get_photo_url(self, obj):
-        try:
-            if obj.photo:
-                return obj.photo.url
-        except Exception:
-            pass
-        return None
+        """Thumbnail cho trang danh sách (ảnh gốc khi chưa xử lý xong)"""
+        return thumbnail_url(obj)
@@ -7,14 +7,22 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.views.decorators.http import require_http_methods
 
-from apps.location.models import Location
+from apps.common.dates import date_range_q
+from apps.common.pagination import (
+    InvalidCursor,
+    is_cursor_request,
+    paginate_request,
+    parse_page_size,
+)
 from apps.module_settings.decorators import require_module_enabled
 from apps.users.models import User
 from apps.users.permissions import permission_required
 
 from .models import Checkin, Checkout
+from .photos import thumbnail_url
 from .serializers import CheckoutListSerializer
-from .utils import find_best_location_for_checkin
+from .services import CheckinService
+from .uploads import photo_upload, validate_photo
 
 
 @login_required
@@ -27,14 +35,14 @@ def checkout_action_view(request):
         return render(
             request,
             "checkin/checkout_error.html",
-            {"error": "Bạn phải checkout từ một check-in cụ thể. Vui lòng truy cập từ lịch sử check-in."},
+            {
+                "error": "Bạn phải checkout từ một check-in cụ thể. Vui lòng truy cập từ lịch sử check-in."
+            },
         )
 
     # Lấy checkin cụ thể
     try:
-        latest_checkin = get_object_or_404(
-            Checkin, id=checkin_id, user=request.user
-        )
+        latest_checkin = get_object_or_404(Checkin, id=checkin_id, user=request.user)
         # Kiểm tra xem checkin đã có checkout chưa
         if Checkout.objects.filter(checkin=latest_checkin).exists():
             return render(
@@ -57,6 +65,7 @@ def checkout_action_view(request):
 
 @login_required
 @require_http_methods(["POST"])
+@photo_upload
 def checkout_submit_view(request):
     """Xử lý submit checkout"""
     try:
@@ -90,44 +99,29 @@ def checkout_submit_view(request):
             return JsonResponse(
                 {"success": False, "error": "Vui lòng chụp ảnh"}, status=400
             )
+        try:
+            validate_photo(photo)
+        except ValueError as e:
+            return JsonResponse({"success": False, "error": str(e)}, status=400)
 
-        # Tự động tìm địa điểm gần nhất dựa trên tọa độ
-        location_name, distance = find_best_location_for_checkin(lat, lng)
-
-        # Lấy location object nếu có (để lưu vào DB cho backward compatibility)
-        location = None
-        if location_name != "Không xác định":
-            try:
-                location = Location.objects.filter(
-                    name=location_name, is_active=True
-                ).first()
-            except Location.DoesNotExist:
-                pass
-
-        # Tạo checkout
-        checkout = Checkout.objects.create(
+        # Khớp địa điểm và tạo checkout trong một lần ghi
+        checkout = CheckinService.create_checkout(
             user=request.user,
             checkin=checkin,
             lat=lat,
             lng=lng,
-            address=address,
             photo=photo,
+            request=request,
+            address=address,
             note=note,
-            ip=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
         )
 
-        # Tính khoảng cách
-        if location:
-            checkout.distance_m = distance
-            checkout.save(update_fields=["distance_m"])
-
         # Chuẩn bị dữ liệu trả về
         success_data = {
             "checkout_id": checkout.id,
             "checkin_id": checkin.id,
-            "location_name": location_name,
-            "distance": distance,
+            "location_name": checkout.location_name,
+            "distance": checkout.distance_m,
             "created_at": checkout.created_at.strftime("%d/%m/%Y %H:%M:%S"),
             "message": "Checkout thành công!",
         }
@@ -160,7 +154,7 @@ def checkout_success_view(request, checkout_id):
             "address": checkout.address or "Không xác định",
             "created_at": checkout.created_at.strftime("%d/%m/%Y %H:%M:%S"),
             "note": checkout.note or "",
-            "photo_url": (checkout.photo.url if checkout.photo else None),
+            "photo_url": thumbnail_url(checkout),
             "checkin_id": checkout.checkin.id,
             "checkout_id": checkout.id,
             "message": "Checkout thành công!",
@@ -251,14 +245,18 @@ def checkout_list_view(request):
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date()
-            checkouts = checkouts.filter(created_at__date__gte=date_from_obj)
+            checkouts = checkouts.filter(
+                date_range_q("created_at", date_from=date_from_obj)
+            )
         except ValueError:
             pass
 
     if date_to:
         try:
             date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date()
-            checkouts = checkouts.filter(created_at__date__lte=date_to_obj)
+            checkouts = checkouts.filter(
+                date_range_q("created_at", date_to=date_to_obj)
+            )
         except ValueError:
             pass
 
@@ -309,23 +307,36 @@ def checkout_list_api(request):
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date()
-            checkouts = checkouts.filter(created_at__date__gte=date_from_obj)
+            checkouts = checkouts.filter(
+                date_range_q("created_at", date_from=date_from_obj)
+            )
         except ValueError:
             pass
 
     if date_to:
         try:
             date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date()
-            checkouts = checkouts.filter(created_at__date__lte=date_to_obj)
+            checkouts = checkouts.filter(
+                date_range_q("created_at", date_to=date_to_obj)
+            )
         except ValueError:
             pass
 
+    # Phân trang theo con trỏ (infinite scroll), không COUNT/OFFSET
+    if is_cursor_request(request):
+        try:
+            page = paginate_request(request, checkouts, 50)
+        except InvalidCursor:
+            return JsonResponse({"error": "Cursor không hợp lệ"}, status=400)
+
+        serializer = CheckoutListSerializer(page.items, many=True)
+        return JsonResponse({"checkouts": serializer.data, **page.as_dict()})
+
     # Pagination
-    per_page = int(request.GET.get("per_page", 50))
-    page = int(request.GET.get("page", 1))
+    per_page = parse_page_size(request.GET.get("per_page"), 50)
 
     paginator = Paginator(checkouts, per_page)
-    page_obj = paginator.get_page(page)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     serializer = CheckoutListSerializer(page_obj.object_list, many=True)
 
@@ -365,23 +376,36 @@ def checkout_history_api(request):
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, "%Y-%m-%d").date()
-            checkouts = checkouts.filter(created_at__date__gte=date_from_obj)
+            checkouts = checkouts.filter(
+                date_range_q("created_at", date_from=date_from_obj)
+            )
         except ValueError:
             pass
 
     if date_to:
         try:
             date_to_obj = datetime.strptime(date_to, "%Y-%m-%d").date()
-            checkouts = checkouts.filter(created_at__date__lte=date_to_obj)
+            checkouts = checkouts.filter(
+                date_range_q("created_at", date_to=date_to_obj)
+            )
         except ValueError:
             pass
 
+    # Phân trang theo con trỏ (infinite scroll), không COUNT/OFFSET
+    if is_cursor_request(request):
+        try:
+            page = paginate_request(request, checkouts, 20)
+        except InvalidCursor:
+            return JsonResponse({"error": "Cursor không hợp lệ"}, status=400)
+
+        serializer = CheckoutListSerializer(page.items, many=True)
+        return JsonResponse({"checkouts": serializer.data, **page.as_dict()})
+
     # Pagination
-    per_page = int(request.GET.get("per_page", 20))
-    page = int(request.GET.get("page", 1))
+    per_page = parse_page_size(request.GET.get("per_page"), 20)
 
     paginator = Paginator(checkouts, per_page)
-    page_obj = paginator.get_page(page)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     serializer = CheckoutListSerializer(page_obj.object_list, many=True)
 
@@ -0,0 +1,102 @@
+import os
+
+from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from apps.common.exports import EXPORT_FORMATS
+from apps.common.models import BackgroundJob
+from apps.common.tasks import enqueue
+from apps.users.permissions import permission_required
+
+from .exports import (
+    EXPORT_SYNC_MAX_ROWS,
+    export_filename,
+    export_params,
+    export_queryset,
+    stream_checkins,
+)
+
+EXPORT_TASK = "checkin.export"
+
+
+def _can_export_checkouts(user):
+    return user.is_superuser or user.has_perm("checkin.can_export_checkout_data")
+
+
+@permission_required("checkin.can_export_checkin_data")
+def checkin_export_view(request):
+    """
+    Xuất check-in theo bộ lọc của trang danh sách (format=csv|xlsx)
+
+    Trả file dạng luồng; khi dữ liệu quá lớn hoặc có background=1 thì xếp hàng
+    job và trả 202 cùng URL theo dõi.
+    """
+    fmt = request.GET.get("format", "xlsx")
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({"error": "Định dạng không hợp lệ"}, status=400)
+
+    include_checkout = _can_export_checkouts(request.user)
+    queryset = export_queryset(request.GET)
+    background = request.GET.get("background", "").lower() in ("1", "true")
+    if background or queryset.count() > EXPORT_SYNC_MAX_ROWS:
+        job = enqueue(
+            EXPORT_TASK,
+            max_attempts=1,
+            user_id=request.user.id,
+            params=export_params(request.GET),
+            fmt=fmt,
+            include_checkout=include_checkout,
+        )
+        return JsonResponse(
+            {
+                "job_id": job.id,
+                "status_url": reverse("checkin:export_status", args=[job.id]),
+            },
+            status=202,
+        )
+
+    chunks, content_type = stream_checkins(queryset, fmt, include_checkout)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(fmt)}"'
+    return response
+
+
+def _get_export_job(request, job_id):
+    return get_object_or_404(
+        BackgroundJob, pk=job_id, task=EXPORT_TASK, kwargs__user_id=request.user.id
+    )
+
+
+@login_required
+def checkin_export_status_view(request, job_id):
+    """Trạng thái job xuất dữ liệu của user hiện tại"""
+    job = _get_export_job(request, job_id)
+    data = {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress_percent,
+        "error": job.error if job.status == BackgroundJob.STATUS_FAILED else "",
+    }
+    if job.status == BackgroundJob.STATUS_DONE:
+        data["download_url"] = reverse("checkin:export_download", args=[job.id])
+    return JsonResponse(data)
+
+
+@login_required
+def checkin_export_download_view(request, job_id):
+    """Tải file của job xuất dữ liệu đã hoàn thành"""
+    job = _get_export_job(request, job_id)
+    if job.status != BackgroundJob.STATUS_DONE or not (job.result or {}).get("file"):
+        return JsonResponse({"error": "File chưa sẵn sàng"}, status=409)
+
+    name = job.result["file"]
+    if not default_storage.exists(name):
+        return JsonResponse({"error": "File đã bị xoá"}, status=410)
+    return FileResponse(
+        default_storage.open(name, "rb"),
+        as_attachment=True,
+        filename=os.path.basename(name).split("_", 1)[-1],
+    )
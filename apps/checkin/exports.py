@@ -0,0 +1,227 @@
+"""
+Xuất check-in (kèm checkout tương ứng) ra CSV/XLSX
+
+Dữ liệu được đọc bằng .values().iterator() theo chunk; id checkout mới nhất của
+mỗi check-in lấy bằng một subquery (mỗi check-in đúng một dòng), rồi checkout
+của cả chunk được đọc bằng một truy vấn pk__in, nên bộ nhớ không phụ thuộc số
+dòng. Khoảng dữ liệu lớn (hơn EXPORT_SYNC_MAX_ROWS dòng) được xuất bởi
+background task `checkin.export` ra file trong thư mục EXPORT_DIR của storage
+mặc định; file cũ hơn EXPORT_RETENTION bị xoá bởi cleanup_export_files().
+"""
+
+import os
+import tempfile
+from datetime import timedelta
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from apps.common.exports import export_stream
+
+from .filters import FILTER_PARAMS, filter_checkins
+from .models import Checkin, CheckinType, Checkout
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_SYNC_MAX_ROWS = 50_000
+EXPORT_DIR = "exports/checkins"
+EXPORT_RETENTION = timedelta(days=7)
+
+CHECKIN_HEADER = [
+    "Số thứ tự",
+    "Mã nhân viên",
+    "Nhân viên",
+    "Địa điểm",
+    "Tọa độ Check-in (lat)",
+    "Tọa độ Check-in (lng)",
+    "Khoảng cách Check-in (mét)",
+    "Loại checkin",
+    "Thời gian Check-in",
+    "Ghi chú Check-in",
+]
+CHECKOUT_HEADER = [
+    "Trạng thái Checkout",
+    "Thời gian Checkout",
+    "Tọa độ Checkout (lat)",
+    "Tọa độ Checkout (lng)",
+    "Khoảng cách Checkout (mét)",
+    "Địa chỉ Checkout",
+    "Ghi chú Checkout",
+    "Thời gian làm việc",
+]
+
+CHECKIN_FIELDS = [
+    "user__employee_id",
+    "user__first_name",
+    "user__last_name",
+    "user__username",
+    "location_name",
+    "location__name",
+    "lat",
+    "lng",
+    "distance_m",
+    "checkin_type",
+    "created_at",
+    "note",
+]
+# Trường của checkout mới nhất, đọc theo lô bằng pk__in
+CHECKOUT_FIELDS = [
+    "id",
+    "created_at",
+    "lat",
+    "lng",
+    "distance_m",
+    "address",
+    "note",
+]
+
+DATETIME_FORMAT = "%d/%m/%Y %H:%M:%S"
+_TYPE_LABELS = dict(CheckinType.choices)
+
+
+def export_params(params):
+    """Chỉ giữ các tham số lọc (để lưu vào kwargs của job)"""
+    return {key: params.get(key) for key in FILTER_PARAMS if params.get(key)}
+
+
+def export_queryset(params):
+    return filter_checkins(Checkin.objects.order_by("-created_at", "-id"), params)
+
+
+def _local(value):
+    return timezone.localtime(value).strftime(DATETIME_FORMAT) if value else ""
+
+
+def _round(value, digits):
+    return round(value, digits) if value is not None else ""
+
+
+def _work_duration(start, end):
+    if not start or not end:
+        return ""
+    minutes = max(int((end - start).total_seconds() // 60), 0)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+
+def with_latest_checkout(queryset):
+    """
+    Annotate latest_checkout_id: id checkout mới nhất của mỗi check-in
+
+    Dùng một subquery thay cho JOIN để check-in có nhiều checkout (dữ liệu cũ,
+    request gửi trùng) vẫn chỉ ra một dòng; các cột checkout được lấy theo lô
+    trong _latest_checkouts().
+    """
+    latest = Checkout.objects.filter(checkin=OuterRef("pk")).order_by(
+        "-created_at", "-id"
+    )
+    return queryset.annotate(latest_checkout_id=Subquery(latest.values("id")[:1]))
+
+
+def _latest_checkouts(rows):
+    """Gắn row["checkout"] cho một lô dòng bằng một truy vấn pk__in"""
+    ids = [row["latest_checkout_id"] for row in rows if row["latest_checkout_id"]]
+    checkouts = {
+        checkout["id"]: checkout
+        for checkout in Checkout.objects.filter(pk__in=ids).values(*CHECKOUT_FIELDS)
+    }
+    for row in rows:
+        row["checkout"] = checkouts.get(row["latest_checkout_id"])
+    return rows
+
+
+def _chunked_rows(queryset, fields, include_checkout):
+    rows = queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        yield from _latest_checkouts(chunk) if include_checkout else chunk
+
+
+def export_rows(queryset, include_checkout=True):
+    """Generator các dòng dữ liệu theo đúng thứ tự header"""
+    fields = list(CHECKIN_FIELDS)
+    if include_checkout:
+        queryset = with_latest_checkout(queryset)
+        fields.append("latest_checkout_id")
+    rows = _chunked_rows(queryset, fields, include_checkout)
+    for number, row in enumerate(rows, 1):
+        full_name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+        line = [
+            number,
+            row["user__employee_id"] or "",
+            full_name or row["user__username"] or "",
+            row["location_name"] or row["location__name"] or "",
+            _round(row["lat"], 6),
+            _round(row["lng"], 6),
+            _round(row["distance_m"], 2),
+            _TYPE_LABELS.get(row["checkin_type"], row["checkin_type"]),
+            _local(row["created_at"]),
+            row["note"],
+        ]
+        if include_checkout:
+            checkout = row["checkout"] or dict.fromkeys(CHECKOUT_FIELDS)
+            line += [
+                "Đã checkout" if row["checkout"] else "Chưa checkout",
+                _local(checkout["created_at"]),
+                _round(checkout["lat"], 6),
+                _round(checkout["lng"], 6),
+                _round(checkout["distance_m"], 2),
+                checkout["address"] or "",
+                checkout["note"] or "",
+                _work_duration(row["created_at"], checkout["created_at"]),
+            ]
+        yield line
+
+
+def stream_checkins(queryset, fmt, include_checkout=True):
+    """
+    Returns:
+        tuple: (generator bytes, content_type)
+    """
+    header = CHECKIN_HEADER + (CHECKOUT_HEADER if include_checkout else [])
+    kwargs = {"sheet_name": "Check-in"} if fmt == "xlsx" else {}
+    return export_stream(fmt, header, export_rows(queryset, include_checkout), **kwargs)
+
+
+def export_filename(fmt, now=None):
+    return f"checkins_{timezone.localtime(now).strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+
+def write_export_file(queryset, fmt, name, include_checkout=True):
+    """
+    Ghi file xuất vào storage mặc định qua một file tạm trên đĩa
+
+    Returns:
+        str: tên file trong storage
+    """
+    chunks, _ = stream_checkins(queryset, fmt, include_checkout)
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in chunks:
+            tmp.write(chunk)
+        tmp.seek(0)
+        return default_storage.save(os.path.join(EXPORT_DIR, name), File(tmp))
+
+
+def cleanup_export_files(max_age=EXPORT_RETENTION, dry_run=False, now=None):
+    """
+    Xoá các file xuất trong EXPORT_DIR cũ hơn `max_age`
+
+    Returns:
+        int: số file đã (hoặc sẽ) xoá
+    """
+    cutoff = (now or timezone.now()) - max_age
+    try:
+        _, files = default_storage.listdir(EXPORT_DIR)
+    except FileNotFoundError:
+        return 0
+
+    deleted = 0
+    for filename in files:
+        name = os.path.join(EXPORT_DIR, filename)
+        if default_storage.get_modified_time(name) >= cutoff:
+            continue
+        deleted += 1
+        if not dry_run:
+            default_storage.delete(name)
+    return deleted
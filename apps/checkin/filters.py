@@ -0,0 +1,53 @@
+"""
+Bộ lọc danh sách check-in dùng chung cho trang quản lý và xuất dữ liệu
+"""
+
+from datetime import datetime
+
+from django.db.models import Q
+
+from apps.common.dates import date_range_q
+
+FILTER_PARAMS = ("search", "location_id", "user_id", "date_from", "date_to")
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_checkins(queryset, params):
+    """
+    Áp dụng các tham số lọc (search, location_id, user_id, date_from, date_to)
+
+    Ngày không hợp lệ bị bỏ qua như trên trang danh sách.
+    """
+    search = params.get("search", "")
+    location_id = params.get("location_id", "")
+    user_id = params.get("user_id", "")
+
+    if search:
+        queryset = queryset.filter(
+            Q(user__first_name__icontains=search)
+            | Q(user__last_name__icontains=search)
+            | Q(user__username__icontains=search)
+            | Q(note__icontains=search)
+        )
+
+    if location_id:
+        queryset = queryset.filter(location_id=location_id)
+
+    if user_id:
+        queryset = queryset.filter(user_id=user_id)
+
+    date_from = _parse_date(params.get("date_from"))
+    if date_from:
+        queryset = queryset.filter(date_range_q("created_at", date_from=date_from))
+
+    date_to = _parse_date(params.get("date_to"))
+    if date_to:
+        queryset = queryset.filter(date_range_q("created_at", date_to=date_to))
+
+    return queryset
@@ -0,0 +1,137 @@
+"""
+Chỉ mục không gian trong bộ nhớ cho việc khớp check-in với địa điểm (geofence)
+
+Các địa điểm đang hoạt động được chia vào lưới ô vuông theo độ (grid buckets).
+Mỗi địa điểm được đăng ký vào tất cả các ô mà vòng tròn bán kính của nó chạm tới,
+nên khi tra cứu chỉ cần xét các ứng viên nằm trong đúng một ô.
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+
+from apps.location.models import Location
+
+# Kích thước một ô lưới (độ) ~ 1.1km theo vĩ độ
+DEFAULT_CELL_SIZE_DEG = 0.01
+
+# Số mét trên một độ vĩ độ
+METERS_PER_DEG_LAT = 111320.0
+
+IndexedLocation = namedtuple(
+    "IndexedLocation", ["id", "name", "lat", "lng", "radius_m"]
+)
+
+
+class LocationIndex:
+    """Lưới ô vuông chứa các địa điểm đang hoạt động"""
+
+    def __init__(self, locations, cell_size=DEFAULT_CELL_SIZE_DEG):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.size = 0
+
+        for location in locations:
+            self._add(location)
+
+        # Không cho phép tạo ô mới khi tra cứu
+        self.cells.default_factory = None
+
+    def _cell(self, lat, lng):
+        return (
+            math.floor(lat / self.cell_size),
+            math.floor(lng / self.cell_size),
+        )
+
+    def _add(self, location):
+        """Đăng ký địa điểm vào các ô mà vòng tròn bán kính chạm tới"""
+        radius = float(location.radius_m or 0)
+        dlat = radius / METERS_PER_DEG_LAT
+        cos_lat = max(math.cos(math.radians(location.lat)), 1e-6)
+        dlng = radius / (METERS_PER_DEG_LAT * cos_lat)
+
+        min_row, min_col = self._cell(location.lat - dlat, location.lng - dlng)
+        max_row, max_col = self._cell(location.lat + dlat, location.lng + dlng)
+
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                self.cells[(row, col)].append(location)
+        self.size += 1
+
+    def candidates(self, lat, lng):
+        """Các địa điểm có thể chứa điểm (lat, lng)"""
+        return self.cells.get(self._cell(lat, lng), ())
+
+    def find_best(self, lat, lng):
+        """
+        Tìm địa điểm gần nhất có bán kính chứa điểm (lat, lng)
+
+        Returns:
+            tuple: (IndexedLocation, distance_m) hoặc (None, None)
+        """
+        from .utils import haversine_distance
+
+        best_location = None
+        best_distance = float("inf")
+
+        for location in self.candidates(lat, lng):
+            distance = haversine_distance(lat, lng, location.lat, location.lng)
+            if distance <= location.radius_m and distance < best_distance:
+                best_distance = distance
+                best_location = location
+
+        if best_location is None:
+            return None, None
+        return best_location, best_distance
+
+
+_index = None
+_index_built_at = 0.0
+_index_lock = threading.Lock()
+
+
+def build_location_index(locations=None):
+    """
+    Xây dựng chỉ mục mới từ queryset địa điểm (mặc định: đang hoạt động)
+    """
+    if locations is None:
+        locations = Location.objects.filter(is_active=True)
+    locations = [
+        IndexedLocation(*row)
+        for row in locations.values_list("id", "name", "lat", "lng", "radius_m")
+    ]
+    cell_size = getattr(settings, "CHECKIN_LOCATION_INDEX_CELL_DEG", None)
+    return LocationIndex(locations, cell_size or DEFAULT_CELL_SIZE_DEG)
+
+
+def get_location_index():
+    """
+    Lấy chỉ mục địa điểm của process hiện tại, xây dựng lại khi cần
+
+    Chỉ mục bị huỷ qua signal post_save/post_delete của Location. Với nhiều
+    worker, CHECKIN_LOCATION_INDEX_TTL (giây) giới hạn thời gian dữ liệu cũ
+    có thể tồn tại ở các process khác.
+    """
+    global _index, _index_built_at
+
+    ttl = getattr(settings, "CHECKIN_LOCATION_INDEX_TTL", 300)
+    index = _index
+    if index is not None and (not ttl or time.monotonic() - _index_built_at < ttl):
+        return index
+
+    with _index_lock:
+        if _index is None or (ttl and time.monotonic() - _index_built_at >= ttl):
+            _index = build_location_index()
+            _index_built_at = time.monotonic()
+        return _index
+
+
+def invalidate_location_index():
+    """Huỷ chỉ mục để lần tra cứu tiếp theo xây dựng lại"""
+    global _index
+
+    with _index_lock:
+        _index = None
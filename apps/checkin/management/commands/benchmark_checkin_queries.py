@@ -0,0 +1,138 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.checkin.models import Checkin
+from apps.common.dates import date_range_q
+from apps.location.models import Location
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "So sánh query plan và thời gian giữa lọc created_at__date và lọc theo "
+        "khoảng thời gian (dùng được index) trên database hiện tại"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Số lần chạy mỗi truy vấn để lấy thời gian trung bình",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Tạo tạm N check-in giả (rollback sau khi đo) để benchmark",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Số ngày trải dữ liệu giả khi dùng --seed",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] <= 0:
+            raise CommandError("--iterations phải lớn hơn 0")
+
+        self.stdout.write(f"Database: {connection.vendor}")
+        try:
+            with transaction.atomic():
+                if options["seed"]:
+                    self._seed(options["seed"], options["days"])
+                self._run(options["iterations"])
+                if options["seed"]:
+                    raise _Rollback
+        except _Rollback:
+            self.stdout.write("Đã rollback dữ liệu giả")
+
+    def _seed(self, count, days):
+        user = User.objects.order_by("id").first()
+        if user is None:
+            user = User.objects.create_user(username="benchmark_checkin_user")
+        location = Location.objects.order_by("id").first()
+        if location is None:
+            location = Location.objects.create(
+                name="Benchmark", lat=10.76, lng=106.66, radius_m=100
+            )
+
+        now = timezone.now()
+        batch = []
+        for _ in range(count):
+            batch.append(
+                Checkin(
+                    user=user,
+                    location=location,
+                    lat=location.lat,
+                    lng=location.lng,
+                    created_at=now - timedelta(seconds=random.randint(0, days * 86400)),
+                )
+            )
+        # auto_now_add ghi đè created_at khi bulk_create, cập nhật lại sau
+        created = Checkin.objects.bulk_create(batch, batch_size=2000)
+        for checkin, row in zip(created, batch):
+            checkin.created_at = row.created_at
+        Checkin.objects.bulk_update(created, ["created_at"], batch_size=2000)
+        self.stdout.write(f"Đã tạo tạm {count} check-in")
+
+    def _run(self, iterations):
+        user = Checkin.objects.exclude(user=None).values_list("user_id", flat=True)
+        location = Checkin.objects.exclude(location=None).values_list(
+            "location_id", flat=True
+        )
+        user_id = user.first()
+        location_id = location.first()
+
+        today = timezone.localdate()
+        week_start = today - timedelta(days=today.weekday())
+        cases = [
+            (
+                "Check-in hôm nay",
+                Checkin.objects.filter(created_at__date=today),
+                Checkin.objects.filter(date_range_q("created_at", today, today)),
+            ),
+            (
+                "Lịch sử nhân viên tuần này",
+                Checkin.objects.filter(
+                    user_id=user_id, created_at__date__gte=week_start
+                ).order_by("-created_at")[:50],
+                Checkin.objects.filter(
+                    date_range_q("created_at", week_start), user_id=user_id
+                ).order_by("-created_at")[:50],
+            ),
+            (
+                "Check-in theo địa điểm tuần này",
+                Checkin.objects.filter(
+                    location_id=location_id, created_at__date__gte=week_start
+                ),
+                Checkin.objects.filter(
+                    date_range_q("created_at", week_start), location_id=location_id
+                ),
+            ),
+        ]
+
+        for title, old, new in cases:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}"))
+            for label, queryset in (("__date", old), ("khoảng thời gian", new)):
+                elapsed = self._time(queryset, iterations)
+                self.stdout.write(f"[{label}] {elapsed * 1000:.2f} ms")
+                self.stdout.write(queryset.explain())
+
+    def _time(self, queryset, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            list(queryset.values_list("id", flat=True))
+        return (time.perf_counter() - start) / iterations
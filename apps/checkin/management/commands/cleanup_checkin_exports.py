@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.checkin.exports import EXPORT_RETENTION, cleanup_export_files
+
+
+class Command(BaseCommand):
+    help = "Xoá các file xuất check-in đã quá thời gian giữ lại"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=float,
+            default=EXPORT_RETENTION.days,
+            help="Xoá file cũ hơn số ngày này",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Chỉ đếm số file sẽ bị xoá",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days không được âm")
+
+        deleted = cleanup_export_files(
+            max_age=timedelta(days=options["days"]), dry_run=options["dry_run"]
+        )
+        action = "Sẽ xoá" if options["dry_run"] else "Đã xoá"
+        self.stdout.write(self.style.SUCCESS(f"{action} {deleted} file xuất"))
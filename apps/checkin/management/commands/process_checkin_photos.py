@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.checkin.models import Checkin, Checkout
+from apps.checkin.photos import PHOTO_ERRORS, process_photo
+
+
+class Command(BaseCommand):
+    help = (
+        "Thu nhỏ ảnh gốc và tạo thumbnail cho các check-in/checkout cũ chưa được "
+        "xử lý (ảnh mới được xử lý bởi background task checkin.process_photo)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Số dòng đọc mỗi lô",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Dừng sau khi xử lý N ảnh (0 = tất cả)",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        processed = failed = 0
+        for instance in self._pending(options["batch_size"]):
+            if options["limit"] and processed >= options["limit"]:
+                break
+            try:
+                processed += process_photo(instance)
+            except PHOTO_ERRORS as e:
+                failed += 1
+                self.stderr.write(
+                    f"{type(instance).__name__} {instance.pk}: "
+                    f"không xử lý được ảnh ({e})"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Đã xử lý {processed} ảnh, lỗi {failed}"))
+
+    def _pending(self, batch_size):
+        """Check-in/checkout chưa xử lý ảnh (bỏ qua ảnh đã lỗi), đọc theo lô"""
+        for model in (Checkin, Checkout):
+            queryset = model.objects.filter(
+                photo_processed_at__isnull=True, photo_error=""
+            ).exclude(photo="")
+            last_pk = 0
+            while True:
+                batch = list(
+                    queryset.filter(pk__gt=last_pk).order_by("pk")[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                yield from batch
@@ -1,7 +1,7 @@
-from django.core.management.base import BaseCommand
+# Management commands for checkin app
+from django.core.management.base import BaseCommand, CommandError
 
-from apps.checkin.models import Checkin
-from apps.checkin.utils import find_best_location_for_checkin
+from apps.checkin.backfill import BACKFILL_MODELS, LocationBackfill
 
 
 class Command(BaseCommand):
@@ -13,56 +13,97 @@ class Command(BaseCommand):
             action="store_true",
             help="Chỉ hiển thị kết quả mà không cập nhật database",
         )
+        parser.add_argument(
+            "--model",
+            choices=[*BACKFILL_MODELS, "all"],
+            default="checkin",
+            help="Bảng cần cập nhật (mặc định: checkin)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Số dòng đọc/ghi mỗi lần (iterator + bulk_update)",
+        )
+        parser.add_argument(
+            "--range-size",
+            type=int,
+            default=50000,
+            help="Độ rộng mỗi khoảng khóa chính giao cho một worker",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Số process chạy song song (nên dùng với PostgreSQL)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="File lưu tiến độ để chạy tiếp khi bị gián đoạn",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Bỏ qua checkpoint cũ và chạy lại từ đầu",
+        )
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
+        model_names = (
+            list(BACKFILL_MODELS) if options["model"] == "all" else [options["model"]]
+        )
+        if options["chunk_size"] <= 0 or options["range_size"] <= 0:
+            raise CommandError("--chunk-size và --range-size phải lớn hơn 0")
 
-        self.stdout.write("Đang cập nhật địa điểm cho các check-in...")
-
-        checkins = Checkin.objects.all()
-        updated_count = 0
-        not_found_count = 0
-
-        for checkin in checkins:
-            # Tìm địa điểm gần nhất dựa trên tọa độ
-            location_name, distance = find_best_location_for_checkin(checkin.lat, checkin.lng)
-
-            if location_name != "Không xác định" and distance is not None:
-                # Find location object
-                from apps.location.models import Location
-                location = Location.objects.filter(name=location_name, is_active=True).first()
-                
-                if not dry_run and location:
-                    checkin.location = location
-                    checkin.distance_m = distance
-                    checkin.save()
+        for model_name in model_names:
+            checkpoint = options["checkpoint"]
+            if checkpoint and len(model_names) > 1:
+                checkpoint = f"{checkpoint}.{model_name}"
 
-                updated_count += 1
-                self.stdout.write(
-                    f'Check-in {checkin.id}: {checkin.location.name if checkin.location else "Không có"} -> {location_name} '
-                    f"(khoảng cách: {distance:.2f}m)"
-                )
-            else:
-                not_found_count += 1
+            backfill = LocationBackfill(
+                model_name=model_name,
+                chunk_size=options["chunk_size"],
+                range_size=options["range_size"],
+                workers=options["workers"],
+                dry_run=dry_run,
+                checkpoint_path=checkpoint,
+            )
+            if backfill.workers < options["workers"]:
                 self.stdout.write(
-                    f"Check-in {checkin.id}: Không tìm thấy địa điểm phù hợp"
+                    self.style.WARNING(
+                        "SQLite không hỗ trợ ghi song song, chạy 1 worker"
+                    )
                 )
+            if options["restart"]:
+                backfill.clear_checkpoint()
+
+            self.stdout.write(f"Đang cập nhật địa điểm cho {model_name}...")
+            summary = backfill.run(on_progress=self._report_progress)
+            self._report_summary(model_name, summary, dry_run)
+
+    def _report_progress(self, result, done, total):
+        self.stdout.write(
+            f"[{done}/{total}] id {result.start}-{result.end - 1}: "
+            f"quét {result.scanned}, khớp {result.matched}, "
+            f"cập nhật {result.updated}"
+        )
 
+    def _report_summary(self, model_name, summary, dry_run):
         if dry_run:
             self.stdout.write(
                 self.style.WARNING(
                     f"\nDRY RUN - Không có thay đổi nào được lưu\n"
-                    f"Tổng cộng: {checkins.count()} check-in\n"
-                    f"Sẽ cập nhật: {updated_count}\n"
-                    f"Không tìm thấy địa điểm: {not_found_count}"
+                    f"Tổng cộng: {summary.scanned} {model_name}\n"
+                    f"Sẽ cập nhật: {summary.updated}\n"
+                    f"Không tìm thấy địa điểm: {summary.unmatched}"
                 )
             )
         else:
             self.stdout.write(
                 self.style.SUCCESS(
                     f"\nHoàn thành!\n"
-                    f"Tổng cộng: {checkins.count()} check-in\n"
-                    f"Đã cập nhật: {updated_count}\n"
-                    f"Không tìm thấy địa điểm: {not_found_count}"
+                    f"Tổng cộng: {summary.scanned} {model_name}\n"
+                    f"Đã cập nhật: {summary.updated}\n"
+                    f"Không tìm thấy địa điểm: {summary.unmatched}"
                 )
             )
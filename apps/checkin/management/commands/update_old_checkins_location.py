@@ -3,10 +3,9 @@ Management command to update old check-ins with location_id based on coordinates
 """
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 
+from apps.checkin.backfill import LocationBackfill
 from apps.checkin.models import Checkin
-from apps.checkin.utils import haversine_m
 from apps.location.models import Location
 
 
@@ -24,23 +23,37 @@ class Command(BaseCommand):
             type=int,
             help="Specific location ID to assign to check-ins",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows read/written per batch",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of parallel worker processes",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Progress file used to resume an interrupted run",
+        )
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
         specific_location_id = options.get("location_id")
 
         # Get check-ins without location_id
-        checkins_without_location = Checkin.objects.filter(location__isnull=True)
+        missing_count = Checkin.objects.filter(location__isnull=True).count()
 
-        if not checkins_without_location.exists():
+        if not missing_count:
             self.stdout.write(
                 self.style.SUCCESS("No check-ins found without location_id")
             )
             return
 
-        self.stdout.write(
-            f"Found {checkins_without_location.count()} check-ins without location_id"
-        )
+        self.stdout.write(f"Found {missing_count} check-ins without location_id")
 
         # Get all active locations
         locations = Location.objects.filter(is_active=True)
@@ -52,12 +65,11 @@ class Command(BaseCommand):
         self.stdout.write(f"Found {locations.count()} active locations")
 
         # If specific location ID provided, use only that location
+        location_ids = None
         if specific_location_id:
             try:
-                target_location = Location.objects.get(
-                    id=specific_location_id, is_active=True
-                )
-                locations = [target_location]
+                target_location = locations.get(id=specific_location_id)
+                location_ids = [target_location.id]
                 self.stdout.write(f"Using specific location: {target_location.name}")
             except Location.DoesNotExist:
                 self.stdout.write(
@@ -67,66 +79,36 @@ class Command(BaseCommand):
                 )
                 return
 
-        updated_count = 0
-        not_updated_count = 0
-
-        with transaction.atomic():
-            for checkin in checkins_without_location:
-                if not checkin.lat or not checkin.lng:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Check-in {checkin.id} has no coordinates, skipping"
-                        )
-                    )
-                    not_updated_count += 1
-                    continue
-
-                # Find the closest location within radius
-                best_location = None
-                min_distance = float("inf")
-
-                for location in locations:
-                    distance = haversine_m(
-                        location.lat, location.lng, checkin.lat, checkin.lng
-                    )
-
-                    # Check if check-in is within location's radius
-                    if distance <= location.radius_m and distance < min_distance:
-                        best_location = location
-                        min_distance = distance
-
-                if best_location:
-                    if not dry_run:
-                        checkin.location = best_location
-                        checkin.save(update_fields=["location"])
-
-                    self.stdout.write(
-                        f'{"[DRY RUN] " if dry_run else ""}Check-in {checkin.id}: '
-                        f"Assigned to {best_location.name} (distance: {min_distance:.2f}m)"
-                    )
-                    updated_count += 1
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Check-in {checkin.id}: No location found within radius "
-                            f"(coordinates: {checkin.lat}, {checkin.lng})"
-                        )
-                    )
-                    not_updated_count += 1
+        backfill = LocationBackfill(
+            model_name="checkin",
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            only_missing=True,
+            location_ids=location_ids,
+            dry_run=dry_run,
+            checkpoint_path=options["checkpoint"],
+        )
+        summary = backfill.run(
+            on_progress=lambda result, done, total: self.stdout.write(
+                f'{"[DRY RUN] " if dry_run else ""}[{done}/{total}] '
+                f"ids {result.start}-{result.end - 1}: "
+                f"{result.matched} assigned, {result.unmatched} unassigned"
+            )
+        )
 
         # Summary
         if dry_run:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"\n[DRY RUN] Would update {updated_count} check-ins, "
-                    f"{not_updated_count} would remain unassigned"
+                    f"\n[DRY RUN] Would update {summary.matched} check-ins, "
+                    f"{summary.unmatched} would remain unassigned"
                 )
             )
         else:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"\nUpdated {updated_count} check-ins, "
-                    f"{not_updated_count} remain unassigned"
+                    f"\nUpdated {summary.matched} check-ins, "
+                    f"{summary.unmatched} remain unassigned"
                 )
             )
 
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkin', '0004_checkout'),
+        ('location', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkin',
+            name='location_name',
+            field=models.CharField(blank=True, help_text='Tên địa điểm được khớp tại thời điểm check-in', max_length=120),
+        ),
+        migrations.AddField(
+            model_name='checkout',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='location.location'),
+        ),
+        migrations.AddField(
+            model_name='checkout',
+            name='location_name',
+            field=models.CharField(blank=True, help_text='Tên địa điểm được khớp tại thời điểm check-out', max_length=120),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("checkin", "0005_checkin_location_snapshot"),
+        ("location", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="checkin",
+            index=models.Index(
+                fields=["user", "-created_at"], name="checkin_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="checkin",
+            index=models.Index(
+                fields=["location", "-created_at"], name="checkin_loc_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="checkin",
+            index=models.Index(fields=["created_at"], name="checkin_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="checkout",
+            index=models.Index(
+                fields=["user", "-created_at"], name="checkout_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="checkout",
+            index=models.Index(
+                fields=["checkin", "-created_at"], name="checkout_ci_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="checkout",
+            index=models.Index(fields=["created_at"], name="checkout_created_idx"),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("checkin", "0006_checkin_checkout_created_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="checkin",
+            name="photo_processed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Thời điểm ảnh được thu nhỏ và tạo thumbnail",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="checkin",
+            name="photo_thumbnail",
+            field=models.ImageField(
+                blank=True,
+                help_text="Thumbnail tạo bởi checkin.process_photo",
+                upload_to="checkins/thumbs/%Y/%m/%d/",
+            ),
+        ),
+        migrations.AddField(
+            model_name="checkout",
+            name="photo_processed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Thời điểm ảnh được thu nhỏ và tạo thumbnail",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="checkout",
+            name="photo_thumbnail",
+            field=models.ImageField(
+                blank=True,
+                help_text="Thumbnail tạo bởi checkin.process_photo",
+                upload_to="checkouts/thumbs/%Y/%m/%d/",
+            ),
+        ),
+    ]
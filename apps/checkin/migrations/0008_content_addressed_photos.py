@@ -0,0 +1,50 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:46
+
+import apps.common.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("checkin", "0007_photo_thumbnails"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="checkin",
+            name="photo",
+            field=models.ImageField(
+                storage=apps.common.storage.get_content_addressed_storage,
+                upload_to="checkins/%Y/%m/%d/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="checkin",
+            name="photo_thumbnail",
+            field=models.ImageField(
+                blank=True,
+                help_text="Thumbnail tạo bởi checkin.process_photo",
+                storage=apps.common.storage.get_content_addressed_storage,
+                upload_to="checkins/thumbs/%Y/%m/%d/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="checkout",
+            name="photo",
+            field=models.ImageField(
+                storage=apps.common.storage.get_content_addressed_storage,
+                upload_to="checkouts/%Y/%m/%d/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="checkout",
+            name="photo_thumbnail",
+            field=models.ImageField(
+                blank=True,
+                help_text="Thumbnail tạo bởi checkin.process_photo",
+                storage=apps.common.storage.get_content_addressed_storage,
+                upload_to="checkouts/thumbs/%Y/%m/%d/",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("checkin", "0008_content_addressed_photos"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="checkin",
+            name="photo_error",
+            field=models.CharField(
+                blank=True,
+                help_text="Lỗi khi xử lý ảnh (ảnh lỗi không được xử lý lại)",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="checkout",
+            name="photo_error",
+            field=models.CharField(
+                blank=True,
+                help_text="Lỗi khi xử lý ảnh (ảnh lỗi không được xử lý lại)",
+                max_length=255,
+            ),
+        ),
+    ]
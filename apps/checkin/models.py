@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
 
+from apps.common.storage import get_content_addressed_storage
+
 
 class CheckinType(models.TextChoices):
     WORK = "1", "Chấm công"
@@ -19,7 +21,29 @@ class Checkin(models.Model):
     address = models.TextField(
         blank=True, help_text="Địa chỉ được lấy từ reverse geocoding"
     )
-    photo = models.ImageField(upload_to="checkins/%Y/%m/%d/")
+    location_name = models.CharField(
+        max_length=120,
+        blank=True,
+        help_text="Tên địa điểm được khớp tại thời điểm check-in",
+    )
+    # Lưu theo nội dung (blobs/...), upload_to chỉ còn quyết định phần mở rộng
+    photo = models.ImageField(
+        upload_to="checkins/%Y/%m/%d/", storage=get_content_addressed_storage
+    )
+    photo_thumbnail = models.ImageField(
+        upload_to="checkins/thumbs/%Y/%m/%d/",
+        storage=get_content_addressed_storage,
+        blank=True,
+        help_text="Thumbnail tạo bởi checkin.process_photo",
+    )
+    photo_processed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Thời điểm ảnh được thu nhỏ và tạo thumbnail"
+    )
+    photo_error = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Lỗi khi xử lý ảnh (ảnh lỗi không được xử lý lại)",
+    )
     note = models.CharField(max_length=255, blank=True)
     checkin_type = models.CharField(
         max_length=1,
@@ -36,6 +60,15 @@ class Checkin(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Check-in"
         verbose_name_plural = "Check-ins"
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"], name="checkin_user_created_idx"
+            ),
+            models.Index(
+                fields=["location", "-created_at"], name="checkin_loc_created_idx"
+            ),
+            models.Index(fields=["created_at"], name="checkin_created_idx"),
+        ]
         permissions = [
             # Checkin management permissions
             ("can_manage_checkins", "Can manage checkins"),
@@ -55,6 +88,8 @@ class Checkin(models.Model):
 
     def get_location_name(self):
         """Lấy tên địa điểm"""
+        if self.location_name:
+            return self.location_name
         if self.location:
             return self.location.name
         return "Địa điểm không xác định"
@@ -72,12 +107,37 @@ class Checkout(models.Model):
         related_name="checkouts",
         help_text="Checkin tương ứng với checkout này",
     )
+    location = models.ForeignKey(
+        "location.Location", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    location_name = models.CharField(
+        max_length=120,
+        blank=True,
+        help_text="Tên địa điểm được khớp tại thời điểm check-out",
+    )
     lat = models.FloatField()
     lng = models.FloatField()
     address = models.TextField(
         blank=True, help_text="Địa chỉ được lấy từ reverse geocoding"
     )
-    photo = models.ImageField(upload_to="checkouts/%Y/%m/%d/")
+    # Lưu theo nội dung (blobs/...), upload_to chỉ còn quyết định phần mở rộng
+    photo = models.ImageField(
+        upload_to="checkouts/%Y/%m/%d/", storage=get_content_addressed_storage
+    )
+    photo_thumbnail = models.ImageField(
+        upload_to="checkouts/thumbs/%Y/%m/%d/",
+        storage=get_content_addressed_storage,
+        blank=True,
+        help_text="Thumbnail tạo bởi checkin.process_photo",
+    )
+    photo_processed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Thời điểm ảnh được thu nhỏ và tạo thumbnail"
+    )
+    photo_error = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Lỗi khi xử lý ảnh (ảnh lỗi không được xử lý lại)",
+    )
     note = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     distance_m = models.FloatField(null=True, blank=True)
@@ -88,6 +148,15 @@ class Checkout(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Check-out"
         verbose_name_plural = "Check-outs"
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"], name="checkout_user_created_idx"
+            ),
+            models.Index(
+                fields=["checkin", "-created_at"], name="checkout_ci_created_idx"
+            ),
+            models.Index(fields=["created_at"], name="checkout_created_idx"),
+        ]
         permissions = [
             # Checkout management permissions
             ("can_manage_checkouts", "Can manage checkouts"),
@@ -0,0 +1,115 @@
+"""
+Xử lý ảnh check-in/checkout ngoài request
+
+Ảnh gốc từ điện thoại (3-8 MB) được thu nhỏ về tối đa PHOTO_MAX_SIZE và nén
+lại JPEG, đồng thời tạo thumbnail cố định THUMBNAIL_SIZE cho các trang danh
+sách. Chạy bằng background task `checkin.process_photo` được xếp hàng khi tạo
+check-in/checkout (xem CheckinService). Ảnh không đọc được bị ghi lỗi vào
+photo_error và không được xử lý lại.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+PHOTO_MAX_SIZE = (1600, 1600)
+PHOTO_QUALITY = 82
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 75
+
+# Lỗi của chính file ảnh (hỏng, không phải ảnh, quá nhiều pixel)
+PHOTO_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def _encode_jpeg(image, quality):
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _jpeg_name(name, suffix=""):
+    root, _ = os.path.splitext(os.path.basename(name))
+    return f"{root}{suffix}.jpg"
+
+
+def process_photo(instance):
+    """
+    Thu nhỏ ảnh gốc và tạo thumbnail cho một Checkin/Checkout
+
+    Ghi kết quả bằng UPDATE (không gọi save() để không chạy lại signal).
+
+    Returns:
+        bool: False nếu không có ảnh, ảnh đã được xử lý hoặc đã bị ghi lỗi
+
+    Raises:
+        PHOTO_ERRORS: ảnh không đọc được (lỗi đã được ghi vào photo_error)
+    """
+    if not instance.photo or instance.photo_processed_at or instance.photo_error:
+        return False
+
+    storage = instance.photo.storage
+    original_name = instance.photo.name
+    try:
+        with instance.photo.open("rb") as f:
+            image = Image.open(f)
+            # JPEG: giải mã thẳng ở độ phân giải nhỏ hơn khi có thể
+            image.draft("RGB", PHOTO_MAX_SIZE)
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except PHOTO_ERRORS as e:
+        mark_photo_failed(instance, e)
+        raise
+
+    photo = image.copy()
+    photo.thumbnail(PHOTO_MAX_SIZE, Image.LANCZOS)
+    thumbnail = ImageOps.fit(image, THUMBNAIL_SIZE, Image.LANCZOS)
+
+    photo_name = os.path.join(os.path.dirname(original_name), _jpeg_name(original_name))
+    thumbnail_name = instance._meta.get_field("photo_thumbnail").generate_filename(
+        instance, _jpeg_name(original_name, "_thumb")
+    )
+    photo_name = storage.save(photo_name, _encode_jpeg(photo, PHOTO_QUALITY))
+    thumbnail_name = storage.save(
+        thumbnail_name, _encode_jpeg(thumbnail, THUMBNAIL_QUALITY)
+    )
+
+    values = {
+        "photo": photo_name,
+        "photo_thumbnail": thumbnail_name,
+        "photo_processed_at": timezone.now(),
+    }
+    type(instance).objects.filter(pk=instance.pk).update(**values)
+    for attr, value in values.items():
+        setattr(instance, attr, value)
+
+    if original_name != photo_name:
+        storage.delete(original_name)
+    return True
+
+
+def mark_photo_failed(instance, error):
+    """Ghi lỗi xử lý ảnh để hàng đợi và lệnh backfill bỏ qua dòng này"""
+    logger.warning(
+        "Cannot process photo of %s %s: %s", type(instance).__name__, instance.pk, error
+    )
+    instance.photo_error = (str(error) or type(error).__name__)[:255]
+    type(instance).objects.filter(pk=instance.pk).update(
+        photo_error=instance.photo_error
+    )
+
+
+def thumbnail_url(instance):
+    """URL thumbnail, quay về ảnh gốc khi chưa xử lý xong"""
+    try:
+        if instance.photo_thumbnail:
+            return instance.photo_thumbnail.url
+        if instance.photo:
+            return instance.photo.url
+    except Exception:
+        pass
+    return None
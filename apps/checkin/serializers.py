@@ -2,13 +2,43 @@
 Serializers for checkin module
 """
 
+from django.db.models import Prefetch
+
 from rest_framework import serializers
 
 from .checkout_serializers import CheckoutListSerializer, CheckoutSerializer
 from .models import Checkin, Checkout
+from .photos import thumbnail_url
 from .utils import get_location_name_for_checkin, find_best_location_for_checkin
 
 
+def get_latest_checkout(checkin):
+    """
+    Lấy checkout mới nhất của checkin
+
+    Dùng dữ liệu đã nạp trước bởi CheckinListSerializer.setup_eager_loading
+    nếu có, tránh một truy vấn cho mỗi dòng.
+    """
+    prefetched = getattr(checkin, "prefetched_checkouts", None)
+    if prefetched is not None:
+        return prefetched[0] if prefetched else None
+    return checkin.checkouts.first()
+
+
+def serialize_checkout_summary(checkout):
+    """Dữ liệu checkout rút gọn đi kèm checkin"""
+    return {
+        'id': checkout.id,
+        'lat': checkout.lat,
+        'lng': checkout.lng,
+        'address': checkout.address,
+        'note': checkout.note,
+        'created_at': checkout.created_at.isoformat(),
+        'distance_m': checkout.distance_m,
+        'photo_url': thumbnail_url(checkout),
+    }
+
+
 class CheckinSerializer(serializers.ModelSerializer):
     """Serializer for Checkin model"""
 
@@ -66,15 +96,15 @@ class CheckinSerializer(serializers.ModelSerializer):
         return value
 
     def get_location_name(self, obj):
-        """Get location name based on lat/lng coordinates"""
+        """Get location name stored at write time"""
         return get_location_name_for_checkin(obj)
     
     def get_distance_m(self, obj):
-        """Get distance dynamically based on current locations"""
-        if obj.distance_m is not None:
+        """Get distance stored at write time"""
+        if obj.distance_m is not None or obj.location_name:
             return obj.distance_m
         
-        # Calculate distance dynamically if not stored
+        # Legacy rows without a stored match: calculate dynamically
         location_name, distance = find_best_location_for_checkin(obj.lat, obj.lng)
         return distance
 
@@ -88,22 +118,13 @@ class CheckinSerializer(serializers.ModelSerializer):
 
     def get_has_checkout(self, obj):
         """Check if this checkin has a checkout"""
-        return obj.checkouts.exists()
+        return get_latest_checkout(obj) is not None
 
     def get_checkout_data(self, obj):
         """Get checkout data if exists"""
-        checkout = obj.checkouts.first()
+        checkout = get_latest_checkout(obj)
         if checkout:
-            return {
-                'id': checkout.id,
-                'lat': checkout.lat,
-                'lng': checkout.lng,
-                'address': checkout.address,
-                'note': checkout.note,
-                'created_at': checkout.created_at.isoformat(),
-                'distance_m': checkout.distance_m,
-                'photo_url': checkout.photo.url if checkout.photo else None,
-            }
+            return serialize_checkout_summary(checkout)
         return None
 
 
@@ -116,7 +137,7 @@ class CheckinListSerializer(serializers.ModelSerializer):
     user_department_id = serializers.IntegerField(
         source="user.department_id", read_only=True
     )
-    location_id = serializers.IntegerField(source="location.id", read_only=True)
+    location_id = serializers.IntegerField(read_only=True)
     location_name = serializers.SerializerMethodField()
     distance_m = serializers.SerializerMethodField()
     checkin_type_display = serializers.CharField(
@@ -153,43 +174,41 @@ class CheckinListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "user", "created_at", "distance_m"]
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Nạp trước user và checkouts cho cả trang (số truy vấn cố định)"""
+        return queryset.select_related("user").prefetch_related(
+            Prefetch(
+                "checkouts",
+                queryset=Checkout.objects.order_by("-created_at"),
+                to_attr="prefetched_checkouts",
+            )
+        )
+
     def get_location_name(self, obj):
-        """Get location name based on lat/lng coordinates"""
+        """Get location name stored at write time"""
         return get_location_name_for_checkin(obj)
     
     def get_distance_m(self, obj):
-        """Get distance dynamically based on current locations"""
-        if obj.distance_m is not None:
+        """Get distance stored at write time"""
+        if obj.distance_m is not None or obj.location_name:
             return obj.distance_m
         
-        # Calculate distance dynamically if not stored
+        # Legacy rows without a stored match: calculate dynamically
         location_name, distance = find_best_location_for_checkin(obj.lat, obj.lng)
         return distance
 
     def get_photo_url(self, obj):
-        try:
-            if obj.photo:
-                return obj.photo.url
-        except Exception:
-            pass
-        return None
+        """Thumbnail cho trang danh sách (ảnh gốc khi chưa xử lý xong)"""
+        return thumbnail_url(obj)
 
     def get_has_checkout(self, obj):
         """Check if this checkin has a checkout"""
-        return obj.checkouts.exists()
+        return get_latest_checkout(obj) is not None
 
     def get_checkout_data(self, obj):
         """Get checkout data if exists"""
-        checkout = obj.checkouts.first()
+        checkout = get_latest_checkout(obj)
         if checkout:
-            return {
-                'id': checkout.id,
-                'lat': checkout.lat,
-                'lng': checkout.lng,
-                'address': checkout.address,
-                'note': checkout.note,
-                'created_at': checkout.created_at.isoformat(),
-                'distance_m': checkout.distance_m,
-                'photo_url': checkout.photo.url if checkout.photo else None,
-            }
+            return serialize_checkout_summary(checkout)
         return None
@@ -0,0 +1,81 @@
+"""
+Service ghi check-in/checkout
+
+Địa điểm và khoảng cách được khớp một lần (qua chỉ mục không gian) rồi ghi
+cùng lúc với dòng mới, nên mỗi lần submit chỉ có một câu INSERT. Ảnh được thu
+nhỏ và tạo thumbnail sau đó bởi background task `checkin.process_photo`.
+"""
+
+from django.db import transaction
+
+from apps.common.tasks import enqueue
+
+from .models import Checkin, Checkout
+from .utils import UNKNOWN_LOCATION_NAME, find_best_location
+
+
+class CheckinService:
+    """Service tạo check-in/checkout"""
+
+    @staticmethod
+    def resolve_location(lat, lng):
+        """
+        Khớp tọa độ với địa điểm
+
+        Returns:
+            dict: location_id, location_name, distance_m để truyền vào create()
+        """
+        location, distance = find_best_location(lat, lng)
+        if location is None:
+            return {
+                "location_id": None,
+                "location_name": UNKNOWN_LOCATION_NAME,
+                "distance_m": None,
+            }
+        return {
+            "location_id": location.id,
+            "location_name": location.name,
+            "distance_m": distance,
+        }
+
+    @staticmethod
+    def create_checkin(user, lat, lng, photo, request=None, **fields):
+        """Tạo check-in với địa điểm đã khớp trong một lần ghi"""
+        values = CheckinService.resolve_location(lat, lng)
+        values.update(CheckinService._request_meta(request))
+        values.update(fields)
+
+        with transaction.atomic():
+            checkin = Checkin.objects.create(
+                user=user, lat=lat, lng=lng, photo=photo, **values
+            )
+            CheckinService._enqueue_photo(checkin, "checkin")
+        return checkin
+
+    @staticmethod
+    def create_checkout(user, checkin, lat, lng, photo, request=None, **fields):
+        """Tạo checkout cho checkin với địa điểm đã khớp trong một lần ghi"""
+        values = CheckinService.resolve_location(lat, lng)
+        values.update(CheckinService._request_meta(request))
+        values.update(fields)
+
+        with transaction.atomic():
+            checkout = Checkout.objects.create(
+                user=user, checkin=checkin, lat=lat, lng=lng, photo=photo, **values
+            )
+            CheckinService._enqueue_photo(checkout, "checkout")
+        return checkout
+
+    @staticmethod
+    def _enqueue_photo(instance, model):
+        if instance.photo:
+            enqueue("checkin.process_photo", model=model, pk=instance.pk)
+
+    @staticmethod
+    def _request_meta(request):
+        if request is None:
+            return {}
+        return {
+            "ip": request.META.get("REMOTE_ADDR"),
+            "user_agent": request.META.get("HTTP_USER_AGENT", "")[:255],
+        }
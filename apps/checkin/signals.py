@@ -1,31 +1,55 @@
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from apps.common.tasks import enqueue
 from apps.location.models import Location
 
+from .location_index import invalidate_location_index
 from .models import Checkin
 from .utils import haversine_distance
 
 
-@receiver(post_save, sender=Checkin)
-def update_checkin_distance(sender, instance, created, **kwargs):
-    """Cập nhật khoảng cách khi tạo check-in"""
-    if created and instance.location:
-        distance = haversine_distance(
+@receiver(pre_save, sender=Checkin)
+def update_checkin_distance(sender, instance, **kwargs):
+    """Tính khoảng cách trước khi tạo check-in nếu chưa có (không cần save lần 2)"""
+    if instance._state.adding and instance.location_id and instance.distance_m is None:
+        instance.distance_m = haversine_distance(
             instance.location.lat, instance.location.lng, instance.lat, instance.lng
         )
-        instance.distance_m = distance
-        instance.save(update_fields=["distance_m"])
+
+
+@receiver(pre_save, sender=Location)
+def remember_location_coordinates(sender, instance, **kwargs):
+    """Ghi nhớ tọa độ cũ để biết có cần tính lại khoảng cách không"""
+    instance._previous_coordinates = None
+    if instance.pk:
+        instance._previous_coordinates = (
+            Location.objects.filter(pk=instance.pk).values_list("lat", "lng").first()
+        )
 
 
 @receiver(post_save, sender=Location)
 def update_checkins_for_location(sender, instance, created, **kwargs):
-    """Cập nhật khoảng cách cho tất cả check-ins trong địa điểm khi địa điểm thay đổi"""
-    if not created:  # Chỉ cập nhật khi địa điểm được sửa đổi
-        checkins = Checkin.objects.filter(location=instance)
-        for checkin in checkins:
-            distance = haversine_distance(
-                instance.lat, instance.lng, checkin.lat, checkin.lng
-            )
-            checkin.distance_m = distance
-            checkin.save(update_fields=["distance_m"])
+    """Xếp hàng tính lại khoảng cách cho check-ins của địa điểm khi tọa độ thay đổi"""
+    if created:  # Chỉ cập nhật khi địa điểm được sửa đổi
+        return
+
+    previous = getattr(instance, "_previous_coordinates", None)
+    if previous == (instance.lat, instance.lng):
+        return
+
+    enqueue("checkin.recompute_location_distances", location_id=instance.pk)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_index_on_change(sender, instance, **kwargs):
+    """
+    Huỷ chỉ mục địa điểm khi địa điểm được tạo, sửa hoặc xoá
+
+    Huỷ cả sau khi commit: request khác có thể đã dựng lại chỉ mục từ dữ liệu
+    chưa commit trong lúc transaction còn mở.
+    """
+    invalidate_location_index()
+    transaction.on_commit(invalidate_location_index)
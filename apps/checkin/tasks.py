@@ -0,0 +1,95 @@
+"""
+Background task của check-in (xem apps.common.tasks)
+"""
+
+from apps.common.tasks import background_task
+from apps.location.models import Location
+
+from .exports import (
+    cleanup_export_files,
+    export_filename,
+    export_queryset,
+    write_export_file,
+)
+from .models import Checkin, Checkout
+from .photos import PHOTO_ERRORS, process_photo
+from .utils import haversine_expression
+
+PHOTO_MODELS = {"checkin": Checkin, "checkout": Checkout}
+
+RECOMPUTE_CHUNK_SIZE = 5000
+
+
+@background_task("checkin.recompute_location_distances")
+def recompute_location_distances(job, location_id, chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """
+    Tính lại distance_m của check-in/checkout thuộc một địa điểm
+
+    Mỗi chunk theo khóa chính là một câu UPDATE duy nhất với biểu thức
+    Haversine tính trong database, không nạp dòng nào lên Python.
+    """
+    try:
+        location = Location.objects.get(pk=location_id)
+    except Location.DoesNotExist:
+        return {"updated": 0}
+
+    distance = haversine_expression(location.lat, location.lng)
+    querysets = [
+        Checkin.objects.filter(location_id=location_id),
+        Checkout.objects.filter(location_id=location_id),
+    ]
+    total = sum(queryset.count() for queryset in querysets)
+    if job:
+        job.set_progress(0, total)
+
+    updated = 0
+    for queryset in querysets:
+        last_pk = 0
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            updated += queryset.filter(pk__gte=pks[0], pk__lte=pks[-1]).update(
+                distance_m=distance
+            )
+            last_pk = pks[-1]
+            if job:
+                job.set_progress(updated)
+
+    return {"updated": updated}
+
+
+@background_task("checkin.process_photo")
+def process_checkin_photo(job, model, pk):
+    """Thu nhỏ ảnh và tạo thumbnail cho một check-in/checkout (xem photos.py)"""
+    instance = PHOTO_MODELS[model].objects.filter(pk=pk).first()
+    if instance is None:
+        return {"processed": False}
+    try:
+        return {"processed": process_photo(instance)}
+    except PHOTO_ERRORS as e:
+        # Ảnh hỏng: thử lại cũng không được, lỗi đã ghi trên dòng
+        return {"processed": False, "error": instance.photo_error or str(e)}
+
+
+@background_task("checkin.export")
+def export_checkins(job, user_id, params, fmt="xlsx", include_checkout=True):
+    """Xuất check-in ra file cho khoảng dữ liệu lớn (xem exports.py)"""
+    queryset = export_queryset(params)
+    total = queryset.count()
+    if job:
+        job.set_progress(0, total)
+
+    name = export_filename(fmt)
+    if job:
+        name = f"{job.pk}_{name}"
+    stored = write_export_file(queryset, fmt, name, include_checkout)
+    if job:
+        job.set_progress(total)
+    # Dọn luôn các file xuất đã quá hạn giữ lại
+    cleanup_export_files()
+    return {"file": stored, "rows": total, "user_id": user_id}
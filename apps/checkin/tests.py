@@ -2,6 +2,7 @@
 Test cases for checkin app
 """
 
+import os
 from datetime import datetime, timedelta
 
 from django.contrib.auth import get_user_model
@@ -210,3 +211,778 @@ class CheckinUtilsTest(TestCase):
 
         self.assertEqual(location_name, "Không xác định")
         self.assertIsNone(distance)
+
+
+class LocationIndexTest(TestCase):
+    """Test cases for in-memory location index"""
+
+    def setUp(self):
+        """Set up test data"""
+        from .location_index import invalidate_location_index
+
+        invalidate_location_index()
+        self.near = Location.objects.create(
+            name="Near Location",
+            lat=10.762622,
+            lng=106.660172,
+            radius_m=100,
+            is_active=True,
+        )
+        self.wide = Location.objects.create(
+            name="Wide Location",
+            lat=10.763000,
+            lng=106.660500,
+            radius_m=2000,
+            is_active=True,
+        )
+
+    def test_picks_closest_containing_location(self):
+        """Closest location whose radius contains the point wins"""
+        from .utils import find_best_location
+
+        location, distance = find_best_location(10.762622, 106.660172)
+        self.assertEqual(location.id, self.near.id)
+        self.assertLess(distance, 1)
+
+        # Outside the small radius but inside the wide one
+        location, distance = find_best_location(10.770000, 106.660172)
+        self.assertEqual(location.id, self.wide.id)
+        self.assertLess(distance, 2000)
+
+    def test_lookup_uses_no_queries_once_built(self):
+        """Index is built once and reused across lookups"""
+        from .utils import find_best_location_for_checkin
+
+        find_best_location_for_checkin(10.762622, 106.660172)
+        with self.assertNumQueries(0):
+            for _ in range(10):
+                find_best_location_for_checkin(10.762622, 106.660172)
+
+    def test_index_invalidated_on_location_change(self):
+        """Saving or deleting a location rebuilds the index"""
+        from .utils import find_best_location_for_checkin
+
+        self.assertEqual(
+            find_best_location_for_checkin(10.762622, 106.660172)[0], "Near Location"
+        )
+
+        self.near.is_active = False
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.near.save()
+        self.assertEqual(len(callbacks), 1)
+
+        # Chỉ mục dựng lại trước khi commit (dữ liệu cũ) bị huỷ khi commit
+        find_best_location_for_checkin(10.762622, 106.660172)
+        callbacks[0]()
+        self.assertEqual(
+            find_best_location_for_checkin(10.762622, 106.660172)[0], "Wide Location"
+        )
+
+        self.wide.delete()
+        self.assertEqual(
+            find_best_location_for_checkin(10.762622, 106.660172)[0],
+            "Không xác định",
+        )
+
+
+class CheckinLocationSnapshotTest(TestCase):
+    """Test cases for location data stored at write time"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.location = Location.objects.create(
+            name="Test Location",
+            lat=10.762622,
+            lng=106.660172,
+            radius_m=100,
+            is_active=True,
+        )
+
+    def test_list_serializer_reads_stored_location(self):
+        """Serializer returns the stored snapshot, not a fresh geofence match"""
+        from .serializers import CheckinListSerializer
+
+        checkin = Checkin.objects.create(
+            user=self.user,
+            location=self.location,
+            location_name="Test Location",
+            lat=10.762622,
+            lng=106.660172,
+            distance_m=0,
+        )
+
+        # Moving the location must not change already stored rows
+        self.location.lat = 11.0
+        self.location.save()
+
+        data = CheckinListSerializer(Checkin.objects.get(id=checkin.id)).data
+        self.assertEqual(data["location_name"], "Test Location")
+        self.assertEqual(data["location_id"], self.location.id)
+
+    def test_service_creates_checkin_with_single_write(self):
+        """Submit path matches the location and inserts the row exactly once"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from .services import CheckinService
+
+        with CaptureQueriesContext(connection) as ctx:
+            checkin = CheckinService.create_checkin(
+                user=self.user, lat=10.762622, lng=106.660172, photo=None
+            )
+
+        table = Checkin._meta.db_table
+        writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE"))
+            and table in q["sql"].split("(")[0]
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].lstrip().upper().startswith("INSERT"))
+
+        checkin.refresh_from_db()
+        self.assertEqual(checkin.location_id, self.location.id)
+        self.assertEqual(checkin.location_name, "Test Location")
+        self.assertAlmostEqual(checkin.distance_m, 0, places=1)
+
+    def test_service_creates_checkout_without_match(self):
+        """Checkout outside every geofence is stored as unknown location"""
+        from .services import CheckinService
+        from .utils import UNKNOWN_LOCATION_NAME
+
+        checkin = Checkin.objects.create(user=self.user, lat=10.762622, lng=106.660172)
+        checkout = CheckinService.create_checkout(
+            user=self.user, checkin=checkin, lat=21.0, lng=105.8, photo=None
+        )
+
+        self.assertIsNone(checkout.location_id)
+        self.assertEqual(checkout.location_name, UNKNOWN_LOCATION_NAME)
+        self.assertIsNone(checkout.distance_m)
+
+
+class CheckinListApiQueryCountTest(TestCase):
+    """Test cases for query count of check-in list APIs"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def _create_checkins(self, count):
+        for i in range(count):
+            checkin = Checkin.objects.create(
+                user=self.user,
+                location_name="Test Location",
+                lat=10.762622,
+                lng=106.660172,
+            )
+            if i % 2 == 0:
+                Checkout.objects.create(
+                    user=self.user,
+                    checkin=checkin,
+                    location_name="Test Location",
+                    lat=10.762622,
+                    lng=106.660172,
+                )
+
+    def _count_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_history_api_query_count_is_constant(self):
+        """Query count does not grow with the number of rows on the page"""
+        url = reverse("checkin:history_api")
+
+        self._create_checkins(2)
+        small_count, small_data = self._count_queries(url)
+
+        self._create_checkins(8)
+        large_count, large_data = self._count_queries(url)
+
+        self.assertEqual(len(small_data["checkins"]), 2)
+        self.assertEqual(len(large_data["checkins"]), 10)
+        self.assertEqual(small_count, large_count)
+
+        with_checkout = [c for c in large_data["checkins"] if c["has_checkout"]]
+        self.assertEqual(len(with_checkout), 5)
+        self.assertIsNotNone(with_checkout[0]["checkout_data"]["id"])
+
+    def test_list_api_query_count_is_constant(self):
+        """List API batches user and checkout loading"""
+        url = reverse("checkin:list_api")
+
+        self._create_checkins(2)
+        small_count, _ = self._count_queries(url)
+
+        self._create_checkins(8)
+        large_count, _ = self._count_queries(url)
+
+        self.assertEqual(small_count, large_count)
+
+
+class CheckinCursorPaginationTest(TestCase):
+    """Test cases for cursor pagination of the check-in history API"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        checkins = [
+            Checkin.objects.create(user=self.user, lat=10.76, lng=106.66)
+            for _ in range(7)
+        ]
+        # Một số dòng trùng created_at để kiểm tra khoá phụ id
+        same_time = timezone.now() - timedelta(hours=1)
+        Checkin.objects.filter(pk__in=[c.pk for c in checkins[2:5]]).update(
+            created_at=same_time
+        )
+        self.expected = list(
+            Checkin.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.url = reverse("checkin:history_api")
+
+    def test_walks_forward_and_back_without_gaps(self):
+        """Next cursors visit every row once; prev cursor returns the prior page"""
+        seen = []
+        pages = []
+        data = self.client.get(self.url, {"cursor": "", "per_page": 3}).json()
+        while True:
+            pages.append(data)
+            seen.extend(c["id"] for c in data["checkins"])
+            if not data["has_next"]:
+                break
+            data = self.client.get(
+                self.url, {"cursor": data["next_cursor"], "per_page": 3}
+            ).json()
+
+        self.assertEqual(seen, self.expected)
+        self.assertFalse(pages[0]["has_previous"])
+
+        back = self.client.get(
+            self.url, {"cursor": pages[1]["prev_cursor"], "per_page": 3}
+        ).json()
+        self.assertEqual(
+            [c["id"] for c in back["checkins"]],
+            [c["id"] for c in pages[0]["checkins"]],
+        )
+
+    def test_page_size_is_capped_and_total_optional(self):
+        """per_page is bounded and total is only computed on request"""
+        data = self.client.get(self.url, {"cursor": "", "per_page": 100000}).json()
+        self.assertEqual(len(data["checkins"]), 7)
+        self.assertNotIn("total_count", data)
+
+        data = self.client.get(self.url, {"cursor": "", "with_total": "1"}).json()
+        self.assertEqual(data["total_count"], 7)
+        self.assertFalse(data["total_is_approximate"])
+
+    def test_invalid_cursor(self):
+        """Garbage cursors are rejected with 400"""
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_checkout_cursor_uses_same_shape(self):
+        """Checkout cursor pages put paging keys at the top level like check-ins"""
+        checkin = Checkin.objects.get(pk=self.expected[0])
+        for _ in range(3):
+            Checkout.objects.create(
+                user=self.user, checkin=checkin, lat=10.76, lng=106.66
+            )
+
+        url = reverse("checkin:checkout_history_api")
+        data = self.client.get(url, {"cursor": "", "per_page": 2}).json()
+        self.assertEqual(len(data["checkouts"]), 2)
+        self.assertNotIn("pagination", data)
+        self.assertTrue(data["has_next"])
+
+        data = self.client.get(url, {"cursor": data["next_cursor"]}).json()
+        self.assertEqual(len(data["checkouts"]), 1)
+        self.assertFalse(data["has_next"])
+
+
+class LocationBackfillTest(TestCase):
+    """Test cases for the bulk location backfill engine"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.location = Location.objects.create(
+            name="Test Location",
+            lat=10.762622,
+            lng=106.660172,
+            radius_m=100,
+            is_active=True,
+        )
+        self.inside = [
+            Checkin.objects.create(lat=10.762622, lng=106.660172) for _ in range(5)
+        ]
+        self.outside = Checkin.objects.create(lat=10.800000, lng=106.700000)
+
+    def test_backfill_updates_matched_rows(self):
+        """Rows are matched in chunks and written with bulk_update"""
+        from .backfill import LocationBackfill
+        from .utils import UNKNOWN_LOCATION_NAME
+
+        summary = LocationBackfill(chunk_size=2, range_size=2).run()
+
+        self.assertEqual(summary.scanned, 6)
+        self.assertEqual(summary.matched, 5)
+        self.assertEqual(summary.unmatched, 1)
+        for checkin in Checkin.objects.filter(id__in=[c.id for c in self.inside]):
+            self.assertEqual(checkin.location_id, self.location.id)
+            self.assertEqual(checkin.location_name, "Test Location")
+            self.assertLess(checkin.distance_m, 1)
+
+        self.outside.refresh_from_db()
+        self.assertIsNone(self.outside.location_id)
+        self.assertEqual(self.outside.location_name, UNKNOWN_LOCATION_NAME)
+
+    def test_dry_run_does_not_write(self):
+        """Dry run reports counts without touching rows"""
+        from .backfill import LocationBackfill
+
+        summary = LocationBackfill(dry_run=True).run()
+
+        self.assertEqual(summary.updated, 6)
+        self.assertFalse(Checkin.objects.exclude(location_name="").exists())
+
+    def test_resume_skips_completed_ranges(self):
+        """Rows up to the checkpointed pk are not processed again"""
+        import os
+        import tempfile
+
+        from .backfill import LocationBackfill
+
+        checkpoint = os.path.join(tempfile.mkdtemp(), "backfill.json")
+        backfill = LocationBackfill(
+            chunk_size=2, range_size=2, checkpoint_path=checkpoint
+        )
+        last_pk = self.inside[1].pk
+        backfill.save_checkpoint(last_pk)
+        # Xoá dòng trước checkpoint không làm lệch vị trí chạy tiếp
+        self.inside[0].delete()
+
+        summary = backfill.run()
+
+        self.assertEqual(summary.scanned, 4)
+        self.assertFalse(os.path.exists(checkpoint))
+        skipped = Checkin.objects.filter(pk__lte=last_pk)
+        self.assertFalse(skipped.exclude(location_name="").exists())
+
+    def test_location_filter_never_stamps_other_rows(self):
+        """Restricting to some locations leaves rows of other locations alone"""
+        from .backfill import LocationBackfill
+
+        other = Location.objects.create(
+            name="Other Location",
+            lat=10.800000,
+            lng=106.700000,
+            radius_m=100,
+            is_active=True,
+        )
+        far = Checkin.objects.create(lat=11.5, lng=107.5)
+
+        summary = LocationBackfill(location_ids=[self.location.id]).run()
+
+        self.assertEqual(summary.matched, 5)
+        self.outside.refresh_from_db()
+        self.assertIsNone(self.outside.location_id)
+        self.assertEqual(self.outside.location_name, "")
+        far.refresh_from_db()
+        self.assertEqual(far.location_name, "")
+
+        LocationBackfill(location_ids=[other.id]).run()
+        self.outside.refresh_from_db()
+        self.assertEqual(self.outside.location_id, other.id)
+        self.assertEqual(self.outside.location_name, "Other Location")
+
+
+class LocationDistanceRecomputeTest(TestCase):
+    """Test cases for recomputing distances when a location moves"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.location = Location.objects.create(
+            name="Test Location",
+            lat=10.762622,
+            lng=106.660172,
+            radius_m=100,
+            is_active=True,
+        )
+        self.checkins = [
+            Checkin.objects.create(
+                location=self.location, lat=10.762622, lng=106.660172, distance_m=0
+            )
+            for _ in range(3)
+        ]
+
+    def test_moving_location_recomputes_distances_in_background(self):
+        """Distances are recomputed by a set-based background job"""
+        from apps.common.models import BackgroundJob
+
+        from .utils import haversine_distance
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.location.lat = 10.763622
+            self.location.save()
+
+        job = BackgroundJob.objects.get(task="checkin.recompute_location_distances")
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+        self.assertEqual(job.result, {"updated": 3})
+
+        expected = haversine_distance(10.763622, 106.660172, 10.762622, 106.660172)
+        for checkin in Checkin.objects.filter(location=self.location):
+            self.assertAlmostEqual(checkin.distance_m, expected, places=3)
+
+    def test_saving_without_moving_does_not_enqueue(self):
+        """Edits that keep the coordinates do not schedule a job"""
+        from apps.common.models import BackgroundJob
+
+        self.location.name = "Renamed"
+        self.location.save()
+
+        self.assertFalse(BackgroundJob.objects.exists())
+
+
+class CheckinPhotoPipelineTest(TestCase):
+    """Test cases for background photo processing"""
+
+    def setUp(self):
+        """Set up test data"""
+        import shutil
+        import tempfile
+
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(username="testuser")
+
+    def _upload(self, size=(3000, 2000)):
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", size, (200, 120, 40)).save(buffer, "PNG")
+        return SimpleUploadedFile("camera.png", buffer.getvalue(), "image/png")
+
+    def test_photo_is_downscaled_and_thumbnailed_after_commit(self):
+        """The job recompresses the original and the list API uses the thumbnail"""
+        from PIL import Image
+
+        from apps.common.models import MediaBlob
+
+        from .photos import PHOTO_MAX_SIZE, THUMBNAIL_SIZE
+        from .serializers import CheckinListSerializer
+        from .services import CheckinService
+
+        with self.captureOnCommitCallbacks(execute=True):
+            checkin = CheckinService.create_checkin(
+                user=self.user, lat=10.76, lng=106.66, photo=self._upload()
+            )
+            original = checkin.photo.name
+
+        checkin.refresh_from_db()
+        self.assertIsNotNone(checkin.photo_processed_at)
+        self.assertTrue(checkin.photo.name.endswith(".jpg"))
+        self.assertEqual(MediaBlob.objects.get(name=original).ref_count, 0)
+        with Image.open(checkin.photo.path) as photo:
+            self.assertLessEqual(max(photo.size), max(PHOTO_MAX_SIZE))
+        with Image.open(checkin.photo_thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, THUMBNAIL_SIZE)
+
+        data = CheckinListSerializer(checkin).data
+        self.assertEqual(data["photo_url"], checkin.photo_thumbnail.url)
+
+    def test_backfill_command_processes_old_rows(self):
+        """Rows created before the pipeline are processed by the command"""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        checkin = Checkin.objects.create(
+            user=self.user, lat=10.76, lng=106.66, photo=self._upload((800, 600))
+        )
+        call_command("process_checkin_photos", stdout=StringIO())
+
+        checkin.refresh_from_db()
+        self.assertTrue(checkin.photo_thumbnail)
+        self.assertIsNotNone(checkin.photo_processed_at)
+
+    def test_broken_photo_is_marked_and_not_retried(self):
+        """Unreadable images are recorded once and left out of later runs"""
+        from io import StringIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.core.management import call_command
+
+        from apps.common.models import BackgroundJob
+
+        from .services import CheckinService
+
+        broken = SimpleUploadedFile("camera.jpg", b"not an image", "image/jpeg")
+        with self.captureOnCommitCallbacks(execute=True):
+            checkin = CheckinService.create_checkin(
+                user=self.user, lat=10.76, lng=106.66, photo=broken
+            )
+
+        checkin.refresh_from_db()
+        self.assertIsNone(checkin.photo_processed_at)
+        self.assertTrue(checkin.photo_error)
+        job = BackgroundJob.objects.get(task="checkin.process_photo")
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+        self.assertFalse(job.result["processed"])
+
+        stderr = StringIO()
+        call_command("process_checkin_photos", stdout=StringIO(), stderr=stderr)
+        self.assertEqual(stderr.getvalue(), "")
+
+
+class CheckinPhotoUploadTest(TestCase):
+    """Test cases for the size-capped photo upload path"""
+
+    def setUp(self):
+        """Set up test data"""
+        import shutil
+        import tempfile
+
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(
+            MEDIA_ROOT=media_root, CHECKIN_PHOTO_MAX_UPLOAD_SIZE=256 * 1024
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.login(username="testuser", password="pass")
+        self.url = reverse("checkin:submit")
+
+    def _post(self, content, name="camera.jpg", client=None):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        photo = SimpleUploadedFile(name, content, "image/jpeg")
+        return (client or self.client).post(
+            self.url, {"lat": "10.76", "lng": "106.66", "photo": photo}
+        )
+
+    def _jpeg(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", (640, 480), (10, 20, 30)).save(buffer, "JPEG")
+        return buffer.getvalue()
+
+    def test_valid_photo_is_accepted(self):
+        """A small image passes the header check and creates a check-in"""
+        response = self._post(self._jpeg())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["success"])
+        self.assertEqual(Checkin.objects.count(), 1)
+
+    def test_oversized_upload_is_rejected(self):
+        """Uploads over the cap get 413 and nothing is stored"""
+        response = self._post(os.urandom(300 * 1024))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Checkin.objects.exists())
+
+    def test_non_image_is_rejected(self):
+        """Files without a valid image header are rejected"""
+        response = self._post(b"not an image" * 100, name="camera.jpg")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Checkin.objects.exists())
+
+    def test_csrf_is_still_enforced(self):
+        """The upload handler swap keeps CSRF protection"""
+        from django.test import Client
+
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+
+        self.assertEqual(self._post(self._jpeg(), client=client).status_code, 403)
+
+
+class CheckinExportTest(TestCase):
+    """Test cases for the streaming check-in export"""
+
+    def setUp(self):
+        """Set up test data"""
+        import shutil
+        import tempfile
+
+        from django.contrib.auth.models import Permission
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.hr = User.objects.create_user(username="hr", password="pass")
+        self.hr.user_permissions.add(
+            *Permission.objects.filter(
+                codename__in=["can_export_checkin_data", "can_export_checkout_data"]
+            )
+        )
+        self.client.login(username="hr", password="pass")
+
+        self.employee = User.objects.create_user(
+            username="employee", first_name="Văn", last_name="An", employee_id="NV01"
+        )
+        other = User.objects.create_user(username="other")
+        first = Checkin.objects.create(
+            user=self.employee, lat=10.5, lng=106.5, location_name="Văn phòng"
+        )
+        Checkout.objects.create(
+            user=self.employee, checkin=first, lat=10.5, lng=106.5, note="Về"
+        )
+        Checkin.objects.create(user=self.employee, lat=10.6, lng=106.6)
+        Checkin.objects.create(user=other, lat=10.7, lng=106.7)
+        self.url = reverse("checkin:export")
+
+    def _rows(self, response):
+        import csv
+        from io import StringIO
+
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(StringIO(content)))
+
+    def test_csv_is_streamed_with_filters_and_checkouts(self):
+        """Rows follow the list filters and include the checkout pair"""
+        response = self.client.get(
+            self.url, {"format": "csv", "user_id": self.employee.id}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        header, *rows = self._rows(response)
+        self.assertEqual(len(header), 18)
+        self.assertEqual(len(rows), 2)
+        checked_out = [row for row in rows if row[10] == "Đã checkout"]
+        self.assertEqual(len(checked_out), 1)
+        self.assertEqual(checked_out[0][1:4], ["NV01", "Văn An", "Văn phòng"])
+        self.assertEqual(checked_out[0][16], "Về")
+
+    def test_checkin_with_several_checkouts_is_one_row(self):
+        """Only the latest checkout is exported, never one row per checkout"""
+        first = Checkin.objects.get(location_name="Văn phòng")
+        later = Checkout.objects.create(
+            user=self.employee, checkin=first, lat=10.5, lng=106.5, note="Về muộn"
+        )
+        Checkout.objects.filter(pk=later.pk).update(
+            created_at=timezone.now() + timedelta(hours=1)
+        )
+
+        header, *rows = self._rows(
+            self.client.get(self.url, {"format": "csv", "user_id": self.employee.id})
+        )
+
+        self.assertEqual(len(rows), 2)
+        checked_out = [row for row in rows if row[10] == "Đã checkout"]
+        self.assertEqual(len(checked_out), 1)
+        self.assertEqual(checked_out[0][16], "Về muộn")
+
+    def test_checkout_columns_are_fetched_per_chunk(self):
+        """Checkout columns cost one query per chunk, not one per row"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from .exports import export_queryset, export_rows
+
+        for checkin in Checkin.objects.all():
+            Checkout.objects.create(
+                user=checkin.user, checkin=checkin, lat=10.5, lng=106.5
+            )
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(export_rows(export_queryset({})))
+
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row[10] == "Đã checkout" for row in rows))
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_checkout_columns_need_checkout_permission(self):
+        """Users without the checkout export permission get check-in columns only"""
+        from django.contrib.auth.models import Permission
+
+        self.hr.user_permissions.remove(
+            Permission.objects.get(codename="can_export_checkout_data")
+        )
+        header, *rows = self._rows(self.client.get(self.url, {"format": "csv"}))
+
+        self.assertEqual(len(header), 10)
+        self.assertEqual(len(rows), 3)
+
+    def test_xlsx_is_a_valid_workbook(self):
+        """The XLSX stream is a readable zip with one row per check-in"""
+        import zipfile
+        from io import BytesIO
+
+        response = self.client.get(self.url, {"format": "xlsx"})
+        data = b"".join(response.streaming_content)
+
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertEqual(sheet.count("<row "), 4)
+        self.assertIn("Văn phòng", sheet)
+
+    def test_background_export_writes_downloadable_file(self):
+        """Large exports run as a job whose file can be downloaded by its owner"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(
+                self.url, {"format": "csv", "background": "1", "page": "3"}
+            )
+        self.assertEqual(response.status_code, 202)
+
+        status = self.client.get(response.json()["status_url"]).json()
+        self.assertEqual(status["status"], "done")
+
+        download = self.client.get(status["download_url"])
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(len(self._rows(download)), 4)
+
+        self.client.force_login(self.employee)
+        self.assertEqual(self.client.get(status["download_url"]).status_code, 404)
+
+    def test_old_export_files_are_cleaned_up(self):
+        """Export files past the retention period are deleted"""
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        from .exports import EXPORT_DIR, EXPORT_RETENTION, cleanup_export_files
+
+        name = default_storage.save(f"{EXPORT_DIR}/1_old.csv", ContentFile(b"x"))
+
+        self.assertEqual(cleanup_export_files(), 0)
+        later = timezone.now() + EXPORT_RETENTION + timedelta(minutes=1)
+        self.assertEqual(cleanup_export_files(dry_run=True, now=later), 1)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(cleanup_export_files(now=later), 1)
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,118 @@
+"""
+Nhận ảnh check-in/checkout với bộ nhớ cố định
+
+Ảnh luôn được ghi thẳng ra file tạm theo từng chunk (không giữ trong RAM dù nhỏ)
+và bị cắt ngay khi vượt CHECKIN_PHOTO_MAX_UPLOAD_SIZE. Trong request chỉ đọc
+header ảnh để kiểm tra định dạng/kích thước; việc giải mã và nén lại do
+background task `checkin.process_photo` đảm nhận (xem photos.py).
+"""
+
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, UnidentifiedImageError
+
+DEFAULT_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "MPO"}
+
+# Chặn ảnh "bom giải nén": header nhỏ nhưng số pixel rất lớn
+MAX_PIXELS = 40_000_000
+
+# Phần dư cho các trường text đi kèm khi so với Content-Length
+FORM_OVERHEAD = 64 * 1024
+
+
+def max_upload_size():
+    return getattr(settings, "CHECKIN_PHOTO_MAX_UPLOAD_SIZE", DEFAULT_MAX_UPLOAD_SIZE)
+
+
+class PhotoUploadHandler(TemporaryFileUploadHandler):
+    """Ghi file upload ra file tạm, dừng đọc body khi vượt giới hạn dung lượng"""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = max_upload_size()
+        self.received = 0
+        self.too_large = False
+
+    def _stop(self):
+        self.too_large = True
+        if self.request is not None:
+            self.request.photo_too_large = True
+        if getattr(self, "file", None) is not None:
+            self.file.close()
+        # Không đọc nốt phần body còn lại
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        # Biết trước là quá lớn: dừng ở file đầu tiên (ngoại lệ ở đây không được
+        # MultiPartParser bắt)
+        self.too_large = content_length > self.max_size + FORM_OVERHEAD
+
+    def new_file(self, *args, **kwargs):
+        if self.too_large:
+            self._stop()
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self._stop()
+        return super().receive_data_chunk(raw_data, start)
+
+
+def photo_upload(view):
+    """
+    Decorator cho view nhận ảnh: cài PhotoUploadHandler trước khi body được
+    parse, trả 413 khi ảnh vượt giới hạn
+
+    CsrfViewMiddleware đọc request.POST trước view nên phải tắt nó ở ngoài và
+    kiểm tra CSRF bên trong, sau khi đã đổi upload handler.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [PhotoUploadHandler(request)]
+        # Parse body ngay; upload bị cắt giữa chừng thì các trường sau ảnh (có
+        # thể gồm csrf token) bị mất nên phải trả lỗi trước bước kiểm tra CSRF
+        request.POST
+        if getattr(request, "photo_too_large", False):
+            limit = max_upload_size() // (1024 * 1024)
+            return JsonResponse(
+                {"success": False, "error": f"Ảnh vượt quá {limit} MB"}, status=413
+            )
+        return protected(request, *args, **kwargs)
+
+    return wrapper
+
+
+def validate_photo(photo):
+    """
+    Kiểm tra ảnh chỉ bằng header (không giải mã dữ liệu ảnh)
+
+    Raises:
+        ValueError: file không phải ảnh hợp lệ hoặc quá nhiều pixel
+    """
+    position = photo.tell()
+    try:
+        with Image.open(photo) as image:
+            image_format = image.format
+            width, height = image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValueError("File tải lên không phải là ảnh hợp lệ")
+    finally:
+        photo.seek(position)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise ValueError("Định dạng ảnh không được hỗ trợ")
+    if width * height > MAX_PIXELS:
+        raise ValueError("Ảnh có độ phân giải quá lớn")
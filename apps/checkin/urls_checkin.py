@@ -10,6 +10,11 @@ from .checkout_views import (
     checkout_submit_view,
     checkout_success_view,
 )
+from .export_views import (
+    checkin_export_download_view,
+    checkin_export_status_view,
+    checkin_export_view,
+)
 from .views import (
     checkin_action_view,
     checkin_history_api,
@@ -38,6 +43,14 @@ urlpatterns = [
     path("api/", checkin_list_api, name="list_api"),
     path("api/history/", checkin_history_api, name="history_api"),
     path("api/user-info/", checkin_user_info_api, name="user_info_api"),
+    # Xuất dữ liệu
+    path("export/", checkin_export_view, name="export"),
+    path("export/<int:job_id>/", checkin_export_status_view, name="export_status"),
+    path(
+        "export/<int:job_id>/download/",
+        checkin_export_download_view,
+        name="export_download",
+    ),
     # Check-out views
     path("checkout/", checkout_action_view, name="checkout"),
     path("checkout/submit/", checkout_submit_view, name="checkout_submit"),
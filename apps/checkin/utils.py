@@ -1,6 +1,12 @@
 from math import atan2, cos, radians, sin, sqrt
 
-from apps.location.models import Location
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from .location_index import get_location_index
+
+# Tên hiển thị khi tọa độ không nằm trong địa điểm nào
+UNKNOWN_LOCATION_NAME = "Không xác định"
 
 
 def haversine_distance(lat1, lon1, lat2, lon2):
@@ -27,56 +33,74 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return distance
 
 
-def find_best_location_for_checkin(checkin_lat, checkin_lng):
+def haversine_expression(lat, lng, lat_field="lat", lng_field="lng"):
     """
-    Tìm location phù hợp nhất cho một checkin dựa trên tọa độ lat/lng
+    Biểu thức SQL tính khoảng cách Haversine (mét) từ điểm (lat, lng) tới
+    tọa độ lưu trong các cột lat_field/lng_field, dùng cho update() hàng loạt
+    """
+    R = 6371000
+    lat1 = radians(lat)
+    lat2 = Radians(F(lat_field))
+    dlat = lat2 - Value(lat1, output_field=FloatField())
+    dlon = Radians(F(lng_field)) - Value(radians(lng), output_field=FloatField())
 
-    Args:
-        checkin_lat (float): Vĩ độ của checkin
-        checkin_lng (float): Kinh độ của checkin
+    a = Power(Sin(dlat / 2), 2) + Value(cos(lat1), output_field=FloatField()) * Cos(
+        lat2
+    ) * Power(Sin(dlon / 2), 2)
+    return Value(2 * R, output_field=FloatField()) * ASin(Sqrt(a))
+
+
+# Tên cũ vẫn được dùng ở một số nơi (Location.contains_point, seed_demo)
+haversine_m = haversine_distance
+
+
+def find_best_location(checkin_lat, checkin_lng):
+    """
+    Tìm địa điểm phù hợp nhất (qua chỉ mục không gian) cho tọa độ lat/lng
 
     Returns:
-        tuple: (location_name, distance_m) hoặc ("Không xác định", None) nếu không tìm thấy
+        tuple: (IndexedLocation, distance_m) hoặc (None, None) nếu không tìm thấy
     """
     if not checkin_lat or not checkin_lng:
-        return "Không xác định", None
+        return None, None
 
-    # Lấy tất cả locations đang hoạt động
-    active_locations = Location.objects.filter(is_active=True)
+    return get_location_index().find_best(checkin_lat, checkin_lng)
 
-    if not active_locations.exists():
-        return "Không xác định", None
 
-    best_location = None
-    best_distance = float("inf")
+def find_best_location_for_checkin(checkin_lat, checkin_lng):
+    """
+    Tìm location phù hợp nhất cho một checkin dựa trên tọa độ lat/lng
 
-    # Tìm location gần nhất trong phạm vi radius
-    for location in active_locations:
-        distance = haversine_distance(
-            checkin_lat, checkin_lng, location.lat, location.lng
-        )
+    Args:
+        checkin_lat (float): Vĩ độ của checkin
+        checkin_lng (float): Kinh độ của checkin
 
-        # Chỉ xem xét locations trong phạm vi radius
-        if distance <= location.radius_m:
-            if distance < best_distance:
-                best_distance = distance
-                best_location = location
+    Returns:
+        tuple: (location_name, distance_m) hoặc ("Không xác định", None) nếu không tìm thấy
+    """
+    location, distance = find_best_location(checkin_lat, checkin_lng)
 
-    if best_location:
-        return best_location.name, best_distance
+    if location:
+        return location.name, distance
     else:
-        return "Không xác định", None
+        return UNKNOWN_LOCATION_NAME, None
 
 
 def get_location_name_for_checkin(checkin):
     """
-    Lấy tên location cho một checkin object
+    Lấy tên location cho một checkin/checkout object
+
+    Ưu tiên tên đã lưu lúc ghi; chỉ khớp lại theo tọa độ với bản ghi cũ
+    chưa có tên địa điểm.
 
     Args:
-        checkin: Checkin object
+        checkin: Checkin hoặc Checkout object
 
     Returns:
         str: Tên location hoặc "Không xác định"
     """
+    if checkin.location_name:
+        return checkin.location_name
+
     location_name, _ = find_best_location_for_checkin(checkin.lat, checkin.lng)
     return location_name
@@ -1,5 +1,3 @@
-from datetime import datetime
-
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.db.models import Q
@@ -9,13 +7,23 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 
+from apps.common.pagination import (
+    InvalidCursor,
+    is_cursor_request,
+    paginate_request,
+    parse_page_size,
+)
 from apps.location.models import Location
+from apps.users.avatars import avatar_url
 from apps.users.models import User
 from apps.users.permissions import permission_required
 
+from .filters import filter_checkins
 from .models import Checkin
+from .photos import thumbnail_url
 from .serializers import CheckinListSerializer
-from .utils import find_best_location_for_checkin, haversine_distance
+from .services import CheckinService
+from .uploads import photo_upload, validate_photo
 
 
 @login_required
@@ -30,6 +38,7 @@ def checkin_action_view(request):
 
 @login_required
 @require_http_methods(["POST"])
+@photo_upload
 def checkin_submit_view(request):
     """Xử lý submit check-in"""
     try:
@@ -48,40 +57,22 @@ def checkin_submit_view(request):
             return JsonResponse(
                 {"success": False, "error": "Vui lòng chụp ảnh"}, status=400
             )
-        # Tự động tìm địa điểm gần nhất dựa trên tọa độ
-        location_name, distance = find_best_location_for_checkin(lat, lng)
-
-        # Lấy location object nếu có (để lưu vào DB cho backward compatibility)
-        location = None
-        if location_name != "Không xác định":
-            try:
-                location = Location.objects.filter(
-                    name=location_name, is_active=True
-                ).first()
-            except Location.DoesNotExist:
-                pass
-
-        # Tạo check-in
-        checkin = Checkin.objects.create(
+        try:
+            validate_photo(photo)
+        except ValueError as e:
+            return JsonResponse({"success": False, "error": str(e)}, status=400)
+        # Khớp địa điểm và tạo check-in trong một lần ghi
+        checkin = CheckinService.create_checkin(
             user=request.user,
-            location=location,  # Có thể là None
             lat=lat,
             lng=lng,
-            address=address,
             photo=photo,
+            request=request,
+            address=address,
             note=note,
             checkin_type=checkin_type,
-            ip=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
         )
 
-        # Tính khoảng cách
-        if location:
-            checkin.distance_m = haversine_distance(
-                location.lat, location.lng, lat, lng
-            )
-            checkin.save()
-
         # New pretty URL: /checkin/success/checkin_id/<id>/
         redirect_url = reverse("checkin:success", kwargs={"checkin_id": checkin.id})
 
@@ -89,9 +80,9 @@ def checkin_submit_view(request):
             {
                 "success": True,
                 "checkin_id": checkin.id,
-                "location_name": (location.name if location else "Không xác định"),
-                "location_id": location.id if location else None,
-                "distance": distance if distance else checkin.distance_m,
+                "location_name": checkin.location_name,
+                "location_id": checkin.location_id,
+                "distance": checkin.distance_m,
                 "redirect_url": redirect_url,
             }
         )
@@ -119,7 +110,7 @@ def checkin_success_view(request, checkin_id):
                 "%d/%m/%Y %H:%M:%S"
             ),
             "note": checkin.note or "",
-            "photo_url": (checkin.photo.url if checkin.photo else None),
+            "photo_url": thumbnail_url(checkin),
         }
         context = {
             "checkin": checkin,
@@ -160,43 +151,15 @@ def checkin_history_view(request):
 @permission_required("checkin.can_view_all_checkins")
 def checkin_list_view(request):
     """Danh sách check-in cho quản lý"""
-    checkins = Checkin.objects.select_related("user").order_by("-created_at")
-
-    # Filtering
+    checkins = filter_checkins(
+        Checkin.objects.select_related("user").order_by("-created_at"), request.GET
+    )
     search = request.GET.get("search", "")
     location_id = request.GET.get("location_id", "")
     user_id = request.GET.get("user_id", "")
     date_from = request.GET.get("date_from", "")
     date_to = request.GET.get("date_to", "")
 
-    if search:
-        checkins = checkins.filter(
-            Q(user__first_name__icontains=search)
-            | Q(user__last_name__icontains=search)
-            | Q(user__username__icontains=search)
-            | Q(note__icontains=search)
-        )
-
-    if location_id:
-        checkins = checkins.filter(location_id=location_id)
-
-    if user_id:
-        checkins = checkins.filter(user_id=user_id)
-
-    if date_from:
-        try:
-            date_from = datetime.strptime(date_from, "%Y-%m-%d").date()
-            checkins = checkins.filter(created_at__date__gte=date_from)
-        except ValueError:
-            pass
-
-    if date_to:
-        try:
-            date_to = datetime.strptime(date_to, "%Y-%m-%d").date()
-            checkins = checkins.filter(created_at__date__lte=date_to)
-        except ValueError:
-            pass
-
     # Pagination
     paginator = Paginator(checkins, 50)
     page_number = request.GET.get("page")
@@ -224,7 +187,9 @@ def checkin_list_view(request):
 @login_required
 def checkin_list_api(request):
     """API danh sách check-in"""
-    checkins = Checkin.objects.select_related("user").order_by("-created_at")
+    checkins = CheckinListSerializer.setup_eager_loading(
+        Checkin.objects.order_by("-created_at")
+    )
 
     # Filtering
     search = request.GET.get("search", "")
@@ -245,12 +210,21 @@ def checkin_list_api(request):
     if user_id:
         checkins = checkins.filter(user_id=user_id)
 
+    # Phân trang theo con trỏ (infinite scroll), không COUNT/OFFSET
+    if is_cursor_request(request):
+        try:
+            page = paginate_request(request, checkins)
+        except InvalidCursor:
+            return JsonResponse({"error": "Cursor không hợp lệ"}, status=400)
+
+        serializer = CheckinListSerializer(page.items, many=True)
+        return JsonResponse({"checkins": serializer.data, **page.as_dict()})
+
     # Pagination
-    page = int(request.GET.get("page", 1))
-    per_page = int(request.GET.get("per_page", 20))
+    per_page = parse_page_size(request.GET.get("per_page"), 20)
 
     paginator = Paginator(checkins, per_page)
-    page_obj = paginator.get_page(page)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     serializer = CheckinListSerializer(page_obj, many=True)
 
@@ -258,7 +232,7 @@ def checkin_list_api(request):
         {
             "checkins": serializer.data,
             "total_pages": paginator.num_pages,
-            "current_page": page,
+            "current_page": page_obj.number,
             "total_count": paginator.count,
         }
     )
@@ -270,7 +244,9 @@ def checkin_history_api(request):
         return JsonResponse({"error": "Authentication required"}, status=401)
 
     # Chỉ lấy check-in của user hiện tại
-    checkins = Checkin.objects.filter(user=request.user).order_by("-created_at")
+    checkins = CheckinListSerializer.setup_eager_loading(
+        Checkin.objects.filter(user=request.user).order_by("-created_at")
+    )
 
     # Filtering
     search = request.GET.get("search", "")
@@ -284,12 +260,21 @@ def checkin_history_api(request):
     if location_id:
         checkins = checkins.filter(location_id=location_id)
 
+    # Phân trang theo con trỏ (infinite scroll), không COUNT/OFFSET
+    if is_cursor_request(request):
+        try:
+            page = paginate_request(request, checkins)
+        except InvalidCursor:
+            return JsonResponse({"error": "Cursor không hợp lệ"}, status=400)
+
+        serializer = CheckinListSerializer(page.items, many=True)
+        return JsonResponse({"checkins": serializer.data, **page.as_dict()})
+
     # Pagination
-    page = int(request.GET.get("page", 1))
-    per_page = int(request.GET.get("per_page", 20))
+    per_page = parse_page_size(request.GET.get("per_page"), 20)
 
     paginator = Paginator(checkins, per_page)
-    page_obj = paginator.get_page(page)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
     serializer = CheckinListSerializer(page_obj, many=True)
 
@@ -297,7 +282,7 @@ def checkin_history_api(request):
         {
             "checkins": serializer.data,
             "total_pages": paginator.num_pages,
-            "current_page": page,
+            "current_page": page_obj.number,
             "total_count": paginator.count,
         }
     )
@@ -320,7 +305,7 @@ def checkin_user_info_api(request):
         "department": (
             request.user.department.name if request.user.department else None
         ),
-        "avatar": request.user.avatar.url if request.user.avatar else None,
+        "avatar": avatar_url(request.user, 96),
         "is_active": request.user.is_active,
     }
 
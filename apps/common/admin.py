@@ -0,0 +1,37 @@
+from django.contrib import admin
+
+from .models import BackgroundJob, MediaBlob
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "task",
+        "status",
+        "progress_percent",
+        "attempts",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "task"]
+    search_fields = ["task"]
+    readonly_fields = [
+        "progress_current",
+        "progress_total",
+        "result",
+        "error",
+        "attempts",
+        "created_at",
+        "started_at",
+        "finished_at",
+    ]
+    ordering = ["-created_at"]
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ["digest", "name", "size", "ref_count", "updated_at"]
+    list_filter = ["ref_count"]
+    search_fields = ["digest", "name"]
+    readonly_fields = ["digest", "name", "size", "created_at", "updated_at"]
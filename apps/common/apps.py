@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class CommonConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.common"
+    verbose_name = "Hệ thống"
+
+    def ready(self):
+        # Nạp các module tasks.py để đăng ký background task
+        autodiscover_modules("tasks")
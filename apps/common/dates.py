@@ -0,0 +1,40 @@
+"""
+Lọc theo ngày bằng khoảng thời gian nửa mở [start, end)
+
+`created_at__date=...` ép DB tính ngày cho từng dòng nên không dùng được index
+trên created_at. Các helper dưới đây chuyển ngày (theo TIME_ZONE) thành khoảng
+datetime có timezone để truy vấn dùng được index.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def day_start(date):
+    """Thời điểm 00:00 của ngày theo timezone hiện tại"""
+    return timezone.make_aware(
+        datetime.combine(date, time.min), timezone.get_current_timezone()
+    )
+
+
+def day_bounds(start_date, end_date=None):
+    """Khoảng [start, end) bao trọn các ngày từ start_date đến end_date"""
+    end_date = end_date or start_date
+    return day_start(start_date), day_start(end_date + timedelta(days=1))
+
+
+def date_range_q(field, date_from=None, date_to=None):
+    """
+    Q lọc field (DateTimeField) trong các ngày từ date_from đến date_to
+
+    Tương đương field__date__gte=date_from và field__date__lte=date_to,
+    bỏ qua cận nào là None.
+    """
+    q = Q()
+    if date_from:
+        q &= Q(**{f"{field}__gte": day_start(date_from)})
+    if date_to:
+        q &= Q(**{f"{field}__lt": day_start(date_to + timedelta(days=1))})
+    return q
@@ -0,0 +1,176 @@
+"""
+Ghi file xuất dữ liệu dạng luồng (CSV, XLSX)
+
+Các writer nhận header và một iterator các dòng (list giá trị) và trả về
+generator các khối bytes, dùng trực tiếp cho StreamingHttpResponse hoặc ghi
+ra file. Bộ nhớ không phụ thuộc số dòng: XLSX được nén dần vào một file zip
+ghi tuần tự (không cần seek) với các ô chuỗi inline, không cần openpyxl.
+
+Chuỗi bắt đầu bằng ký tự công thức (=, +, -, @, tab, CR) được thêm dấu ' phía
+trước để Excel không chạy nội dung do người dùng nhập (CSV/formula injection).
+"""
+
+import csv
+import re
+import zipfile
+from itertools import chain
+from xml.sax.saxutils import escape
+
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Số dòng gom lại trước khi đẩy một khối ra ngoài
+FLUSH_ROWS = 500
+
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_formula(value):
+    """Vô hiệu hoá chuỗi mà Excel sẽ hiểu là công thức"""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File giả cho csv.writer: write() trả lại chính dòng vừa ghi"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    """Generator bytes CSV (UTF-8 có BOM để Excel đọc đúng tiếng Việt)"""
+    writer = csv.writer(_Echo())
+    buffer = ["﻿"]
+    for i, row in enumerate(chain([header], rows), 1):
+        buffer.append(writer.writerow([escape_formula(value) for value in row]))
+        if i % FLUSH_ROWS == 0:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+    yield "".join(buffer).encode("utf-8")
+
+
+class _ZipSink:
+    """Đích ghi chỉ-ghi-tiếp cho ZipFile, lấy dần các bytes đã nén ra"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/></Relationships>'
+    ),
+}
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+    'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    "<sheetData>"
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+# Ký tự điều khiển không hợp lệ trong XML 1.0
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value):
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_INVALID_XML_CHARS.sub("", escape_formula(str(value))))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number, row):
+    cells = "".join(_xlsx_cell(value) for value in row)
+    return f'<row r="{number}">{cells}</row>'.encode("utf-8")
+
+
+def xlsx_stream(header, rows, sheet_name="Sheet1"):
+    """Generator bytes của file XLSX một sheet, dòng đầu là header"""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr(
+            "xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name[:31]))
+        )
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(_SHEET_HEAD.encode("utf-8"))
+            for i, row in enumerate(chain([header], rows), 1):
+                f.write(_xlsx_row(i, row))
+                if i % FLUSH_ROWS == 0:
+                    yield sink.drain()
+            f.write(_SHEET_TAIL.encode("utf-8"))
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    "csv": (csv_stream, CSV_CONTENT_TYPE),
+    "xlsx": (xlsx_stream, XLSX_CONTENT_TYPE),
+}
+
+
+def export_stream(fmt, header, rows, **kwargs):
+    """
+    Generator bytes theo định dạng `fmt`
+
+    Returns:
+        tuple: (generator, content_type)
+    """
+    writer, content_type = EXPORT_FORMATS[fmt]
+    return writer(header, rows, **kwargs), content_type
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.storage import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = "Đếm lại tham chiếu và xoá các blob media không còn được dùng"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Chỉ xoá blob không còn tham chiếu lâu hơn số giờ này",
+        )
+        parser.add_argument(
+            "--no-recount",
+            action="store_true",
+            help="Bỏ qua bước đếm lại ref_count từ dữ liệu",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Chỉ đếm số blob sẽ bị xoá",
+        )
+
+    def handle(self, *args, **options):
+        if options["grace_hours"] < 0:
+            raise CommandError("--grace-hours không được âm")
+
+        if not options["no_recount"] and not options["dry_run"]:
+            changed = recount_references()
+            self.stdout.write(f"Đã cập nhật ref_count của {changed} blob")
+
+        stats = collect_garbage(
+            grace=timedelta(hours=options["grace_hours"]),
+            dry_run=options["dry_run"],
+        )
+        action = "Sẽ xoá" if options["dry_run"] else "Đã xoá"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{action} {stats['deleted']} blob ({stats['bytes'] / 1024 / 1024:.1f} MB)"
+            )
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.storage import content_addressed_fields, migrate_to_blobs
+
+
+class Command(BaseCommand):
+    help = "Chuyển file media cũ (lưu theo tên client) sang kho blob theo nội dung"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Số dòng đọc mỗi lô",
+        )
+        parser.add_argument(
+            "--keep-originals",
+            action="store_true",
+            help="Không xoá file cũ sau khi chuyển",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Chỉ đếm số file sẽ được chuyển",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        action = "Sẽ chuyển" if options["dry_run"] else "Đã chuyển"
+        for model, field_name in content_addressed_fields():
+            stats = migrate_to_blobs(
+                model,
+                field_name,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+                keep=options["keep_originals"],
+            )
+            self.stdout.write(
+                f"{model._meta.label}.{field_name}: {action.lower()} "
+                f"{stats['migrated']} file, thiếu {stats['missing']} file"
+            )
+        self.stdout.write(self.style.SUCCESS("Hoàn tất"))
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.tasks import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Worker chạy các công việc nền (BackgroundJob) đang chờ"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Chạy hết các job đang đến hạn rồi thoát",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Số giây chờ khi hàng đợi trống",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=0,
+            help="Thoát sau khi chạy N job (0 = không giới hạn)",
+        )
+        parser.add_argument(
+            "--task",
+            action="append",
+            dest="tasks",
+            help="Chỉ chạy task có tên này (có thể lặp lại)",
+        )
+
+    def requeue_stale(self):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(
+                self.style.WARNING(f"Đã xếp lại {requeued} job quá hạn lease")
+            )
+
+    def handle(self, *args, **options):
+        processed = 0
+        self.requeue_stale()
+
+        while True:
+            job = claim_next_job(options["tasks"])
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                self.requeue_stale()
+                continue
+
+            self.stdout.write(f"Đang chạy {job.task} #{job.pk}...")
+            if run_job(job):
+                self.stdout.write(
+                    self.style.SUCCESS(f"Hoàn thành {job.task} #{job.pk}")
+                )
+            else:
+                self.stdout.write(
+                    self.style.ERROR(f"Lỗi {job.task} #{job.pk}: {job.error}")
+                )
+
+            processed += 1
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
+
+        self.stdout.write(f"Đã xử lý {processed} job")
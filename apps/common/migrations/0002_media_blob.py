@@ -0,0 +1,53 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(
+                        help_text="SHA-256 (hex)", max_length=64, unique=True
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Đường dẫn file", max_length=255, unique=True
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Blob media",
+                "verbose_name_plural": "Blob media",
+                "indexes": [
+                    models.Index(
+                        fields=["ref_count", "updated_at"],
+                        name="common_medi_ref_cou_4c3558_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:58
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def lease_running_jobs(apps, schema_editor):
+    """Job đang chạy lúc nâng cấp được giữ thêm một lease mặc định"""
+    BackgroundJob = apps.get_model("common", "BackgroundJob")
+    BackgroundJob.objects.filter(status="running", lease_until__isnull=True).update(
+        lease_until=timezone.now() + timedelta(seconds=900)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_media_blob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backgroundjob",
+            name="lease_until",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Worker giữ job đến thời điểm này, quá hạn thì được xếp lại",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(lease_running_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundJob(models.Model):
+    """Công việc chạy nền (xem apps.common.tasks)"""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Chờ chạy"),
+        (STATUS_RUNNING, "Đang chạy"),
+        (STATUS_DONE, "Hoàn thành"),
+        (STATUS_FAILED, "Lỗi"),
+    ]
+
+    task = models.CharField(max_length=100, help_text="Tên task đã đăng ký")
+    kwargs = models.JSONField(default=dict, blank=True, help_text="Tham số của task")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+
+    # Tiến độ
+    progress_current = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True, help_text="Kết quả trả về")
+    error = models.TextField(blank=True, help_text="Lỗi lần chạy gần nhất")
+
+    # Thử lại
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(
+        default=timezone.now, help_text="Chạy sau thời điểm"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    lease_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Worker giữ job đến thời điểm này, quá hạn thì được xếp lại",
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["task", "status"]),
+        ]
+        verbose_name = "Công việc nền"
+        verbose_name_plural = "Công việc nền"
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def progress_percent(self):
+        """Phần trăm hoàn thành"""
+        if self.status == self.STATUS_DONE:
+            return 100
+        if not self.progress_total:
+            return 0
+        return min(100, round(self.progress_current * 100 / self.progress_total))
+
+    @staticmethod
+    def lease_expiry():
+        """Hạn giữ job tính từ bây giờ (BACKGROUND_JOBS_LEASE_SECONDS)"""
+        seconds = getattr(settings, "BACKGROUND_JOBS_LEASE_SECONDS", 900)
+        return timezone.now() + timedelta(seconds=seconds)
+
+    def set_progress(self, current, total=None):
+        """
+        Cập nhật tiến độ (ghi thẳng xuống DB để theo dõi từ bên ngoài)
+
+        Đồng thời gia hạn lease: task chạy lâu nên báo tiến độ định kỳ.
+        """
+        self.progress_current = current
+        if total is not None:
+            self.progress_total = total
+        if self.pk:
+            self.lease_until = self.lease_expiry()
+            BackgroundJob.objects.filter(pk=self.pk).update(
+                progress_current=self.progress_current,
+                progress_total=self.progress_total,
+                lease_until=self.lease_until,
+            )
+
+    def mark_done(self, result=None):
+        self.status = self.STATUS_DONE
+        self.result = result
+        self.error = ""
+        self.finished_at = timezone.now()
+        self.save(update_fields=["status", "result", "error", "finished_at"])
+
+    def mark_failed(self, error):
+        """Ghi nhận lỗi, hẹn chạy lại với backoff nếu còn lượt"""
+        self.error = str(error)
+        if self.attempts < self.max_attempts:
+            self.status = self.STATUS_PENDING
+            self.run_after = timezone.now() + timedelta(
+                seconds=60 * 2 ** (self.attempts - 1)
+            )
+        else:
+            self.status = self.STATUS_FAILED
+            self.finished_at = timezone.now()
+        self.save(update_fields=["status", "error", "run_after", "finished_at"])
+
+
+class MediaBlob(models.Model):
+    """
+    File media lưu một lần theo SHA-256 nội dung (xem apps.common.storage)
+
+    ref_count là số trường file đang trỏ tới blob; blob về 0 chỉ bị xoá bởi
+    lệnh `gc_media_blobs` sau thời gian chờ.
+    """
+
+    digest = models.CharField(max_length=64, unique=True, help_text="SHA-256 (hex)")
+    name = models.CharField(max_length=255, unique=True, help_text="Đường dẫn file")
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["ref_count", "updated_at"])]
+        verbose_name = "Blob media"
+        verbose_name_plural = "Blob media"
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} tham chiếu)"
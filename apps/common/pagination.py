@@ -0,0 +1,158 @@
+"""
+Phân trang theo con trỏ (keyset) cho các API danh sách
+
+Thay vì COUNT(*) + OFFSET như Paginator, trang kế tiếp được lấy bằng điều kiện
+(created_at, id) < (giá trị của dòng cuối trang trước), nên tốc độ không phụ
+thuộc vào độ sâu trang. Con trỏ trả cho client là chuỗi base64 không cần hiểu.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Đếm tối đa bao nhiêu dòng khi client yêu cầu tổng số gần đúng
+APPROXIMATE_COUNT_LIMIT = 1000
+
+
+class InvalidCursor(ValueError):
+    """Con trỏ không giải mã được"""
+
+
+@dataclass
+class CursorPage:
+    items: list
+    next_cursor: str = None
+    prev_cursor: str = None
+    total: int = None
+    total_is_approximate: bool = False
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def as_dict(self):
+        data = {
+            "next_cursor": self.next_cursor,
+            "prev_cursor": self.prev_cursor,
+            "has_next": self.has_next,
+            "has_previous": self.has_previous,
+        }
+        if self.total is not None:
+            data["total_count"] = self.total
+            data["total_is_approximate"] = self.total_is_approximate
+        return data
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Đọc page size từ query string, giới hạn trong [1, maximum]"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def encode_cursor(obj, direction):
+    payload = json.dumps([obj.created_at.isoformat(), obj.pk, direction])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Trả về (created_at, pk, direction)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = parse_datetime(created_at)
+        if created_at is None or direction not in ("next", "prev"):
+            raise ValueError
+        return created_at, int(pk), direction
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def count_capped(queryset, limit=APPROXIMATE_COUNT_LIMIT):
+    """
+    Đếm nhưng dừng ở limit dòng
+
+    Returns:
+        tuple: (số dòng, True nếu kết quả là gần đúng vì chạm limit)
+    """
+    count = queryset.order_by()[: limit + 1].count()
+    if count > limit:
+        return limit, True
+    return count, False
+
+
+def paginate_by_cursor(
+    queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, with_total=False
+):
+    """
+    Lấy một trang theo thứ tự (-created_at, -id)
+
+    Args:
+        queryset: QuerySet có trường created_at
+        cursor: con trỏ next/prev từ trang trước (None = trang đầu)
+        page_size: số dòng mỗi trang (đã giới hạn bằng parse_page_size)
+        with_total: kèm tổng số dòng (đếm có giới hạn, xem count_capped)
+
+    Raises:
+        InvalidCursor: khi con trỏ không hợp lệ
+    """
+    direction = "next"
+    if cursor:
+        created_at, pk, direction = decode_cursor(cursor)
+        if direction == "next":
+            page_qs = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            ).order_by("-created_at", "-pk")
+        else:
+            page_qs = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            ).order_by("created_at", "pk")
+    else:
+        page_qs = queryset.order_by("-created_at", "-pk")
+
+    rows = list(page_qs[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if direction == "prev":
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    page = CursorPage(items=rows)
+    if rows and has_next:
+        page.next_cursor = encode_cursor(rows[-1], "next")
+    if rows and has_previous:
+        page.prev_cursor = encode_cursor(rows[0], "prev")
+
+    if with_total:
+        page.total, page.total_is_approximate = count_capped(queryset)
+    return page
+
+
+def is_cursor_request(request):
+    """Client chọn chế độ con trỏ bằng tham số cursor (rỗng = trang đầu)"""
+    return "cursor" in request.GET
+
+
+def paginate_request(request, queryset, default_page_size=DEFAULT_PAGE_SIZE):
+    """Phân trang theo con trỏ với cursor, per_page, with_total từ query string"""
+    return paginate_by_cursor(
+        queryset,
+        cursor=request.GET.get("cursor") or None,
+        page_size=parse_page_size(request.GET.get("per_page"), default_page_size),
+        with_total=request.GET.get("with_total") in ("1", "true"),
+    )
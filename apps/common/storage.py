@@ -0,0 +1,216 @@
+"""
+Storage lưu file theo nội dung (content-addressed)
+
+Mỗi file được băm SHA-256 và lưu một lần dưới `blobs/ab/cd/<digest>.<ext>`;
+gửi lại cùng một ảnh (submit bị retry, ảnh dùng lại) chỉ tăng ref_count của
+MediaBlob thay vì ghi thêm file. delete() chỉ giảm ref_count, file thực sự bị
+xoá bởi `python manage.py gc_media_blobs` khi không còn tham chiếu.
+
+File cũ (lưu theo tên client) vẫn đọc/xoá được như FileSystemStorage thường;
+chuyển chúng sang blob bằng `python manage.py migrate_media_to_blobs`.
+"""
+
+import hashlib
+import os
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+BLOB_PREFIX = "blobs/"
+
+_ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".pdf"}
+
+
+def blob_name(digest, name=""):
+    """Đường dẫn blob cho digest, giữ phần mở rộng của tên gốc nếu hợp lệ"""
+    ext = os.path.splitext(name or "")[1].lower()
+    if ext not in _ALLOWED_EXTENSIONS:
+        ext = ""
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def file_digest(content):
+    """(sha256 hex, kích thước) đọc theo chunk"""
+    sha = hashlib.sha256()
+    size = 0
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+        size += len(chunk)
+    return sha.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage lưu mỗi nội dung một lần, đếm tham chiếu bằng MediaBlob"""
+
+    def save(self, name, content, max_length=None):
+        from .models import MediaBlob
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest, size = file_digest(content)
+        with transaction.atomic():
+            blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+                digest=digest, defaults={"name": blob_name(digest, name), "size": size}
+            )
+            # File có thể đã tồn tại từ một transaction bị rollback trước đó
+            if not self.exists(blob.name):
+                content.seek(0)
+                self._save(blob.name, content)
+            MediaBlob.objects.filter(pk=blob.pk).update(
+                ref_count=F("ref_count") + 1, updated_at=timezone.now()
+            )
+        return blob.name
+
+    def delete(self, name):
+        from .models import MediaBlob
+
+        if not is_blob(name):
+            return super().delete(name)
+
+        MediaBlob.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1, updated_at=timezone.now()
+        )
+
+    def purge(self, name):
+        """Xoá hẳn file blob (chỉ dùng cho gc_media_blobs)"""
+        super().delete(name)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def get_content_addressed_storage():
+    """Callable cho tham số `storage` của FileField (migration không lưu instance)"""
+    return content_addressed_storage
+
+
+def content_addressed_fields():
+    """Các (model, tên trường) FileField đang dùng ContentAddressedStorage"""
+    from django.apps import apps
+    from django.db.models import FileField
+
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def recount_references():
+    """
+    Đếm lại ref_count từ dữ liệu thật (các trường dùng storage này)
+
+    Bù cho các trường hợp delete() không được gọi, ví dụ xoá dòng Checkin.
+
+    Returns:
+        int: số blob có ref_count thay đổi
+    """
+    from collections import Counter
+
+    from .models import MediaBlob
+
+    references = Counter()
+    for model, field_name in content_addressed_fields():
+        rows = (
+            model._default_manager.filter(**{f"{field_name}__startswith": BLOB_PREFIX})
+            .values_list(field_name)
+            .annotate(count=models.Count("pk"))
+            .order_by()
+        )
+        for name, count in rows:
+            references[name] += count
+
+    changed = []
+    for blob in MediaBlob.objects.only("pk", "name", "ref_count").iterator():
+        count = references.get(blob.name, 0)
+        if blob.ref_count != count:
+            blob.ref_count = count
+            blob.updated_at = timezone.now()
+            changed.append(blob)
+    MediaBlob.objects.bulk_update(changed, ["ref_count", "updated_at"], batch_size=1000)
+    return len(changed)
+
+
+def collect_garbage(grace=timedelta(hours=24), dry_run=False, now=None):
+    """
+    Xoá các blob không còn tham chiếu quá thời gian chờ `grace`
+
+    Thời gian chờ tránh xoá blob vừa được ghi trong một transaction chưa commit
+    (lúc đó dòng Checkin chưa nhìn thấy được nhưng file đã nằm trên đĩa).
+
+    Returns:
+        dict: số blob và tổng dung lượng đã (hoặc sẽ) xoá
+    """
+    from .models import MediaBlob
+
+    cutoff = (now or timezone.now()) - grace
+    stats = {"deleted": 0, "bytes": 0}
+    candidates = MediaBlob.objects.filter(ref_count=0, updated_at__lt=cutoff)
+    for pk in list(candidates.values_list("pk", flat=True)):
+        with transaction.atomic():
+            blob = (
+                MediaBlob.objects.select_for_update()
+                .filter(pk=pk, ref_count=0, updated_at__lt=cutoff)
+                .first()
+            )
+            if blob is None:
+                continue
+            stats["deleted"] += 1
+            stats["bytes"] += blob.size
+            if not dry_run:
+                content_addressed_storage.purge(blob.name)
+                blob.delete()
+    return stats
+
+
+def migrate_to_blobs(model, field_name, batch_size=200, dry_run=False, keep=False):
+    """
+    Chuyển file cũ (lưu theo tên client) của một trường sang blob
+
+    Returns:
+        dict: số file đã chuyển, bị thiếu trên đĩa
+    """
+    storage = content_addressed_storage
+    stats = {"migrated": 0, "missing": 0}
+    pending = (
+        model._default_manager.exclude(**{field_name: ""})
+        .exclude(**{f"{field_name}__startswith": BLOB_PREFIX})
+        .order_by("pk")
+        .values_list("pk", field_name)
+    )
+    last_pk = 0
+    while True:
+        rows = list(pending.filter(pk__gt=last_pk)[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        for pk, name in rows:
+            if not storage.exists(name):
+                stats["missing"] += 1
+                continue
+            stats["migrated"] += 1
+            if dry_run:
+                continue
+            with transaction.atomic(), storage.open(name, "rb") as f:
+                new_name = storage.save(name, f)
+                model._default_manager.filter(pk=pk, **{field_name: name}).update(
+                    **{field_name: new_name}
+                )
+            if not keep:
+                storage.delete(name)
+    return stats
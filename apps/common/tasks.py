@@ -0,0 +1,124 @@
+"""
+Hàng đợi công việc nền đơn giản dựa trên bảng BackgroundJob
+
+Đăng ký task bằng decorator @background_task("ten.task") trong module tasks.py
+của app, rồi gọi enqueue("ten.task", ...) để xếp hàng. Job được ghi trong cùng
+transaction với dữ liệu gọi nó và chạy bởi lệnh `run_background_jobs`.
+Worker giữ job bằng lease (BackgroundJob.lease_until, gia hạn mỗi lần
+set_progress); job "running" quá hạn lease do worker chết giữa chừng được
+requeue_stale_jobs() xếp lại.
+Khi BACKGROUND_JOBS_EAGER bật (local/test), job chạy ngay sau khi transaction
+commit, không cần worker.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def background_task(name):
+    """Đăng ký hàm func(job, **kwargs) làm background task"""
+
+    def decorator(func):
+        _registry[name] = func
+        func.task_name = name
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Background task not registered: {name}")
+
+
+def enqueue(name, max_attempts=3, **kwargs):
+    """Xếp hàng một job, trả về BackgroundJob vừa tạo"""
+    get_task(name)
+    job = BackgroundJob.objects.create(
+        task=name, kwargs=kwargs, max_attempts=max_attempts
+    )
+    if getattr(settings, "BACKGROUND_JOBS_EAGER", False):
+        transaction.on_commit(lambda: run_job(job))
+    return job
+
+
+def run_job(job):
+    """Chạy một job đã được claim, ghi nhận kết quả hoặc lỗi"""
+    if job.status != BackgroundJob.STATUS_RUNNING:
+        job.status = BackgroundJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.lease_until = BackgroundJob.lease_expiry()
+        job.attempts += 1
+        job.save(update_fields=["status", "started_at", "lease_until", "attempts"])
+
+    try:
+        result = get_task(job.task)(job, **job.kwargs)
+    except Exception as e:
+        logger.exception("Background job %s (%s) failed", job.pk, job.task)
+        job.mark_failed(e)
+        return False
+
+    job.mark_done(result)
+    return True
+
+
+def claim_next_job(tasks=None):
+    """
+    Lấy và đánh dấu đang chạy job kế tiếp đến hạn
+
+    Dùng SELECT ... FOR UPDATE SKIP LOCKED để nhiều worker không lấy trùng job
+    (SQLite bỏ qua khoá dòng, chỉ nên chạy một worker).
+    """
+    with transaction.atomic():
+        queryset = BackgroundJob.objects.select_for_update(skip_locked=True).filter(
+            status=BackgroundJob.STATUS_PENDING, run_after__lte=timezone.now()
+        )
+        if tasks:
+            queryset = queryset.filter(task__in=tasks)
+        job = queryset.order_by("run_after", "id").first()
+        if job is None:
+            return None
+
+        job.status = BackgroundJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.lease_until = BackgroundJob.lease_expiry()
+        job.attempts += 1
+        job.save(update_fields=["status", "started_at", "lease_until", "attempts"])
+        return job
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Xếp lại các job "running" đã quá hạn lease (worker chết giữa chừng)
+
+    Lần chạy dở được tính là một lần thử: còn lượt thì chờ backoff rồi chạy
+    lại, hết lượt thì đánh dấu lỗi.
+
+    Returns:
+        int: số job đã xếp lại hoặc đánh dấu lỗi
+    """
+    now = now or timezone.now()
+    stale = BackgroundJob.objects.filter(
+        status=BackgroundJob.STATUS_RUNNING, lease_until__lt=now
+    )
+    count = 0
+    for pk in list(stale.values_list("pk", flat=True)):
+        with transaction.atomic():
+            job = stale.select_for_update(skip_locked=True).filter(pk=pk).first()
+            if job is None:
+                continue
+            logger.warning("Background job %s (%s) lease expired", job.pk, job.task)
+            job.mark_failed("Worker dừng khi đang chạy job (hết hạn lease)")
+            count += 1
+    return count
@@ -0,0 +1,266 @@
+"""
+Test cases for common app
+"""
+
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .dates import date_range_q
+from .models import BackgroundJob
+from .tasks import (
+    background_task,
+    claim_next_job,
+    enqueue,
+    requeue_stale_jobs,
+    run_job,
+)
+
+calls = []
+
+
+@background_task("common.test_echo")
+def echo_task(job, value):
+    calls.append(value)
+    job.set_progress(1, 1)
+    return {"value": value}
+
+
+@background_task("common.test_fail")
+def failing_task(job):
+    raise RuntimeError("boom")
+
+
+class BackgroundJobTest(TestCase):
+    """Test cases for the background job queue"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_eager_job_runs_after_commit(self):
+        """Eager mode runs the job once the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue("common.test_echo", value=3)
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [3])
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+        self.assertEqual(job.result, {"value": 3})
+        self.assertEqual(job.progress_percent, 100)
+
+    @override_settings(BACKGROUND_JOBS_EAGER=False)
+    def test_worker_claims_pending_job(self):
+        """Deferred jobs wait for the worker to claim them"""
+        job = enqueue("common.test_echo", value=5)
+        self.assertEqual(calls, [])
+
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, BackgroundJob.STATUS_RUNNING)
+        self.assertIsNone(claim_next_job())
+
+        self.assertTrue(run_job(claimed))
+        self.assertEqual(calls, [5])
+
+    @override_settings(BACKGROUND_JOBS_EAGER=False)
+    def test_failed_job_is_retried_then_marked_failed(self):
+        """Failures back off until max_attempts is reached"""
+        job = enqueue("common.test_fail", max_attempts=2)
+
+        self.assertFalse(run_job(claim_next_job()))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_PENDING)
+        self.assertIn("boom", job.error)
+        # Backoff: not due yet
+        self.assertIsNone(claim_next_job())
+
+        self.assertFalse(run_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+
+    @override_settings(BACKGROUND_JOBS_EAGER=False)
+    def test_stale_running_job_is_requeued(self):
+        """A job whose worker died is retried once its lease expires"""
+        job = enqueue("common.test_echo", max_attempts=2, value=7)
+        claimed = claim_next_job()
+        self.assertIsNotNone(claimed.lease_until)
+
+        # Lease still valid: the job is left alone
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+        later = claimed.lease_until + timedelta(seconds=1)
+        self.assertEqual(requeue_stale_jobs(now=later), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_PENDING)
+        self.assertIn("lease", job.error)
+
+        # Second crash uses up the last attempt
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        claimed = claim_next_job()
+        later = claimed.lease_until + timedelta(seconds=1)
+        self.assertEqual(requeue_stale_jobs(now=later), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+
+    def test_unknown_task_is_rejected(self):
+        """Enqueueing an unregistered task fails fast"""
+        with self.assertRaises(LookupError):
+            enqueue("common.does_not_exist")
+
+
+class DateRangeFilterTest(TestCase):
+    """Test cases for half-open date range filters"""
+
+    @override_settings(TIME_ZONE="Asia/Ho_Chi_Minh")
+    def test_matches_date_lookup_in_local_timezone(self):
+        """Range filter selects the same rows as the __date lookup"""
+        User = get_user_model()
+        tz = timezone.get_current_timezone()
+        moments = [
+            datetime(2024, 5, 1, 0, 0),
+            datetime(2024, 5, 1, 23, 59, 59),
+            datetime(2024, 5, 2, 0, 0),
+            datetime(2024, 4, 30, 23, 59, 59),
+        ]
+        for i, moment in enumerate(moments):
+            User.objects.create(
+                username=f"user{i}", date_joined=timezone.make_aware(moment, tz)
+            )
+
+        day = date(2024, 5, 1)
+        for date_from, date_to in [(day, day), (day, None), (None, day)]:
+            expected = User.objects.all()
+            if date_from:
+                expected = expected.filter(date_joined__date__gte=date_from)
+            if date_to:
+                expected = expected.filter(date_joined__date__lte=date_to)
+            actual = User.objects.filter(
+                date_range_q("date_joined", date_from, date_to)
+            )
+            self.assertQuerySetEqual(
+                actual.order_by("id"), expected.order_by("id"), ordered=True
+            )
+
+
+class ContentAddressedStorageTest(TestCase):
+    """Test cases for the deduplicating media store"""
+
+    def setUp(self):
+        """Set up test data"""
+        import shutil
+        import tempfile
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = get_user_model().objects.create_user(username="testuser")
+
+    def _checkin(self, photo):
+        from apps.checkin.models import Checkin
+
+        return Checkin.objects.create(user=self.user, lat=0, lng=0, photo=photo)
+
+    def _photo(self, content=b"same-bytes", name="IMG_0001.JPG"):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return SimpleUploadedFile(name, content, "image/jpeg")
+
+    def test_same_content_is_stored_once(self):
+        """Identical uploads share one blob and count references"""
+        from .models import MediaBlob
+        from .storage import is_blob
+
+        first = self._checkin(self._photo())
+        second = self._checkin(self._photo(name="retry.jpg"))
+        other = self._checkin(self._photo(b"other-bytes"))
+
+        self.assertTrue(is_blob(first.photo.name))
+        self.assertTrue(first.photo.name.endswith(".jpg"))
+        self.assertEqual(first.photo.name, second.photo.name)
+        self.assertNotEqual(first.photo.name, other.photo.name)
+        self.assertEqual(MediaBlob.objects.get(name=first.photo.name).ref_count, 2)
+        with first.photo.open("rb") as f:
+            self.assertEqual(f.read(), b"same-bytes")
+
+    def test_gc_removes_unreferenced_blobs_after_grace(self):
+        """Blobs are purged only when nothing points to them any more"""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .models import MediaBlob
+
+        first = self._checkin(self._photo())
+        second = self._checkin(self._photo())
+        storage, name = first.photo.storage, first.photo.name
+
+        # Xoá dòng không gọi storage.delete(): lệnh gc đếm lại tham chiếu
+        first.delete()
+        call_command("gc_media_blobs", "--grace-hours=0", stdout=StringIO())
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+        self.assertTrue(storage.exists(name))
+
+        second.delete()
+        call_command("gc_media_blobs", stdout=StringIO())
+        self.assertTrue(storage.exists(name))
+
+        call_command("gc_media_blobs", "--grace-hours=0", stdout=StringIO())
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_migrate_moves_legacy_files(self):
+        """Files stored under client names are moved into the blob store"""
+        from io import StringIO
+
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import FileSystemStorage
+        from django.core.management import call_command
+
+        from apps.checkin.models import Checkin
+
+        legacy = FileSystemStorage()
+        legacy_name = legacy.save(
+            "checkins/2024/05/06/IMG_0001.jpg", ContentFile(b"old")
+        )
+        checkin = self._checkin(self._photo(b"old"))
+        Checkin.objects.filter(pk=checkin.pk).update(photo=legacy_name)
+
+        call_command("migrate_media_to_blobs", stdout=StringIO())
+
+        checkin.refresh_from_db()
+        self.assertFalse(legacy.exists(legacy_name))
+        self.assertEqual(
+            checkin.photo.name, self._checkin(self._photo(b"old")).photo.name
+        )
+
+
+class ExportEscapingTest(TestCase):
+    """Test cases for formula injection escaping in exports"""
+
+    def test_formula_cells_are_escaped(self):
+        """User text starting with a formula character is prefixed with '"""
+        import zipfile
+        from io import BytesIO
+
+        from .exports import csv_stream, xlsx_stream
+
+        header = ["Ghi chú", "Số"]
+        rows = [['=HYPERLINK("http://x")', -5], ["@SUM(A1)", 1], ["Bình thường", 2]]
+
+        text = b"".join(csv_stream(header, rows)).decode("utf-8-sig")
+        self.assertIn("'=HYPERLINK", text)
+        self.assertIn("'@SUM(A1)", text)
+        self.assertIn(",-5", text)
+        self.assertIn("Bình thường", text)
+
+        data = b"".join(xlsx_stream(header, rows))
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertIn(">'=HYPERLINK", sheet)
+        self.assertIn(">'@SUM(A1)", sheet)
+        self.assertIn("<v>-5</v>", sheet)
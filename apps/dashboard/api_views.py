@@ -8,10 +8,11 @@ from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
-from apps.checkin.models import Checkin
 from apps.location.models import Location
 from apps.users.models import Department, Office, User
 
+from .rollups import checkin_total_expression, count_checkins
+
 
 @login_required
 @require_http_methods(["GET"])
@@ -39,14 +40,14 @@ def module_data_api(request, module_name):
 
 def get_sales_data(user):
     """Dữ liệu module Sales - dựa trên check-in patterns"""
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
 
     # Simulate sales data based on check-ins
-    daily_checkins = Checkin.objects.filter(created_at__date=today).count()
-    weekly_checkins = Checkin.objects.filter(created_at__date__gte=week_start).count()
-    monthly_checkins = Checkin.objects.filter(created_at__date__gte=month_start).count()
+    daily_checkins = count_checkins(today)
+    weekly_checkins = count_checkins(week_start, today)
+    monthly_checkins = count_checkins(month_start, today)
 
     # Convert check-ins to sales metrics (simulation)
     daily_sales = daily_checkins * 1000  # 1000 VND per check-in
@@ -178,12 +179,12 @@ def get_hr_data(user):
 
 def get_marketing_data(user):
     """Dữ liệu module Marketing - dựa trên check-in patterns"""
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
 
     # Simulate marketing campaigns based on check-ins
-    daily_checkins = Checkin.objects.filter(created_at__date=today).count()
-    weekly_checkins = Checkin.objects.filter(created_at__date__gte=week_start).count()
+    daily_checkins = count_checkins(today)
+    weekly_checkins = count_checkins(week_start, today)
 
     # Marketing metrics simulation
     campaigns = [
@@ -245,9 +246,7 @@ def get_marketing_data(user):
 def get_finance_data(user):
     """Dữ liệu module Finance - dựa trên employee và check-in data"""
     total_employees = User.objects.filter(is_active=True).count()
-    today_checkins = Checkin.objects.filter(
-        created_at__date=timezone.now().date()
-    ).count()
+    today_checkins = count_checkins(timezone.localdate())
 
     # Simulate financial data
     monthly_revenue = total_employees * 50000000  # 50M VND per employee
@@ -309,20 +308,20 @@ def get_finance_data(user):
 
 def get_operations_data(user):
     """Dữ liệu module Operations - dựa trên check-in và area data"""
-    areas = Location.objects.filter(is_active=True)
-    today = timezone.now().date()
+    today = timezone.localdate()
+    areas = Location.objects.filter(is_active=True).annotate(
+        today_checkins=checkin_total_expression(date=today)
+    )
 
     # Operations data based on areas and check-ins
     area_data = []
     for area in areas:
-        area_checkins = Checkin.objects.filter(
-            area=area, created_at__date=today
-        ).count()
         area_data.append(
             {
                 "name": area.name,
-                "checkins": area_checkins,
-                "efficiency": min(100, area_checkins * 10),  # Simulate efficiency
+                "checkins": area.today_checkins,
+                # Simulate efficiency
+                "efficiency": min(100, area.today_checkins * 10),
             }
         )
 
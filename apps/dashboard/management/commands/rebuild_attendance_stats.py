@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Dựng lại bảng thống kê check-in theo ngày (DailyCheckinStat) từ Checkin"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="start",
+            help="Ngày bắt đầu (YYYY-MM-DD), mặc định: toàn bộ lịch sử",
+        )
+        parser.add_argument(
+            "--to",
+            dest="end",
+            help="Ngày kết thúc (YYYY-MM-DD), mặc định: hôm nay",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số dòng tổng hợp ghi mỗi lần",
+        )
+
+    def handle(self, *args, **options):
+        start = self._parse_date(options["start"])
+        end = self._parse_date(options["end"])
+        if start and end and start > end:
+            raise CommandError("--from phải trước hoặc bằng --to")
+
+        self.stdout.write("Đang dựng lại thống kê check-in theo ngày...")
+        created = rebuild_daily_stats(start, end, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Hoàn thành! Đã tạo {created} dòng thống kê")
+        )
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Ngày không hợp lệ: {value}")
@@ -0,0 +1,90 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("location", "0001_initial"),
+        ("users", "0006_office_location"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCheckinStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(help_text="Ngày check-in (theo TIME_ZONE)")),
+                ("checkin_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "department",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Phòng ban của nhân viên tại thời điểm tổng hợp",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="daily_checkin_stats",
+                        to="users.department",
+                    ),
+                ),
+                (
+                    "location",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_checkin_stats",
+                        to="location.location",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_checkin_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Thống kê check-in theo ngày",
+                "verbose_name_plural": "Thống kê check-in theo ngày",
+                "indexes": [
+                    models.Index(
+                        fields=["date", "location"], name="dashboard_d_date_4255b1_idx"
+                    ),
+                    models.Index(
+                        fields=["date", "department"],
+                        name="dashboard_d_date_fa0918_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "date"], name="dashboard_d_user_id_61434e_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailycheckinstat",
+            constraint=models.UniqueConstraint(
+                fields=("date", "user", "location", "department"),
+                name="uniq_daily_checkin_stat",
+            ),
+        ),
+    ]
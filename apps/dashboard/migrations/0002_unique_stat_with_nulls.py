@@ -0,0 +1,51 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:59
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_stats(apps, schema_editor):
+    """Gộp các dòng trùng khoá (có cột NULL) trước khi thêm ràng buộc mới"""
+    DailyCheckinStat = apps.get_model("dashboard", "DailyCheckinStat")
+    key = ["date", "user_id", "location_id", "department_id"]
+    duplicates = (
+        DailyCheckinStat.objects.values(*key)
+        .annotate(rows=Count("id"), keep=Min("id"), total=Sum("checkin_count"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        lookup = {field: row[field] for field in key}
+        DailyCheckinStat.objects.filter(**lookup).exclude(pk=row["keep"]).delete()
+        DailyCheckinStat.objects.filter(pk=row["keep"]).update(
+            checkin_count=row["total"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0001_initial"),
+        ("location", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="dailycheckinstat",
+            name="uniq_daily_checkin_stat",
+        ),
+        migrations.RunPython(merge_duplicate_stats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="dailycheckinstat",
+            constraint=models.UniqueConstraint(
+                models.F("date"),
+                django.db.models.functions.comparison.Coalesce("user", 0),
+                django.db.models.functions.comparison.Coalesce("location", 0),
+                django.db.models.functions.comparison.Coalesce("department", 0),
+                name="uniq_daily_checkin_stat",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+import zoneinfo
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_daily_stats(apps, schema_editor):
+    """
+    Dựng bảng tổng hợp từ check-in đã có (như rebuild_attendance_stats)
+
+    Bỏ qua nếu bảng đã có dữ liệu (đã chạy lệnh rebuild bằng tay).
+    """
+    Checkin = apps.get_model("checkin", "Checkin")
+    DailyCheckinStat = apps.get_model("dashboard", "DailyCheckinStat")
+    if DailyCheckinStat.objects.exists():
+        return
+
+    rows = (
+        Checkin.objects.annotate(
+            day=TruncDate("created_at", tzinfo=zoneinfo.ZoneInfo(settings.TIME_ZONE))
+        )
+        .values("day", "user_id", "location_id", "user__department_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    batch = []
+    for row in rows.iterator():
+        batch.append(
+            DailyCheckinStat(
+                date=row["day"],
+                user_id=row["user_id"],
+                location_id=row["location_id"],
+                department_id=row["user__department_id"],
+                checkin_count=row["total"],
+            )
+        )
+        if len(batch) >= 1000:
+            DailyCheckinStat.objects.bulk_create(batch)
+            batch = []
+    DailyCheckinStat.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0002_unique_stat_with_nulls"),
+        ("checkin", "0003_remove_area_references"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_daily_stats, migrations.RunPython.noop),
+    ]
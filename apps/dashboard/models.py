@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import models
+from django.db.models.functions import Coalesce
+
+
+class DailyCheckinStat(models.Model):
+    """
+    Số check-in đã tổng hợp theo ngày, nhân viên, địa điểm và phòng ban
+
+    Được cập nhật cộng dồn khi tạo/xoá check-in và có thể dựng lại bằng lệnh
+    `rebuild_attendance_stats`. Dashboard đọc từ bảng này thay cho bảng Checkin.
+    """
+
+    date = models.DateField(help_text="Ngày check-in (theo TIME_ZONE)")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="daily_checkin_stats",
+    )
+    location = models.ForeignKey(
+        "location.Location",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="daily_checkin_stats",
+    )
+    department = models.ForeignKey(
+        "users.Department",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="daily_checkin_stats",
+        help_text="Phòng ban của nhân viên tại thời điểm tổng hợp",
+    )
+    checkin_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Thống kê check-in theo ngày"
+        verbose_name_plural = "Thống kê check-in theo ngày"
+        constraints = [
+            # NULL khác NULL trong UNIQUE thường nên gộp NULL về 0 (chạy được
+            # cả SQLite lẫn PostgreSQL < 15, không cần nulls_distinct)
+            models.UniqueConstraint(
+                "date",
+                Coalesce("user", 0),
+                Coalesce("location", 0),
+                Coalesce("department", 0),
+                name="uniq_daily_checkin_stat",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["date", "location"]),
+            models.Index(fields=["date", "department"]),
+            models.Index(fields=["user", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - user {self.user_id} - {self.checkin_count} check-in"
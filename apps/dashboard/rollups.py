@@ -0,0 +1,132 @@
+"""
+Bảng tổng hợp check-in theo ngày cho dashboard
+
+record_checkin() cộng dồn khi có check-in mới (gọi từ signal), còn
+rebuild_daily_stats() dựng lại toàn bộ một khoảng ngày từ bảng Checkin.
+Các hàm đọc bên dưới chỉ truy vấn bảng DailyCheckinStat nên thời gian phản hồi
+không tăng theo số lượng check-in lịch sử.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.checkin.models import Checkin
+from apps.common.dates import day_bounds
+
+from .models import DailyCheckinStat
+
+
+def local_date(value):
+    """Ngày của một thời điểm theo TIME_ZONE hiện tại"""
+    return timezone.localtime(value).date()
+
+
+def _stat_key(checkin):
+    return {
+        "date": local_date(checkin.created_at),
+        "user_id": checkin.user_id,
+        "location_id": checkin.location_id,
+        "department_id": checkin.user.department_id if checkin.user_id else None,
+    }
+
+
+def record_checkin(checkin, delta=1):
+    """Cộng (hoặc trừ khi delta < 0) số check-in vào dòng tổng hợp tương ứng"""
+    key = _stat_key(checkin)
+
+    updated = DailyCheckinStat.objects.filter(**key).update(
+        checkin_count=F("checkin_count") + delta, updated_at=timezone.now()
+    )
+    if delta < 0:
+        DailyCheckinStat.objects.filter(**key, checkin_count__lte=0).delete()
+        return
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            DailyCheckinStat.objects.create(checkin_count=delta, **key)
+    except IntegrityError:
+        # Request khác vừa tạo dòng này
+        DailyCheckinStat.objects.filter(**key).update(
+            checkin_count=F("checkin_count") + delta, updated_at=timezone.now()
+        )
+
+
+def rebuild_daily_stats(start_date=None, end_date=None, batch_size=1000):
+    """
+    Dựng lại bảng tổng hợp từ Checkin cho khoảng ngày (mặc định: toàn bộ)
+
+    Returns:
+        int: số dòng tổng hợp đã tạo
+    """
+    checkins = Checkin.objects.all()
+    stats = DailyCheckinStat.objects.all()
+    if start_date:
+        checkins = checkins.filter(created_at__gte=day_bounds(start_date)[0])
+        stats = stats.filter(date__gte=start_date)
+    if end_date:
+        checkins = checkins.filter(created_at__lt=day_bounds(end_date)[1])
+        stats = stats.filter(date__lte=end_date)
+
+    rows = (
+        checkins.annotate(
+            day=TruncDate("created_at", tzinfo=timezone.get_current_timezone())
+        )
+        .values("day", "user_id", "location_id", "user__department_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+
+    created = 0
+    with transaction.atomic():
+        stats.delete()
+        batch = []
+        for row in rows.iterator():
+            batch.append(
+                DailyCheckinStat(
+                    date=row["day"],
+                    user_id=row["user_id"],
+                    location_id=row["location_id"],
+                    department_id=row["user__department_id"],
+                    checkin_count=row["total"],
+                )
+            )
+            if len(batch) >= batch_size:
+                DailyCheckinStat.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            DailyCheckinStat.objects.bulk_create(batch)
+            created += len(batch)
+
+    return created
+
+
+def count_checkins(start_date, end_date=None, **filters):
+    """Tổng số check-in từ start_date đến end_date (mặc định: chỉ start_date)"""
+    return DailyCheckinStat.objects.filter(
+        date__gte=start_date, date__lte=end_date or start_date, **filters
+    ).aggregate(total=Coalesce(Sum("checkin_count"), 0))["total"]
+
+
+def count_users_checked_in(date, **filters):
+    """Số nhân viên có check-in trong ngày"""
+    return (
+        DailyCheckinStat.objects.filter(date=date, user__isnull=False, **filters)
+        .values("user_id")
+        .distinct()
+        .count()
+    )
+
+
+def checkin_total_expression(prefix="daily_checkin_stats", **date_filters):
+    """
+    Biểu thức annotate tổng check-in qua quan hệ ngược tới DailyCheckinStat
+
+    Ví dụ: Location.objects.annotate(checkin_count=checkin_total_expression())
+    """
+    condition = Q(**{f"{prefix}__{key}": value for key, value in date_filters.items()})
+    return Coalesce(Sum(f"{prefix}__checkin_count", filter=condition or None), 0)
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.checkin.models import Checkin
+
+from .rollups import record_checkin
+
+
+@receiver(post_save, sender=Checkin)
+def add_checkin_to_daily_stats(sender, instance, created, **kwargs):
+    """Cộng check-in mới vào bảng tổng hợp theo ngày"""
+    if created:
+        record_checkin(instance)
+
+
+@receiver(post_delete, sender=Checkin)
+def remove_checkin_from_daily_stats(sender, instance, **kwargs):
+    """Trừ check-in bị xoá khỏi bảng tổng hợp theo ngày"""
+    record_checkin(instance, delta=-1)
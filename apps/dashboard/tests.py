@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.checkin.models import Checkin
+from apps.location.models import Location
+from apps.users.models import Department
+
+from .models import DailyCheckinStat
+from .rollups import (
+    checkin_total_expression,
+    count_checkins,
+    count_users_checked_in,
+    rebuild_daily_stats,
+    record_checkin,
+)
+
+User = get_user_model()
+
+
+class DailyCheckinStatTest(TestCase):
+    """Test cases for the daily check-in rollup table"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.department = Department.objects.create(name="Kinh doanh")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            department=self.department,
+        )
+        self.location = Location.objects.create(
+            name="Test Location",
+            lat=10.762622,
+            lng=106.660172,
+            radius_m=100,
+            is_active=True,
+        )
+
+    def _checkin(self, **kwargs):
+        return Checkin.objects.create(
+            user=self.user,
+            location=self.location,
+            lat=10.762622,
+            lng=106.660172,
+            **kwargs,
+        )
+
+    def test_checkin_updates_rollup_incrementally(self):
+        """Creating and deleting check-ins adjusts the daily counters"""
+        today = timezone.localdate()
+        first = self._checkin()
+        self._checkin()
+
+        stat = DailyCheckinStat.objects.get()
+        self.assertEqual(stat.date, today)
+        self.assertEqual(stat.department, self.department)
+        self.assertEqual(stat.checkin_count, 2)
+        self.assertEqual(count_checkins(today), 2)
+        self.assertEqual(count_checkins(today, user=self.user), 2)
+        self.assertEqual(count_users_checked_in(today), 1)
+
+        first.delete()
+        self.assertEqual(count_checkins(today), 1)
+
+    def test_null_location_and_department_share_one_row(self):
+        """Rows with NULL location/department are still unique per day and user"""
+        self.user.department = None
+        self.user.save()
+        checkin = self._checkin()
+        Checkin.objects.filter(pk=checkin.pk).update(location=None)
+        DailyCheckinStat.objects.all().delete()
+
+        checkin.location = None
+        record_checkin(checkin)
+        record_checkin(checkin)
+
+        stat = DailyCheckinStat.objects.get()
+        self.assertIsNone(stat.location_id)
+        self.assertIsNone(stat.department_id)
+        self.assertEqual(stat.checkin_count, 2)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyCheckinStat.objects.create(
+                date=stat.date, user=self.user, location=None, department=None
+            )
+
+    def test_rebuild_matches_raw_checkins(self):
+        """Rebuilding restores counters, including backdated check-ins"""
+        today = timezone.localdate()
+        self._checkin()
+        old = self._checkin()
+        Checkin.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=3)
+        )
+        DailyCheckinStat.objects.all().delete()
+
+        created = rebuild_daily_stats()
+
+        self.assertEqual(created, 2)
+        self.assertEqual(count_checkins(today), 1)
+        self.assertEqual(count_checkins(today - timedelta(days=7), today), 2)
+
+        location = Location.objects.annotate(
+            checkin_count=checkin_total_expression(date=today)
+        ).get()
+        self.assertEqual(location.checkin_count, 1)
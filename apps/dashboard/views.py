@@ -10,12 +10,18 @@ from apps.location.models import Location
 from apps.users.models import User, UserRole
 from apps.users.permissions import group_required
 
+from .rollups import (
+    checkin_total_expression,
+    count_checkins,
+    count_users_checked_in,
+)
+
 
 @login_required
 def dashboard_main_view(request):
     """Trang chủ tổng quan"""
     user = request.user
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
 
@@ -28,15 +34,15 @@ def dashboard_main_view(request):
     }
 
     # Thống kê check-in hôm nay
-    today_checkins = Checkin.objects.filter(created_at__date=today).count()
+    today_checkins = count_checkins(today)
     context["today_checkins"] = today_checkins
 
     # Thống kê check-in tuần này
-    week_checkins = Checkin.objects.filter(created_at__date__gte=week_start).count()
+    week_checkins = count_checkins(week_start, today)
     context["week_checkins"] = week_checkins
 
     # Thống kê check-in tháng này
-    month_checkins = Checkin.objects.filter(created_at__date__gte=month_start).count()
+    month_checkins = count_checkins(month_start, today)
     context["month_checkins"] = month_checkins
 
     # Thống kê theo vai trò
@@ -64,9 +70,9 @@ def dashboard_main_view(request):
         })
     else:
         # Thống kê cá nhân cho nhân viên
-        user_today_checkins = Checkin.objects.filter(user=user, created_at__date=today).count()
-        user_week_checkins = Checkin.objects.filter(user=user, created_at__date__gte=week_start).count()
-        user_month_checkins = Checkin.objects.filter(user=user, created_at__date__gte=month_start).count()
+        user_today_checkins = count_checkins(today, user=user)
+        user_week_checkins = count_checkins(week_start, today, user=user)
+        user_month_checkins = count_checkins(month_start, today, user=user)
 
         # Check-ins gần đây của user
         user_recent_checkins = (
@@ -93,14 +99,14 @@ def dashboard_main_view(request):
 def dashboard_personal_view(request):
     """Dashboard cá nhân cho nhân viên"""
     user = request.user
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
 
     # Thống kê check-in của nhân viên
-    today_checkins = Checkin.objects.filter(user=user, created_at__date=today).count()
-    week_checkins = Checkin.objects.filter(user=user, created_at__date__gte=week_start).count()
-    month_checkins = Checkin.objects.filter(user=user, created_at__date__gte=month_start).count()
+    today_checkins = count_checkins(today, user=user)
+    week_checkins = count_checkins(week_start, today, user=user)
+    month_checkins = count_checkins(month_start, today, user=user)
 
     # Check-ins gần đây
     recent_checkins = (
@@ -142,7 +148,7 @@ def dashboard_management_view(request):
     if user.role not in [UserRole.ADMIN, UserRole.MANAGER, UserRole.HCNS]:
         return redirect('dashboard:personal')
     
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
 
@@ -151,9 +157,9 @@ def dashboard_management_view(request):
     total_areas = Location.objects.filter(is_active=True).count()
     
     # Thống kê check-in
-    today_checkins = Checkin.objects.filter(created_at__date=today).count()
-    week_checkins = Checkin.objects.filter(created_at__date__gte=week_start).count()
-    
+    today_checkins = count_checkins(today)
+    week_checkins = count_checkins(week_start, today)
+
     # Tính tỷ lệ điểm danh
     attendance_rate = 85  # TODO: Calculate actual attendance rate
     online_employees = 12  # TODO: Calculate online employees
@@ -204,13 +210,11 @@ def dashboard_hr_view(request):
     ).order_by("-employee_count")
 
     # Thống kê check-in
-    today = timezone.now().date()
-    today_checkins = Checkin.objects.filter(created_at__date=today).count()
-    
+    today = timezone.localdate()
+    today_checkins = count_checkins(today)
+
     # Số nhân viên đã check-in hôm nay
-    employees_with_checkin_today = Checkin.objects.filter(
-        created_at__date=today
-    ).values('user').distinct().count()
+    employees_with_checkin_today = count_users_checked_in(today)
 
     # Check-ins gần đây
     recent_checkins = Checkin.objects.select_related("user", "location").order_by(
@@ -237,13 +241,13 @@ def dashboard_secretary_view(request):
     active_areas = Location.objects.filter(is_active=True).count()
 
     # Thống kê check-in
-    today = timezone.now().date()
-    today_checkins = Checkin.objects.filter(created_at__date=today).count()
+    today = timezone.localdate()
+    today_checkins = count_checkins(today)
 
     # Thống kê theo địa điểm
-    area_stats = Location.objects.annotate(checkin_count=Count("checkin")).order_by(
-        "-checkin_count"
-    )
+    area_stats = Location.objects.annotate(
+        checkin_count=checkin_total_expression()
+    ).order_by("-checkin_count")
 
     # Check-ins gần đây
     recent_checkins = Checkin.objects.select_related("user", "location").order_by(
@@ -193,22 +193,23 @@ def employee_statistics_view(request, employee_id):
     from django.utils import timezone
 
     from apps.checkin.models import Checkin
+    from apps.common.dates import date_range_q
 
     # Thống kê check-in
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
 
     today_checkins = Checkin.objects.filter(
-        user=employee, created_at__date=today
+        date_range_q("created_at", today, today), user=employee
     ).count()
 
     week_checkins = Checkin.objects.filter(
-        user=employee, created_at__date__gte=week_start
+        date_range_q("created_at", week_start), user=employee
     ).count()
 
     month_checkins = Checkin.objects.filter(
-        user=employee, created_at__date__gte=month_start
+        date_range_q("created_at", month_start), user=employee
     ).count()
 
     total_checkins = Checkin.objects.filter(user=employee).count()
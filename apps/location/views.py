@@ -168,22 +168,23 @@ def location_statistics_view(request, location_id):
     from django.utils import timezone
 
     from apps.checkin.models import Checkin
+    from apps.common.dates import date_range_q
 
     # Thống kê check-in
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
 
     today_checkins = Checkin.objects.filter(
-        location=location, created_at__date=today
+        date_range_q("created_at", today, today), location=location
     ).count()
 
     week_checkins = Checkin.objects.filter(
-        location=location, created_at__date__gte=week_start
+        date_range_q("created_at", week_start), location=location
     ).count()
 
     month_checkins = Checkin.objects.filter(
-        location=location, created_at__date__gte=month_start
+        date_range_q("created_at", month_start), location=location
     ).count()
 
     total_checkins = Checkin.objects.filter(location=location).count()
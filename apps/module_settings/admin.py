@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 
+from .cache import invalidate_module_settings
 from .models import ModuleSettings
 
 
@@ -67,9 +69,16 @@ class ModuleSettingsAdmin(admin.ModelAdmin):
 
     actions = ["enable_modules", "disable_modules"]
 
+    @staticmethod
+    def _invalidate_cache():
+        """update() không gửi post_save nên phải tự huỷ cache module"""
+        invalidate_module_settings()
+        transaction.on_commit(invalidate_module_settings)
+
     def enable_modules(self, request, queryset):
         """Action để bật các modules được chọn"""
         updated = queryset.update(is_enabled=True)
+        self._invalidate_cache()
         self.message_user(request, f"Đã bật {updated} module(s).")
 
     enable_modules.short_description = "Bật các modules được chọn"
@@ -77,6 +86,7 @@ class ModuleSettingsAdmin(admin.ModelAdmin):
     def disable_modules(self, request, queryset):
         """Action để tắt các modules được chọn"""
         updated = queryset.update(is_enabled=False)
+        self._invalidate_cache()
         self.message_user(request, f"Đã tắt {updated} module(s).")
 
     disable_modules.short_description = "Tắt các modules được chọn"
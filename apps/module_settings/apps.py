@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ModuleSettingsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.module_settings"
+
+    def ready(self):
+        import apps.module_settings.signals
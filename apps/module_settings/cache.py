@@ -0,0 +1,72 @@
+"""
+Cache trạng thái bật/tắt module trong bộ nhớ process
+
+Toàn bộ bảng ModuleSettings (vài dòng) được nạp một lần thành dict
+{module_name: is_enabled} và giữ kèm số phiên bản. Signal post_save/post_delete
+huỷ cache của process hiện tại. Khi MODULE_SETTINGS_SHARED_CACHE bật, số phiên
+bản được lưu ở cache dùng chung (Redis) để các gunicorn worker khác cũng nạp lại.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_CACHE_KEY = "module_settings:version"
+
+# (version, {module_name: is_enabled}) hoặc None khi chưa nạp
+_state = None
+_lock = threading.Lock()
+
+
+def _shared_enabled():
+    return getattr(settings, "MODULE_SETTINGS_SHARED_CACHE", False)
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def _shared_version():
+    """Số phiên bản trên cache dùng chung (tạo mới nếu chưa có)"""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, _new_version(), None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def _load():
+    from .models import ModuleSettings
+
+    return dict(ModuleSettings.objects.values_list("module_name", "is_enabled"))
+
+
+def get_module_states():
+    """Lấy dict {module_name: is_enabled}, chỉ truy vấn DB khi cache hết hiệu lực"""
+    global _state
+
+    version = _shared_version() if _shared_enabled() else None
+    state = _state
+    if state is not None and state[0] == version:
+        return state[1]
+
+    with _lock:
+        if _state is None or _state[0] != version:
+            _state = (version, _load())
+        return _state[1]
+
+
+def invalidate_module_settings():
+    """Huỷ cache của process hiện tại và tăng phiên bản dùng chung"""
+    global _state
+
+    with _lock:
+        _state = None
+
+    if _shared_enabled():
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, _new_version(), None)
@@ -38,9 +38,11 @@ def require_module_enabled(module_name):
 def module_enabled_context_processor(request):
     """
     Context processor để thêm thông tin về modules vào tất cả templates
+
+    Dữ liệu lấy từ cache trong bộ nhớ nên không phát sinh truy vấn DB.
     """
-    enabled_modules = list(ModuleSettings.get_enabled_modules())
-    disabled_modules = list(ModuleSettings.get_disabled_modules())
+    enabled_modules = ModuleSettings.get_enabled_modules()
+    disabled_modules = ModuleSettings.get_disabled_modules()
 
     return {
         "enabled_modules": enabled_modules,
@@ -1,6 +1,5 @@
 from django.http import HttpResponseForbidden
 from django.shortcuts import render
-from django.urls import resolve
 from django.utils.deprecation import MiddlewareMixin
 
 from .models import ModuleSettings
@@ -22,8 +21,8 @@ class ModulePermissionMiddleware(MiddlewareMixin):
         "automation_test:": "automation_test",
     }
 
-    def process_request(self, request):
-        """Kiểm tra quyền truy cập module trước khi xử lý request"""
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Kiểm tra quyền truy cập module trước khi gọi view"""
 
         # Chỉ kiểm tra với authenticated users
         if not request.user.is_authenticated:
@@ -33,16 +32,13 @@ class ModulePermissionMiddleware(MiddlewareMixin):
         if request.user.is_superuser:
             return None
 
-        # Lấy URL name hiện tại
-        try:
-            resolver_match = resolve(request.path)
-            url_name = resolver_match.url_name
-            namespace = resolver_match.namespace
-        except:
+        # Dùng kết quả resolve có sẵn của request, không resolve lại URL
+        resolver_match = request.resolver_match
+        if resolver_match is None:
             return None
 
         # Tạo full URL name
-        full_url_name = f"{namespace}:{url_name}" if namespace else url_name
+        full_url_name = resolver_match.view_name
 
         # Kiểm tra từng module
         for url_prefix, module_name in self.MODULE_URL_MAPPING.items():
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .cache import get_module_states
+
 User = get_user_model()
 
 
@@ -53,22 +55,18 @@ class ModuleSettings(models.Model):
 
     @classmethod
     def is_module_enabled(cls, module_name):
-        """Kiểm tra xem module có được bật hay không"""
-        try:
-            setting = cls.objects.get(module_name=module_name)
-            return setting.is_enabled
-        except cls.DoesNotExist:
-            # Nếu không có setting, mặc định là bật
-            return True
+        """Kiểm tra xem module có được bật hay không (đọc từ cache)"""
+        # Nếu không có setting, mặc định là bật
+        return get_module_states().get(module_name, True)
 
     @classmethod
     def get_enabled_modules(cls):
         """Lấy danh sách các modules được bật"""
-        return cls.objects.filter(is_enabled=True).values_list("module_name", flat=True)
+        return sorted(name for name, enabled in get_module_states().items() if enabled)
 
     @classmethod
     def get_disabled_modules(cls):
         """Lấy danh sách các modules bị tắt"""
-        return cls.objects.filter(is_enabled=False).values_list(
-            "module_name", flat=True
+        return sorted(
+            name for name, enabled in get_module_states().items() if not enabled
         )
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_module_settings
+from .models import ModuleSettings
+
+
+@receiver(post_save, sender=ModuleSettings)
+@receiver(post_delete, sender=ModuleSettings)
+def invalidate_module_settings_on_change(sender, **kwargs):
+    """Huỷ cache module ngay và sau khi transaction commit"""
+    invalidate_module_settings()
+    # Tránh process khác nạp lại dữ liệu cũ trước khi transaction commit
+    transaction.on_commit(invalidate_module_settings)
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import cache as module_cache
+from .decorators import module_enabled_context_processor
+from .models import ModuleSettings
+
+
+class ModuleSettingsCacheTest(TestCase):
+    """Test cases for the in-process module settings cache"""
+
+    def setUp(self):
+        """Set up test data"""
+        module_cache.invalidate_module_settings()
+        ModuleSettings.objects.create(
+            module_name="checkin", display_name="Check-in", is_enabled=True
+        )
+        ModuleSettings.objects.create(
+            module_name="absence", display_name="Absence", is_enabled=False
+        )
+
+    def test_lookups_hit_database_once(self):
+        """Repeated lookups and context processor use the cached table"""
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(5):
+                self.assertTrue(ModuleSettings.is_module_enabled("checkin"))
+                self.assertFalse(ModuleSettings.is_module_enabled("absence"))
+                # Module không có setting mặc định là bật
+                self.assertTrue(ModuleSettings.is_module_enabled("reports"))
+                context = module_enabled_context_processor(None)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(context["enabled_modules"], ["checkin"])
+        self.assertEqual(context["disabled_modules"], ["absence"])
+
+    def test_save_invalidates_cache(self):
+        """Toggling a module is visible on the next lookup"""
+        self.assertFalse(ModuleSettings.is_module_enabled("absence"))
+
+        setting = ModuleSettings.objects.get(module_name="absence")
+        setting.is_enabled = True
+        setting.save()
+
+        self.assertTrue(ModuleSettings.is_module_enabled("absence"))
+
+    @override_settings(MODULE_SETTINGS_SHARED_CACHE=True)
+    def test_shared_version_reloads_other_processes(self):
+        """A version bump from another worker forces a reload"""
+        cache.delete(module_cache.VERSION_CACHE_KEY)
+        self.assertFalse(ModuleSettings.is_module_enabled("absence"))
+
+        # Giả lập worker khác cập nhật DB và tăng phiên bản dùng chung
+        ModuleSettings.objects.filter(module_name="absence").update(is_enabled=True)
+        self.assertFalse(ModuleSettings.is_module_enabled("absence"))
+        cache.incr(module_cache.VERSION_CACHE_KEY)
+
+        self.assertTrue(ModuleSettings.is_module_enabled("absence"))
+
+    def test_admin_bulk_action_reaches_middleware(self):
+        """Enabling modules from the admin changelist is seen immediately"""
+        from django.contrib.auth import get_user_model
+        from django.test import RequestFactory
+        from django.urls import resolve, reverse
+
+        from .middleware import ModulePermissionMiddleware
+
+        User = get_user_model()
+        admin_user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        employee = User.objects.create_user(username="employee")
+        middleware = ModulePermissionMiddleware(lambda request: None)
+
+        def check():
+            request = RequestFactory().get(reverse("absence:list"))
+            request.user = employee
+            request.resolver_match = resolve(request.path)
+            return middleware.process_view(request, None, (), {})
+
+        self.assertEqual(check().status_code, 403)
+
+        self.client.force_login(admin_user)
+        absence = ModuleSettings.objects.get(module_name="absence")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:module_settings_modulesettings_changelist"),
+                {"action": "enable_modules", "_selected_action": [absence.pk]},
+            )
+        self.assertEqual(response.status_code, 302)
+
+        self.assertIsNone(check())
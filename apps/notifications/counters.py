@@ -0,0 +1,136 @@
+"""
+Bộ đếm thông báo chưa đọc theo user
+
+Badge trên header gọi unread-count ở mọi trang; thay vì COUNT(*) trên bảng
+Notification, số chưa đọc được lưu ở NotificationCounter (một dòng mỗi user,
+tra theo khoá chính). Các thay đổi là phép cộng/trừ F() nên an toàn khi nhiều
+request cùng cập nhật. User chưa có dòng đếm sẽ được đếm lại từ bảng Notification
+ở lần đầu cần tới.
+"""
+
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .events import publish_unread_counts
+from .models import Notification, NotificationCounter
+
+User = get_user_model()
+
+
+def count_unread(user_ids):
+    """Đếm trực tiếp từ bảng Notification: {user_id: số chưa đọc}"""
+    rows = (
+        Notification.objects.filter(user_id__in=user_ids, is_read=False)
+        .values("user_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update((row["user_id"], row["count"]) for row in rows)
+    return counts
+
+
+def _create_missing(user_ids):
+    """Tạo dòng đếm (bằng cách đếm lại) cho các user chưa có"""
+    existing = set(
+        NotificationCounter.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", flat=True
+        )
+    )
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        NotificationCounter.objects.bulk_create(
+            [
+                NotificationCounter(user_id=user_id, unread_count=count)
+                for user_id, count in count_unread(missing).items()
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def adjust_unread(deltas):
+    """
+    Cộng/trừ số chưa đọc sau khi thông báo đã được ghi vào DB
+
+    Args:
+        deltas: dict {user_id: số thay đổi}
+
+    User chưa có dòng đếm được đếm lại từ đầu (đã bao gồm thay đổi vừa ghi).
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+
+    now = timezone.now()
+    for delta, user_ids in by_delta.items():
+        updated = NotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread_count=Greatest(F("unread_count") + delta, Value(0)),
+            updated_at=now,
+        )
+        if updated < len(user_ids):
+            _create_missing(user_ids)
+
+    publish_unread_counts([user_id for ids in by_delta.values() for user_id in ids])
+
+
+def track_created(notifications):
+    """Tăng bộ đếm cho các thông báo chưa đọc vừa tạo"""
+    deltas = defaultdict(int)
+    for notification in notifications:
+        if not notification.is_read:
+            deltas[notification.user_id] += 1
+    adjust_unread(deltas)
+
+
+def get_unread_count(user):
+    """Số thông báo chưa đọc (một truy vấn theo khoá chính)"""
+    count = (
+        NotificationCounter.objects.filter(user_id=user.pk)
+        .values_list("unread_count", flat=True)
+        .first()
+    )
+    if count is None:
+        _create_missing([user.pk])
+        count = NotificationCounter.objects.get(user_id=user.pk).unread_count
+    return count
+
+
+def reconcile_counters(batch_size=1000, dry_run=False):
+    """
+    So sánh bộ đếm với số thực tế và sửa các dòng bị lệch
+
+    Returns:
+        list: (user_id, giá trị đang lưu, giá trị đúng) của các dòng bị lệch
+    """
+    user_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+    drifted = []
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start : start + batch_size]
+        actual = count_unread(batch)
+        stored = dict(
+            NotificationCounter.objects.filter(user_id__in=batch).values_list(
+                "user_id", "unread_count"
+            )
+        )
+        fixes = [
+            (user_id, stored.get(user_id), count)
+            for user_id, count in actual.items()
+            if stored.get(user_id, 0) != count
+        ]
+        drifted.extend(fixes)
+        if fixes and not dry_run:
+            NotificationCounter.objects.bulk_create(
+                [
+                    NotificationCounter(user_id=user_id, unread_count=count)
+                    for user_id, _, count in fixes
+                ],
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=["unread_count", "updated_at"],
+            )
+    return drifted
@@ -0,0 +1,160 @@
+"""
+Pub/sub sự kiện thông báo cho luồng SSE
+
+NotificationService và bộ đếm chưa đọc publish sự kiện sau khi transaction
+commit; view `notification_stream` (chạy dưới ASGI) subscribe theo user và đẩy
+sự kiện xuống trình duyệt, thay cho việc poll API định kỳ.
+
+Broker mặc định (InProcessBroker) chỉ phát trong process hiện tại. Khi chạy nhiều
+worker, đặt NOTIFICATION_EVENT_BROKER trỏ tới một lớp cùng interface (publish /
+subscribe) dùng broker dùng chung như Redis pub/sub. Trình duyệt vẫn poll API
+mỗi 60 giây khi stream đang mở (static/js/notifications.js) để không bỏ lỡ sự
+kiện phát từ process khác.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROKER = "apps.notifications.events.InProcessBroker"
+
+# Số sự kiện tối đa chờ cho một kết nối; kết nối quá chậm sẽ bị bỏ bớt sự kiện
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Hàng đợi sự kiện của một kết nối SSE"""
+
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def put(self, event):
+        """Gọi được từ thread bất kỳ"""
+        self.loop.call_soon_threadsafe(self._put_nowait, event)
+
+    def _put_nowait(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping notification event for user %s", self.user_id)
+
+    async def get(self, timeout=None):
+        """Sự kiện kế tiếp, None nếu hết timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Broker trong bộ nhớ process (một worker ASGI)"""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Phải gọi trong event loop của kết nối"""
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker theo setting NOTIFICATION_EVENT_BROKER (khởi tạo một lần)"""
+    global _broker
+
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, "NOTIFICATION_EVENT_BROKER", DEFAULT_BROKER)
+                _broker = import_string(path)()
+    return _broker
+
+
+def _has_subscribers(broker, user_id):
+    # Broker dùng chung không biết subscriber ở process khác: luôn publish
+    check = getattr(broker, "has_subscribers", None)
+    return check is None or check(user_id)
+
+
+def notification_event(notification):
+    return {
+        "type": "notification",
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "notification_type": notification.type,
+        "is_important": notification.is_important,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+def publish_created(notifications):
+    """Publish thông báo mới sau khi transaction commit"""
+    events = [(n.user_id, notification_event(n)) for n in notifications]
+    if events:
+        transaction.on_commit(lambda: _publish(events), robust=True)
+
+
+def publish_unread_counts(user_ids):
+    """Publish số chưa đọc hiện tại của các user sau khi transaction commit"""
+    if user_ids:
+        user_ids = list(user_ids)
+        transaction.on_commit(lambda: _publish_unread_counts(user_ids), robust=True)
+
+
+def _publish(events):
+    broker = get_broker()
+    for user_id, event in events:
+        if _has_subscribers(broker, user_id):
+            broker.publish(user_id, event)
+
+
+def _publish_unread_counts(user_ids):
+    from .models import NotificationCounter
+
+    broker = get_broker()
+    user_ids = [user_id for user_id in user_ids if _has_subscribers(broker, user_id)]
+    if not user_ids:
+        return
+    counts = NotificationCounter.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "unread_count"
+    )
+    for user_id, count in counts:
+        broker.publish(user_id, {"type": "unread_count", "unread_count": count})
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.services import NotificationService
+from apps.users.models import UserRole
+
+
+class Command(BaseCommand):
+    help = "Gửi thông báo hệ thống cho phòng ban, văn phòng, vai trò hoặc toàn công ty"
+
+    def add_arguments(self, parser):
+        parser.add_argument("title", help="Tiêu đề thông báo")
+        parser.add_argument("message", help="Nội dung thông báo")
+        parser.add_argument(
+            "--department",
+            type=int,
+            action="append",
+            dest="departments",
+            help="ID phòng ban (có thể lặp lại)",
+        )
+        parser.add_argument(
+            "--office",
+            type=int,
+            action="append",
+            dest="offices",
+            help="ID văn phòng (có thể lặp lại)",
+        )
+        parser.add_argument(
+            "--role",
+            choices=UserRole.values,
+            action="append",
+            dest="roles",
+            help="Vai trò người nhận (có thể lặp lại)",
+        )
+        parser.add_argument(
+            "--all", action="store_true", dest="all_users", help="Gửi cho tất cả"
+        )
+        parser.add_argument(
+            "--important", action="store_true", help="Đánh dấu quan trọng"
+        )
+        parser.add_argument(
+            "--no-email", action="store_true", help="Không gửi email kèm theo"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số người nhận ghi mỗi lô",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        try:
+            count = NotificationService.send_broadcast_notification(
+                options["title"],
+                options["message"],
+                departments=options["departments"],
+                offices=options["offices"],
+                roles=options["roles"],
+                all_users=options["all_users"],
+                is_important=options["important"],
+                send_email=not options["no_email"],
+                batch_size=options["batch_size"],
+            )
+        except ValueError:
+            raise CommandError(
+                "Chọn ít nhất một --department, --office, --role hoặc --all"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Đã gửi thông báo cho {count} người"))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.retention import (
+    NotificationArchive,
+    expired_q,
+    purge_notifications,
+    read_older_than_q,
+)
+
+
+class Command(BaseCommand):
+    help = "Xoá (và lưu archive) thông báo hết hạn hoặc đã đọc lâu theo từng lô"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--policy",
+            choices=["expired", "read"],
+            default="expired",
+            help="expired: đã hết hạn; read: đã đọc và cũ hơn --days ngày",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Số ngày giữ thông báo đã đọc (dùng với --policy read)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số dòng xoá mỗi lô",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="Số giây nghỉ giữa các lô",
+        )
+        parser.add_argument(
+            "--archive",
+            help="Ghi các dòng bị xoá vào file JSON Lines nén gzip (vd. notifications.jsonl.gz)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Chỉ đếm số thông báo sẽ bị xoá",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+        if options["days"] < 0:
+            raise CommandError("--days không được âm")
+
+        if options["policy"] == "read":
+            condition = read_older_than_q(options["days"])
+        else:
+            condition = expired_q()
+
+        kwargs = {
+            "batch_size": options["batch_size"],
+            "sleep": options["sleep"],
+            "dry_run": options["dry_run"],
+        }
+        if options["archive"] and not options["dry_run"]:
+            with NotificationArchive(options["archive"]) as archive:
+                stats = purge_notifications(condition, archive=archive, **kwargs)
+        else:
+            stats = purge_notifications(condition, **kwargs)
+
+        action = "Sẽ xoá" if options["dry_run"] else "Đã xoá"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{action} {stats['deleted']} thông báo trong {stats['batches']} lô"
+            )
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Đối chiếu bộ đếm thông báo chưa đọc với bảng Notification và sửa chỗ lệch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Số user đối chiếu mỗi lô",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Chỉ liệt kê các bộ đếm bị lệch, không sửa",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        drifted = reconcile_counters(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        for user_id, stored, actual in drifted:
+            self.stdout.write(f"User {user_id}: {stored} -> {actual}")
+
+        action = "Phát hiện" if options["dry_run"] else "Đã sửa"
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(drifted)} bộ đếm bị lệch"))
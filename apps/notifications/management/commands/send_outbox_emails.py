@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.outbox import deliver_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Gửi các email thông báo đang chờ trong outbox (thử lại với backoff khi lỗi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Số email gửi mỗi lô qua một kết nối",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Chạy liên tục như daemon thay vì chạy một lần",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="Số giây nghỉ khi outbox trống (dùng với --loop)",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_pending_emails(batch_size=options["batch_size"])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            self.stdout.write(f"Đã gửi {total_sent} email, lỗi {total_failed}")
+            if not options["loop"]:
+                break
+            total_sent = total_failed = 0
+            time.sleep(options["interval"])
@@ -0,0 +1,95 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "to_email",
+                    models.EmailField(help_text="Địa chỉ nhận", max_length=254),
+                ),
+                ("subject", models.CharField(help_text="Tiêu đề", max_length=255)),
+                ("body", models.TextField(help_text="Nội dung")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Chờ gửi"),
+                            ("sent", "Đã gửi"),
+                            ("failed", "Lỗi"),
+                        ],
+                        default="pending",
+                        help_text="Trạng thái gửi",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, help_text="Số lần đã thử"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(
+                        default=5, help_text="Số lần thử tối đa"
+                    ),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Thời điểm được gửi (thử lại) tiếp theo",
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, help_text="Lỗi gần nhất")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, help_text="Thời gian gửi", null=True
+                    ),
+                ),
+                (
+                    "notification",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Thông báo gốc",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="emails",
+                        to="notifications.notification",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Email chờ gửi",
+                "verbose_name_plural": "Email chờ gửi",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_at"],
+                        name="notificatio_status_1fc719_idx",
+                    )
+                ],
+            },
+        ),
+    ]
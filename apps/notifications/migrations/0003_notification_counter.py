@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_email_outbox"),
+        ("users", "0006_office_location"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_counter",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "unread_count",
+                    models.PositiveIntegerField(default=0, help_text="Số chưa đọc"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Bộ đếm thông báo",
+                "verbose_name_plural": "Bộ đếm thông báo",
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notification_inbox_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailoutbox",
+            name="locked_until",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Worker giữ email đang gửi đến thời điểm này",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="emailoutbox",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Chờ gửi"),
+                    ("sending", "Đang gửi"),
+                    ("sent", "Đã gửi"),
+                    ("failed", "Lỗi"),
+                ],
+                default="pending",
+                help_text="Trạng thái gửi",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 User = get_user_model()
@@ -17,6 +19,7 @@ class Notification(models.Model):
         ("checkin", "Chấm công"),
         ("absence", "Vắng mặt"),
     ]
+    TYPE_DISPLAY = dict(NOTIFICATION_TYPES)
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="Người nhận")
     title = models.CharField(max_length=200, help_text="Tiêu đề")
@@ -46,9 +49,18 @@ class Notification(models.Model):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["user", "is_read"]),
-            models.Index(fields=["user", "type"]),
+            # Hộp thư chưa đọc theo thời gian và chính sách dọn dẹp thông báo đã đọc
+            models.Index(fields=["user", "is_read", "created_at"]),
+            # Hộp thư theo con trỏ (created_at, id), lọc theo loại / quan trọng
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["user", "type", "created_at"]),
+            models.Index(
+                fields=["user", "created_at"],
+                condition=models.Q(is_important=True),
+                name="notification_important_idx",
+            ),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["expires_at"]),
         ]
         verbose_name = "Thông báo"
         verbose_name_plural = "Thông báo"
@@ -59,16 +71,7 @@ class Notification(models.Model):
     @property
     def type_display(self):
         """Hiển thị loại thông báo"""
-        type_map = {
-            "approval_required": "Cần phê duyệt",
-            "approval_completed": "Đã phê duyệt",
-            "approval_rejected": "Bị từ chối",
-            "reminder": "Nhắc nhở",
-            "system": "Hệ thống",
-            "checkin": "Chấm công",
-            "absence": "Vắng mặt",
-        }
-        return type_map.get(self.type, self.type)
+        return self.TYPE_DISPLAY.get(self.type, self.type)
 
     @property
     def is_expired(self):
@@ -78,16 +81,26 @@ class Notification(models.Model):
         return False
 
     def mark_as_read(self):
-        """Đánh dấu đã đọc"""
+        """Đánh dấu đã đọc (giảm bộ đếm chưa đọc của user)"""
+        from .counters import adjust_unread
+
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
+            with transaction.atomic():
+                updated = (
+                    type(self)
+                    .objects.filter(pk=self.pk, is_read=False)
+                    .update(is_read=True, read_at=self.read_at)
+                )
+                adjust_unread({self.user_id: -updated})
 
     @classmethod
     def get_unread_count(cls, user):
-        """Lấy số thông báo chưa đọc của user"""
-        return cls.objects.filter(user=user, is_read=False).count()
+        """Lấy số thông báo chưa đọc của user (từ NotificationCounter)"""
+        from .counters import get_unread_count
+
+        return get_unread_count(user)
 
     @classmethod
     def get_unread_notifications(cls, user, limit=10):
@@ -95,3 +108,106 @@ class Notification(models.Model):
         return cls.objects.filter(user=user, is_read=False).order_by("-created_at")[
             :limit
         ]
+
+
+class EmailOutbox(models.Model):
+    """
+    Email chờ gửi (transactional outbox)
+
+    Được ghi trong cùng transaction với Notification; lệnh `send_outbox_emails`
+    gửi dần qua một kết nối SMTP và thử lại với backoff khi lỗi. Email đang gửi
+    ở trạng thái "sending" đến hết locked_until; quá hạn (worker chết) thì được
+    nhận lại.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Chờ gửi"),
+        (STATUS_SENDING, "Đang gửi"),
+        (STATUS_SENT, "Đã gửi"),
+        (STATUS_FAILED, "Lỗi"),
+    ]
+
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="emails",
+        help_text="Thông báo gốc",
+    )
+    to_email = models.EmailField(help_text="Địa chỉ nhận")
+    subject = models.CharField(max_length=255, help_text="Tiêu đề")
+    body = models.TextField(help_text="Nội dung")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Trạng thái gửi",
+    )
+    attempts = models.PositiveIntegerField(default=0, help_text="Số lần đã thử")
+    max_attempts = models.PositiveIntegerField(default=5, help_text="Số lần thử tối đa")
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, help_text="Thời điểm được gửi (thử lại) tiếp theo"
+    )
+    locked_until = models.DateTimeField(
+        null=True, blank=True, help_text="Worker giữ email đang gửi đến thời điểm này"
+    )
+    last_error = models.TextField(blank=True, help_text="Lỗi gần nhất")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, help_text="Thời gian gửi")
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+        verbose_name = "Email chờ gửi"
+        verbose_name_plural = "Email chờ gửi"
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} ({self.status})"
+
+    def mark_sent(self, now=None):
+        self.status = self.STATUS_SENT
+        self.sent_at = now or timezone.now()
+        self.locked_until = None
+        self.last_error = ""
+
+    def mark_failed(self, error, now=None):
+        """Ghi nhận lỗi, hẹn gửi lại với backoff nếu còn lượt"""
+        self.last_error = str(error)
+        self.locked_until = None
+        if self.attempts < self.max_attempts:
+            self.status = self.STATUS_PENDING
+            self.next_attempt_at = (now or timezone.now()) + timedelta(
+                seconds=60 * 2 ** (self.attempts - 1)
+            )
+        else:
+            self.status = self.STATUS_FAILED
+
+
+class NotificationCounter(models.Model):
+    """
+    Số thông báo chưa đọc của user (denormalized)
+
+    Được NotificationService cập nhật khi tạo / đánh dấu đã đọc / dọn dẹp thông
+    báo; lệnh `reconcile_notification_counters` sửa lại khi bị lệch.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread_count = models.PositiveIntegerField(default=0, help_text="Số chưa đọc")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Bộ đếm thông báo"
+        verbose_name_plural = "Bộ đếm thông báo"
+
+    def __str__(self):
+        return f"{self.user} - {self.unread_count}"
@@ -0,0 +1,127 @@
+"""
+Gửi email từ bảng EmailOutbox
+
+NotificationService ghi email vào outbox trong cùng transaction với Notification;
+deliver_pending_emails() chạy trong worker (`send_outbox_emails`), dùng chung một
+kết nối tới email backend cho cả lô và ghi nhận kết quả từng email để thử lại
+với backoff khi lỗi.
+
+Lô email được nhận (chuyển sang "sending" kèm hạn SENDING_LEASE) trong một
+transaction ngắn; việc gửi SMTP diễn ra ngoài transaction nên không giữ khoá
+dòng, và kết quả từng email được ghi bằng một UPDATE riêng.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Thời gian tối đa một worker giữ lô email đang gửi
+SENDING_LEASE = timedelta(minutes=10)
+
+_RESULT_FIELDS = ["status", "next_attempt_at", "locked_until", "last_error", "sent_at"]
+
+
+def claim_emails(batch_size=100, now=None):
+    """
+    Nhận một lô email đến hạn để gửi
+
+    Gồm email đang chờ và email "sending" đã hết hạn lease (worker trước bị
+    dừng giữa chừng, lần đó được tính là một lần thử).
+
+    Returns:
+        list[EmailOutbox]: các email đã chuyển sang "sending"
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        stale = Q(status=EmailOutbox.STATUS_SENDING, locked_until__lt=now)
+        # Hết lượt thử thì dừng hẳn thay vì nhận lại
+        EmailOutbox.objects.filter(stale, attempts__gte=F("max_attempts")).update(
+            status=EmailOutbox.STATUS_FAILED, locked_until=None
+        )
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now) | stale
+            )
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        EmailOutbox.objects.filter(pk__in=ids).update(
+            status=EmailOutbox.STATUS_SENDING,
+            locked_until=now + SENDING_LEASE,
+            attempts=F("attempts") + 1,
+        )
+    return list(
+        EmailOutbox.objects.filter(pk__in=ids).order_by("next_attempt_at", "id")
+    )
+
+
+def deliver_pending_emails(batch_size=100, now=None, connection=None):
+    """
+    Gửi một lô email đến hạn
+
+    Args:
+        batch_size: số email tối đa trong lô
+        now: thời điểm hiện tại (mặc định timezone.now())
+        connection: kết nối email backend dùng lại (mặc định get_connection())
+
+    Returns:
+        tuple: (số email đã gửi, số email lỗi)
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+    emails = claim_emails(batch_size, now)
+    if not emails:
+        return sent, failed
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.exception("Cannot open email connection")
+        for email in emails:
+            email.mark_failed(e, now)
+            _record(email)
+        return sent, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [email.to_email],
+                connection=connection,
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                logger.warning("Failed to send outbox email %s: %s", email.pk, e)
+                email.mark_failed(e, now)
+                failed += 1
+            else:
+                email.mark_sent(now)
+                sent += 1
+            _record(email)
+    finally:
+        connection.close()
+
+    return sent, failed
+
+
+def _record(email):
+    """Ghi kết quả gửi, chỉ khi email vẫn đang được lô này giữ"""
+    EmailOutbox.objects.filter(pk=email.pk, status=EmailOutbox.STATUS_SENDING).update(
+        **{field: getattr(email, field) for field in _RESULT_FIELDS}
+    )
@@ -0,0 +1,153 @@
+"""
+Dọn dẹp thông báo theo chính sách lưu trữ
+
+Xoá theo từng lô khoá chính (mỗi lô một transaction ngắn, nghỉ giữa các lô)
+thay cho một DELETE lớn khoá bảng lâu. Có thể ghi các dòng bị xoá ra file
+archive (JSON Lines nén gzip) để phục vụ kiểm tra sau này.
+
+Chính sách:
+    expired: expires_at đã qua (index expires_at)
+    read: đã đọc và tạo trước N ngày (index user/is_read/created_at)
+"""
+
+import gzip
+import json
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import adjust_unread
+from .models import Notification
+
+DEFAULT_BATCH_SIZE = 1000
+
+ARCHIVE_FIELDS = [
+    "id",
+    "user_id",
+    "type",
+    "title",
+    "message",
+    "is_read",
+    "is_important",
+    "data",
+    "related_object_id",
+    "related_object_type",
+    "created_at",
+    "read_at",
+    "expires_at",
+]
+
+
+def expired_q(now=None):
+    """Thông báo đã hết hạn"""
+    return Q(expires_at__lt=now or timezone.now())
+
+
+def read_older_than_q(days, now=None):
+    """Thông báo đã đọc và tạo trước `days` ngày"""
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Q(is_read=True, created_at__lt=cutoff)
+
+
+class NotificationArchive:
+    """
+    File archive JSON Lines nén gzip
+
+    Dòng đầu là header (model, danh sách trường), mỗi dòng sau là một mảng giá
+    trị theo đúng thứ tự trường. Mở ở chế độ append nên có thể ghi nhiều lần
+    chạy vào cùng một file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = gzip.open(self.path, "at", encoding="utf-8")
+        self._write(
+            {
+                "model": Notification._meta.label_lower,
+                "fields": ARCHIVE_FIELDS,
+                "archived_at": timezone.now().isoformat(),
+            }
+        )
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def _write(self, value):
+        self.file.write(json.dumps(value, ensure_ascii=False, default=str))
+        self.file.write("\n")
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._write(row)
+        self.file.flush()
+
+
+def purge_notifications(
+    condition, batch_size=DEFAULT_BATCH_SIZE, sleep=0, archive=None, dry_run=False
+):
+    """
+    Xoá các thông báo thoả `condition` theo từng lô khoá chính
+
+    Args:
+        condition: Q lọc thông báo cần xoá (xem expired_q, read_older_than_q)
+        batch_size: số dòng mỗi lô
+        sleep: số giây nghỉ giữa các lô
+        archive: NotificationArchive đã mở (None = không lưu)
+        dry_run: chỉ đếm, không xoá
+
+    Returns:
+        dict: số dòng đã xoá (hoặc sẽ xoá khi dry_run) và số lô
+    """
+    stats = {"deleted": 0, "batches": 0}
+    last_pk = 0
+
+    while True:
+        ids = list(
+            Notification.objects.filter(condition, pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_pk = ids[-1]
+        stats["batches"] += 1
+
+        if dry_run:
+            stats["deleted"] += len(ids)
+            continue
+
+        stats["deleted"] += _delete_batch(condition, ids, archive)
+        if sleep:
+            time.sleep(sleep)
+
+    return stats
+
+
+def _delete_batch(condition, ids, archive):
+    with transaction.atomic():
+        batch = Notification.objects.filter(condition, pk__in=ids)
+        rows = list(batch.values_list(*ARCHIVE_FIELDS))
+        if not rows:
+            return 0
+        pks = [row[0] for row in rows]
+
+        if archive is not None:
+            archive.write_rows(rows)
+
+        unread = Counter(
+            row[1] for row in rows if not row[ARCHIVE_FIELDS.index("is_read")]
+        )
+        # Lô giới hạn theo khoá chính nên phần cascade (SET_NULL ở EmailOutbox)
+        # chỉ chạm tới số dòng nhỏ
+        _, per_model = Notification.objects.filter(pk__in=pks).delete()
+        deleted = per_model.get(Notification._meta.label, 0)
+        adjust_unread({user_id: -count for user_id, count in unread.items()})
+    return deleted
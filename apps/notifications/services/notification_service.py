@@ -1,18 +1,26 @@
 import logging
 
-from django.conf import settings
-from django.core.mail import send_mail
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from ..models import Notification
+from .. import counters, events
+from ..models import EmailOutbox, Notification
 
 logger = logging.getLogger(__name__)
 
+User = get_user_model()
+
+# Số người nhận ghi trong một transaction khi gửi thông báo hàng loạt
+BROADCAST_BATCH_SIZE = 1000
+
 
 class NotificationService:
     """Service gửi thông báo nâng cao"""
 
     @staticmethod
+    @transaction.atomic
     def send_approval_notification(absence_request, approver):
         """Gửi thông báo cần phê duyệt"""
         # Tạo notification
@@ -38,6 +46,7 @@ class NotificationService:
             related_object_id=absence_request.id,
             related_object_type="AbsenceRequest",
         )
+        NotificationService._track_created([notification])
 
         # Gửi email
         NotificationService._send_email_notification(notification)
@@ -48,9 +57,42 @@ class NotificationService:
         return notification
 
     @staticmethod
+    @transaction.atomic
     def send_reminder_notification(absence_request, approver, reminder_count):
         """Gửi thông báo nhắc nhở"""
-        notification = Notification.objects.create(
+        notification = NotificationService._build_reminder_notification(
+            absence_request, approver, reminder_count
+        )
+        notification.save()
+        NotificationService._track_created([notification])
+
+        NotificationService._send_email_notification(notification)
+        return notification
+
+    @staticmethod
+    @transaction.atomic
+    def send_reminder_notifications(reminders):
+        """
+        Gửi nhiều thông báo nhắc nhở cùng lúc
+
+        Args:
+            reminders: danh sách (absence_request, approver, reminder_count)
+
+        Tạo tất cả notification bằng một bulk_create và gửi email qua một kết nối.
+        """
+        notifications = Notification.objects.bulk_create(
+            [
+                NotificationService._build_reminder_notification(*reminder)
+                for reminder in reminders
+            ]
+        )
+        NotificationService._track_created(notifications)
+        NotificationService._send_email_notifications(notifications)
+        return notifications
+
+    @staticmethod
+    def _build_reminder_notification(absence_request, approver, reminder_count):
+        return Notification(
             user=approver,
             title=f"Nhắc nhở phê duyệt (lần {reminder_count})",
             message=f"Đơn vắng mặt của {absence_request.user.get_full_name()} vẫn chưa được phê duyệt",
@@ -63,12 +105,12 @@ class NotificationService:
                 "start_date": absence_request.start_date.isoformat(),
                 "end_date": absence_request.end_date.isoformat(),
             },
+            related_object_id=absence_request.id,
+            related_object_type="AbsenceRequest",
         )
 
-        NotificationService._send_email_notification(notification)
-        return notification
-
     @staticmethod
+    @transaction.atomic
     def send_completion_notification(absence_request):
         """Gửi thông báo hoàn thành"""
         notification = Notification.objects.create(
@@ -88,11 +130,13 @@ class NotificationService:
                 ),
             },
         )
+        NotificationService._track_created([notification])
 
         NotificationService._send_email_notification(notification)
         return notification
 
     @staticmethod
+    @transaction.atomic
     def send_rejection_notification(absence_request):
         """Gửi thông báo từ chối"""
         notification = Notification.objects.create(
@@ -113,11 +157,13 @@ class NotificationService:
                 ),
             },
         )
+        NotificationService._track_created([notification])
 
         NotificationService._send_email_notification(notification)
         return notification
 
     @staticmethod
+    @transaction.atomic
     def send_system_notification(user, title, message, is_important=False, data=None):
         """Gửi thông báo hệ thống"""
         notification = Notification.objects.create(
@@ -128,37 +174,148 @@ class NotificationService:
             is_important=is_important,
             data=data or {},
         )
+        NotificationService._track_created([notification])
 
         NotificationService._send_email_notification(notification)
         return notification
 
     @staticmethod
+    @transaction.atomic
     def send_checkin_notification(user, title, message, data=None):
         """Gửi thông báo chấm công"""
         notification = Notification.objects.create(
             user=user, title=title, message=message, type="checkin", data=data or {}
         )
+        NotificationService._track_created([notification])
 
         return notification
 
     @staticmethod
-    def _send_email_notification(notification):
-        """Gửi email notification"""
-        try:
-            subject = f"[NOV-RECO] {notification.title}"
-            message = f"""
+    def get_broadcast_recipients(
+        departments=None, offices=None, roles=None, all_users=False
+    ):
+        """
+        Người nhận thông báo hàng loạt (user đang hoạt động)
+
+        Args:
+            departments, offices: danh sách Department/Office hoặc id
+            roles: danh sách vai trò (UserRole)
+            all_users: gửi cho tất cả, bỏ qua các điều kiện khác
+
+        User thuộc bất kỳ nhóm nào được chọn đều nhận thông báo.
+        """
+        users = User.objects.filter(is_active=True)
+        if all_users:
+            return users
+
+        condition = Q()
+        if departments:
+            condition |= Q(department__in=departments)
+        if offices:
+            condition |= Q(department__office__in=offices)
+        if roles:
+            condition |= Q(role__in=roles)
+        if not condition:
+            raise ValueError("Broadcast requires at least one recipient group")
+        return users.filter(condition)
+
+    @staticmethod
+    def send_broadcast_notification(
+        title,
+        message,
+        departments=None,
+        offices=None,
+        roles=None,
+        all_users=False,
+        is_important=False,
+        data=None,
+        send_email=True,
+        batch_size=BROADCAST_BATCH_SIZE,
+    ):
+        """
+        Gửi thông báo hệ thống cho cả phòng ban / văn phòng / vai trò / toàn công ty
+
+        Người nhận được lấy bằng một truy vấn; mỗi lô batch_size người nhận được
+        ghi bằng bulk_create (thông báo, bộ đếm chưa đọc, email outbox) trong một
+        transaction.
+
+        Returns:
+            int: số thông báo đã tạo
+        """
+        recipients = list(
+            NotificationService.get_broadcast_recipients(
+                departments, offices, roles, all_users
+            )
+            .only("id", "email")
+            .order_by("pk")
+        )
+
+        for start in range(0, len(recipients), batch_size):
+            with transaction.atomic():
+                notifications = Notification.objects.bulk_create(
+                    [
+                        Notification(
+                            user=user,
+                            title=title,
+                            message=message,
+                            type="system",
+                            is_important=is_important,
+                            data=data or {},
+                        )
+                        for user in recipients[start : start + batch_size]
+                    ]
+                )
+                NotificationService._track_created(notifications)
+                if send_email:
+                    NotificationService._send_email_notifications(notifications)
+
+        return len(recipients)
+
+    @staticmethod
+    def _track_created(notifications):
+        """Cập nhật bộ đếm chưa đọc và phát sự kiện cho thông báo mới"""
+        counters.track_created(notifications)
+        events.publish_created(notifications)
+
+    @staticmethod
+    def _email_content(notification):
+        subject = f"[NOV-RECO] {notification.title}"
+        message = f"""
             {notification.message}
             
             Thời gian: {notification.created_at.strftime('%d/%m/%Y %H:%M')}
             
             Vui lòng truy cập hệ thống để xem chi tiết.
             """
+        return subject, message
+
+    @staticmethod
+    def _send_email_notification(notification):
+        """Đưa email notification vào outbox"""
+        NotificationService._send_email_notifications([notification])
 
-            send_mail(
-                subject, message, settings.DEFAULT_FROM_EMAIL, [notification.user.email]
+    @staticmethod
+    def _send_email_notifications(notifications):
+        """
+        Đưa email của nhiều notification vào outbox bằng một bulk_create
+
+        Email được ghi trong transaction của notification và được gửi bởi lệnh
+        `send_outbox_emails`, nên request không phải chờ SMTP.
+        """
+        emails = []
+        for notification in notifications:
+            if not notification.user.email:
+                continue
+            subject, message = NotificationService._email_content(notification)
+            emails.append(
+                EmailOutbox(
+                    notification=notification,
+                    to_email=notification.user.email,
+                    subject=subject[:255],
+                    body=message,
+                )
             )
-        except Exception as e:
-            logger.error(f"Failed to send email notification: {e}")
+        return EmailOutbox.objects.bulk_create(emails)
 
     @staticmethod
     def _send_push_notification(notification):
@@ -180,9 +337,12 @@ class NotificationService:
     @staticmethod
     def mark_all_notifications_read(user):
         """Đánh dấu tất cả thông báo đã đọc"""
-        Notification.objects.filter(user=user, is_read=False).update(
-            is_read=True, read_at=timezone.now()
-        )
+        with transaction.atomic():
+            updated = Notification.objects.filter(user=user, is_read=False).update(
+                is_read=True, read_at=timezone.now()
+            )
+            counters.adjust_unread({user.pk: -updated})
+        return updated
 
     @staticmethod
     def get_user_notifications(user, notification_type=None, limit=20):
@@ -196,15 +356,14 @@ class NotificationService:
 
     @staticmethod
     def get_unread_count(user):
-        """Lấy số thông báo chưa đọc"""
-        return Notification.get_unread_count(user)
+        """Lấy số thông báo chưa đọc (từ bộ đếm, không COUNT bảng Notification)"""
+        return counters.get_unread_count(user)
 
     @staticmethod
-    def cleanup_expired_notifications():
-        """Dọn dẹp thông báo hết hạn"""
-        expired_notifications = Notification.objects.filter(
-            expires_at__lt=timezone.now()
-        )
-        count = expired_notifications.count()
-        expired_notifications.delete()
-        return count
+    def cleanup_expired_notifications(batch_size=1000, sleep=0):
+        """Dọn dẹp thông báo hết hạn (xoá theo lô, xem retention.purge_notifications)"""
+        from ..retention import expired_q, purge_notifications
+
+        return purge_notifications(expired_q(), batch_size=batch_size, sleep=sleep)[
+            "deleted"
+        ]
@@ -1,3 +1,482 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import events
+from .models import EmailOutbox, Notification, NotificationCounter
+from .outbox import deliver_pending_emails
+from .retention import expired_q, purge_notifications
+from .services import NotificationService
+from .views import notification_stream
+
+User = get_user_model()
+
+
+class EmailOutboxTest(TestCase):
+    """Test cases for queued notification email delivery"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username="employee", email="employee@example.com"
+        )
+
+    def _notify(self, user=None):
+        return NotificationService.send_system_notification(
+            user or self.user, "Bảo trì", "Hệ thống bảo trì lúc 22h"
+        )
+
+    def test_notification_queues_email_without_sending(self):
+        """Creating a notification only writes an outbox row"""
+        notification = self._notify()
+        self._notify(User.objects.create_user(username="no_email"))
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.notification, notification)
+        self.assertEqual(email.to_email, "employee@example.com")
+        self.assertEqual(email.status, EmailOutbox.STATUS_PENDING)
+
+    def test_delivery_uses_one_connection_per_batch(self):
+        """Pending emails are sent over a single backend connection"""
+        for _ in range(3):
+            self._notify()
+
+        with mock.patch(
+            "apps.notifications.outbox.get_connection",
+            wraps=mail.get_connection,
+        ) as get_connection:
+            self.assertEqual(deliver_pending_emails(), (3, 0))
+
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(
+            EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists()
+        )
+        self.assertEqual(deliver_pending_emails(), (0, 0))
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Errors reschedule the email until max_attempts is reached"""
+        self._notify()
+        now = timezone.now()
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("SMTP down"),
+        ):
+            self.assertEqual(deliver_pending_emails(now=now), (0, 1))
+            email = EmailOutbox.objects.get()
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.next_attempt_at, now + timedelta(seconds=60))
+            self.assertEqual(email.last_error, "SMTP down")
+
+            # Chưa đến hạn thử lại
+            self.assertEqual(deliver_pending_emails(now=now), (0, 0))
+
+            email.attempts = email.max_attempts - 1
+            email.save(update_fields=["attempts"])
+            deliver_pending_emails(now=now + timedelta(days=1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, EmailOutbox.STATUS_FAILED)
+
+    def test_emails_are_sent_outside_the_claim_transaction(self):
+        """SMTP calls run after the claim commits, with rows marked sending"""
+        self._notify()
+        # TestCase đã bọc test trong các atomic block này
+        depth = len(connection.atomic_blocks)
+        seen = []
+
+        def send_messages(backend, messages):
+            email = EmailOutbox.objects.get()
+            seen.append((len(connection.atomic_blocks), email.status))
+            return len(messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            send_messages,
+        ):
+            self.assertEqual(deliver_pending_emails(), (1, 0))
+
+        self.assertEqual(seen, [(depth, EmailOutbox.STATUS_SENDING)])
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, EmailOutbox.STATUS_SENT)
+        self.assertIsNone(email.locked_until)
+
+    def test_stale_sending_email_is_reclaimed(self):
+        """Emails left in "sending" by a dead worker are retried after the lease"""
+        self._notify()
+        now = timezone.now()
+        EmailOutbox.objects.update(
+            status=EmailOutbox.STATUS_SENDING,
+            attempts=1,
+            locked_until=now + timedelta(minutes=5),
+        )
+
+        self.assertEqual(deliver_pending_emails(now=now), (0, 0))
+        self.assertEqual(deliver_pending_emails(now=now + timedelta(minutes=6)), (1, 0))
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, EmailOutbox.STATUS_SENT)
+        self.assertEqual(email.attempts, 2)
+
+    def test_outbox_rolls_back_with_notification(self):
+        """Outbox rows share the notification's transaction"""
+        from django.db import transaction
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self._notify()
+                raise RuntimeError
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+class UnreadCounterTest(TestCase):
+    """Test cases for the denormalized unread counter"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="employee")
+
+    def _notify(self, **fields):
+        return NotificationService.send_system_notification(
+            self.user, "Thông báo", "Nội dung", **fields
+        )
+
+    def _stored(self):
+        return NotificationCounter.objects.get(user=self.user).unread_count
+
+    def test_counter_follows_service_operations(self):
+        """Create, mark read, mark all read and cleanup keep the counter exact"""
+        notifications = [self._notify() for _ in range(4)]
+        self.assertEqual(self._stored(), 4)
+
+        NotificationService.mark_notification_read(notifications[0].id, self.user)
+        NotificationService.mark_notification_read(notifications[0].id, self.user)
+        self.assertEqual(self._stored(), 3)
+
+        Notification.objects.filter(pk=notifications[1].pk).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(NotificationService.cleanup_expired_notifications(), 1)
+        self.assertEqual(self._stored(), 2)
+
+        NotificationService.mark_all_notifications_read(self.user)
+        self.assertEqual(self._stored(), 0)
+
+    def test_unread_count_is_single_lookup(self):
+        """The badge read does not count the notification table"""
+        for _ in range(3):
+            self._notify()
+
+        with CaptureQueriesContext(connection) as ctx:
+            count = NotificationService.get_unread_count(self.user)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("COUNT(", ctx.captured_queries[0]["sql"].upper())
+
+    def test_missing_counter_is_rebuilt(self):
+        """Users without a counter row get one from a recount"""
+        Notification.objects.create(
+            user=self.user, title="Cũ", message="Nội dung", type="system"
+        )
+
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        self._notify()
+        self.assertEqual(self._stored(), 2)
+
+    def test_reconcile_command_repairs_drift(self):
+        """The reconciliation command resets drifted counters"""
+        self._notify()
+        self._notify()
+        NotificationCounter.objects.filter(user=self.user).update(unread_count=7)
+
+        call_command("reconcile_notification_counters", "--dry-run", stdout=StringIO())
+        self.assertEqual(self._stored(), 7)
+
+        out = StringIO()
+        call_command("reconcile_notification_counters", stdout=out)
+        self.assertEqual(self._stored(), 2)
+        self.assertIn("7 -> 2", out.getvalue())
+
+    def test_notification_api_uses_counter(self):
+        """The list API reports has_next without extra counts"""
+        for _ in range(3):
+            self._notify()
+        self.client.force_login(self.user)
+
+        response = self.client.get("/notifications/api/", {"page_size": 2})
+        data = response.json()
+        self.assertEqual(len(data["notifications"]), 2)
+        self.assertTrue(data["has_next"])
+        self.assertEqual(data["unread_count"], 3)
+
+        response = self.client.get("/notifications/api/", {"page": 2, "page_size": 2})
+        self.assertFalse(response.json()["has_next"])
+
+
+class NotificationStreamTest(TestCase):
+    """Test cases for the SSE notification stream"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="employee")
+        self.broker = events.InProcessBroker()
+        patcher = mock.patch.object(events, "_broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _open_stream(self):
+        request = AsyncRequestFactory().get("/notifications/api/stream/")
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        response = await notification_stream(request)
+        return response, aiter(response.streaming_content)
+
+    async def test_stream_pushes_committed_events(self):
+        """Subscribers receive new notifications and unread counts"""
+        from asgiref.sync import sync_to_async
+
+        response, stream = await self._open_stream()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+        self.assertIn(b'"unread_count": 0', await anext(stream))
+
+        def notify():
+            with self.captureOnCommitCallbacks(execute=True):
+                NotificationService.send_system_notification(
+                    self.user, "Bảo trì", "Hệ thống bảo trì lúc 22h"
+                )
+
+        await sync_to_async(notify)()
+
+        chunks = [await anext(stream), await anext(stream)]
+        self.assertTrue(any(b"event: notification" in c for c in chunks))
+        self.assertTrue(any(b'"unread_count": 1' in c for c in chunks))
+
+        # Khi client ngắt kết nối, ASGIHandler huỷ task đang chờ sự kiện
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(self.broker.has_subscribers(self.user.pk))
+
+    def test_events_wait_for_commit(self):
+        """Nothing is published for users without subscribers or before commit"""
+        with mock.patch.object(self.broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                NotificationService.send_system_notification(
+                    self.user, "Bảo trì", "Nội dung"
+                )
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+            publish.assert_not_called()
+
+
+class RetentionTest(TestCase):
+    """Test cases for batched notification retention"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username="employee", email="employee@example.com"
+        )
+        self.now = timezone.now()
+
+    def _notify(self, is_read=False, expires_in=None, age_days=0):
+        notification = NotificationService.send_system_notification(
+            self.user, "Thông báo", "Nội dung"
+        )
+        Notification.objects.filter(pk=notification.pk).update(
+            is_read=is_read,
+            created_at=self.now - timedelta(days=age_days),
+            expires_at=self.now + expires_in if expires_in else None,
+        )
+        return notification
+
+    def test_expired_cleanup_runs_in_batches(self):
+        """Expired rows are removed in bounded batches and counters follow"""
+        for _ in range(5):
+            self._notify(expires_in=timedelta(days=-1))
+        keep = self._notify(expires_in=timedelta(days=1))
+        NotificationService.get_unread_count(self.user)
+
+        stats = purge_notifications(expired_q(self.now), batch_size=2)
+
+        self.assertEqual(stats, {"deleted": 5, "batches": 3})
+        self.assertEqual(list(Notification.objects.all()), [keep])
+        self.assertEqual(NotificationService.get_unread_count(self.user), 1)
+        self.assertEqual(EmailOutbox.objects.filter(notification=None).count(), 5)
+
+    def test_read_policy_archives_deleted_rows(self):
+        """Old read notifications are written to the archive before deletion"""
+        import gzip
+        import json
+        import os
+        import tempfile
+
+        old = self._notify(is_read=True, age_days=120)
+        self._notify(is_read=True, age_days=10)
+        self._notify(is_read=False, age_days=120)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "notifications.jsonl.gz")
+            call_command(
+                "prune_notifications",
+                "--policy=read",
+                "--days=90",
+                "--sleep=0",
+                f"--archive={path}",
+                stdout=StringIO(),
+            )
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                lines = [json.loads(line) for line in archive]
+
+        header, row = lines
+        self.assertEqual(header["model"], "notifications.notification")
+        self.assertEqual(dict(zip(header["fields"], row))["id"], old.pk)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(Notification.objects.filter(pk=old.pk).exists())
+
+
+class BroadcastTest(TestCase):
+    """Test cases for bulk broadcast notifications"""
+
+    def setUp(self):
+        """Set up test data"""
+        from apps.users.models import Department, Office
+
+        self.hanoi = Office.objects.create(name="Hà Nội")
+        saigon = Office.objects.create(name="Hồ Chí Minh")
+        self.sales = Department.objects.create(name="Kinh doanh", office=self.hanoi)
+        self.tech = Department.objects.create(name="Kỹ thuật", office=self.hanoi)
+        support = Department.objects.create(name="Hỗ trợ", office=saigon)
+
+        self.users = [
+            User.objects.create_user(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                department=department,
+            )
+            for i, department in enumerate(
+                [self.sales, self.sales, self.tech, support, support]
+            )
+        ]
+        User.objects.create_user(
+            username="inactive", department=self.sales, is_active=False
+        )
+
+    def _recipients(self, **targets):
+        return set(NotificationService.get_broadcast_recipients(**targets))
+
+    def test_recipient_groups(self):
+        """Departments, offices, roles and all users resolve active users"""
+        self.assertEqual(
+            self._recipients(departments=[self.sales]), set(self.users[:2])
+        )
+        self.assertEqual(self._recipients(offices=[self.hanoi]), set(self.users[:3]))
+        hr = User.objects.create_user(username="hr", role="hcns")
+        self.assertEqual(
+            self._recipients(departments=[self.tech], roles=["hcns"]),
+            {self.users[2], hr},
+        )
+        self.assertEqual(len(self._recipients(all_users=True)), 6)
+        with self.assertRaises(ValueError):
+            self._recipients()
+
+    def test_broadcast_writes_in_bulk(self):
+        """Query count depends on batches, not on the number of recipients"""
+        with CaptureQueriesContext(connection) as ctx:
+            count = NotificationService.send_broadcast_notification(
+                "Nghỉ lễ", "Công ty nghỉ lễ 2/9", all_users=True, batch_size=100
+            )
+
+        self.assertEqual(count, 5)
+        self.assertLess(len(ctx.captured_queries), 15)
+        self.assertEqual(Notification.objects.filter(type="system").count(), 5)
+        self.assertEqual(EmailOutbox.objects.count(), 5)
+        for user in self.users:
+            self.assertEqual(NotificationService.get_unread_count(user), 1)
+
+    def test_broadcast_command(self):
+        """The management command targets offices"""
+        out = StringIO()
+        call_command(
+            "broadcast_notification",
+            "Họp",
+            "Họp toàn văn phòng",
+            f"--office={self.hanoi.pk}",
+            "--no-email",
+            "--batch-size=2",
+            stdout=out,
+        )
+
+        self.assertIn("3", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+class InboxApiTest(TestCase):
+    """Test cases for the cursor-paginated inbox API"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="employee")
+        for i in range(5):
+            NotificationService.send_system_notification(
+                self.user, f"Thông báo {i}", "Nội dung", is_important=i % 2 == 0
+            )
+        self.client.force_login(self.user)
+
+    def _get(self, **params):
+        return self.client.get("/notifications/api/", params)
+
+    def test_cursor_pages_cover_inbox_once(self):
+        """Following next_cursor visits every notification newest first"""
+        titles = []
+        data = self._get(cursor="", page_size=2).json()
+        while True:
+            titles += [n["title"] for n in data["notifications"]]
+            self.assertEqual(data["unread_count"], 5)
+            if not data["has_next"]:
+                break
+            data = self._get(cursor=data["next_cursor"], page_size=2).json()
+
+        self.assertEqual(titles, [f"Thông báo {i}" for i in range(4, -1, -1)])
+        self.assertNotIn("total_count", data)
+
+    def test_cursor_page_does_not_count(self):
+        """A cursor page is one SELECT plus the counter lookup"""
+        with CaptureQueriesContext(connection) as ctx:
+            self._get(cursor="", important="1")
+        sql = [q["sql"].upper() for q in ctx.captured_queries]
+
+        self.assertFalse(any("COUNT(" in q for q in sql))
+        self.assertEqual(len([q for q in sql if 'NOTIFICATIONS_NOTIFICATION"' in q]), 1)
+
+    def test_filters_and_invalid_cursor(self):
+        """important/unread filters apply and bad cursors return 400"""
+        data = self._get(cursor="", important="1").json()
+        self.assertEqual(len(data["notifications"]), 3)
+
+        Notification.objects.filter(title="Thông báo 4").first().mark_as_read()
+        data = self._get(cursor="", unread="1", with_total="1").json()
+        self.assertEqual(data["total_count"], 4)
+        self.assertEqual(data["unread_count"], 4)
+
+        self.assertEqual(self._get(cursor="invalid").status_code, 400)
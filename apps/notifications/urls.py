@@ -28,4 +28,5 @@ urlpatterns = [
         name="api_mark_all_read",
     ),
     path("api/unread-count/", views.unread_count_api, name="api_unread_count"),
+    path("api/stream/", views.notification_stream, name="api_stream"),
 ]
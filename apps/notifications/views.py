@@ -1,7 +1,11 @@
+import json
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
 from django.db.models import Count
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
@@ -11,9 +15,20 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.pagination import (
+    InvalidCursor,
+    is_cursor_request,
+    paginate_by_cursor,
+    parse_page_size,
+)
+
+from .events import get_broker
 from .models import Notification
 from .services import NotificationService
 
+# Gửi comment giữ kết nối để proxy không cắt luồng SSE đang rảnh
+STREAM_HEARTBEAT_SECONDS = 20
+
 
 @login_required
 def notification_list_view(request):
@@ -65,44 +80,84 @@ def mark_all_notifications_read_view(request):
 
 
 # API Views
+def _serialize_notification(n):
+    return {
+        "id": n.id,
+        "title": n.title,
+        "message": n.message,
+        "type": n.type,
+        "type_display": n.type_display,
+        "is_read": n.is_read,
+        "is_important": n.is_important,
+        "created_at": n.created_at.isoformat(),
+        "data": n.data,
+    }
+
+
+def _truthy(value):
+    return value in ("1", "true")
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def notification_api(request):
-    """API lấy thông báo"""
+    """
+    API lấy thông báo
+
+    Truyền `cursor` (rỗng cho trang đầu) để phân trang theo con trỏ
+    (created_at, id); không có `cursor` thì dùng page/page_size như cũ.
+    Lọc: type, important=1, unread=1. unread_count lấy từ bộ đếm chưa đọc.
+    """
     notifications = Notification.objects.filter(user=request.user)
 
     # Filter
     notification_type = request.GET.get("type")
     if notification_type:
         notifications = notifications.filter(type=notification_type)
+    if _truthy(request.GET.get("important")):
+        notifications = notifications.filter(is_important=True)
+    if _truthy(request.GET.get("unread")):
+        notifications = notifications.filter(is_read=False)
+
+    unread_count = NotificationService.get_unread_count(request.user)
+    page_size = parse_page_size(request.GET.get("page_size"), 10)
+
+    if is_cursor_request(request):
+        try:
+            page = paginate_by_cursor(
+                notifications,
+                cursor=request.GET.get("cursor") or None,
+                page_size=page_size,
+                with_total=_truthy(request.GET.get("with_total")),
+            )
+        except InvalidCursor:
+            return Response({"error": "Cursor không hợp lệ"}, status=400)
+
+        return Response(
+            {
+                "notifications": [_serialize_notification(n) for n in page.items],
+                "unread_count": unread_count,
+                **page.as_dict(),
+            }
+        )
 
     # Pagination
-    page = int(request.GET.get("page", 1))
-    page_size = int(request.GET.get("page_size", 10))
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
 
     start = (page - 1) * page_size
     end = start + page_size
 
-    notifications_page = notifications[start:end]
+    # Lấy thêm một dòng để biết còn trang sau mà không cần COUNT
+    rows = list(notifications[start : end + 1])
 
     data = {
-        "notifications": [
-            {
-                "id": n.id,
-                "title": n.title,
-                "message": n.message,
-                "type": n.type,
-                "type_display": n.type_display,
-                "is_read": n.is_read,
-                "is_important": n.is_important,
-                "created_at": n.created_at.isoformat(),
-                "data": n.data,
-            }
-            for n in notifications_page
-        ],
+        "notifications": [_serialize_notification(n) for n in rows[:page_size]],
         "total": notifications.count(),
-        "unread_count": notifications.filter(is_read=False).count(),
-        "has_next": end < notifications.count(),
+        "unread_count": unread_count,
+        "has_next": len(rows) > page_size,
     }
 
     return Response(data)
@@ -112,13 +167,9 @@ def notification_api(request):
 @permission_classes([IsAuthenticated])
 def mark_notification_read_api(request, notification_id):
     """API đánh dấu thông báo đã đọc"""
-    try:
-        notification = Notification.objects.get(id=notification_id, user=request.user)
-        notification.mark_as_read()
-
+    if NotificationService.mark_notification_read(notification_id, request.user):
         return Response({"success": True})
-    except Notification.DoesNotExist:
-        return Response({"error": "Notification not found"}, status=404)
+    return Response({"error": "Notification not found"}, status=404)
 
 
 @api_view(["POST"])
@@ -135,3 +186,39 @@ def unread_count_api(request):
     """API lấy số thông báo chưa đọc"""
     count = NotificationService.get_unread_count(request.user)
     return Response({"unread_count": count})
+
+
+def _sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def notification_stream(request):
+    """
+    Luồng SSE: thông báo mới và số chưa đọc của user hiện tại
+
+    Chỉ chạy dưới ASGI (config/asgi.py); khi chạy WSGI trả 503 để client quay
+    về poll API như cũ.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Streaming requires ASGI"}, status=503)
+
+    subscription = get_broker().subscribe(user.pk)
+    unread_count = await sync_to_async(NotificationService.get_unread_count)(user)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse({"type": "unread_count", "unread_count": unread_count})
+            while True:
+                event = await subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                yield _sse(event) if event else ": keepalive\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
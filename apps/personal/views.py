@@ -1,10 +1,8 @@
 import os
-from io import BytesIO
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
@@ -94,42 +92,35 @@ def personal_avatar_upload_view(request):
                     {"success": False, "message": "File quá lớn (tối đa 5MB)"}
                 )
 
+            # Chỉ đọc header để kiểm tra; thu nhỏ và tạo các phiên bản kích
+            # thước do background task users.process_avatar đảm nhận
             try:
-                # Process image
-                image = Image.open(avatar_file)
-
-                # Convert to RGB if necessary
-                if image.mode in ("RGBA", "LA", "P"):
-                    image = image.convert("RGB")
-
-                # Resize to 300x300
-                image.thumbnail((300, 300), Image.Resampling.LANCZOS)
+                with Image.open(avatar_file) as image:
+                    image.size
+            except Exception:
+                return JsonResponse(
+                    {"success": False, "message": "File không phải là ảnh hợp lệ"}
+                )
+            avatar_file.seek(0)
 
-                # Save to BytesIO
-                output = BytesIO()
-                image.save(output, format="JPEG", quality=85)
-                output.seek(0)
+            try:
+                user = request.user
+                old_avatar = user.avatar.name if user.avatar else ""
+                ext = os.path.splitext(avatar_file.name)[1].lower() or ".jpg"
+                user.avatar.save(f"avatar_{user.id}{ext}", avatar_file, save=True)
 
-                # Delete old avatar if exists
-                if request.user.avatar:
+                # Xoá avatar cũ (các phiên bản cũ được task xoá khi tạo bản mới)
+                if old_avatar and old_avatar != user.avatar.name:
                     try:
-                        if os.path.isfile(request.user.avatar.path):
-                            os.remove(request.user.avatar.path)
-                    except:
+                        user.avatar.storage.delete(old_avatar)
+                    except OSError:
                         pass
 
-                # Save new avatar
-                request.user.avatar.save(
-                    f"avatar_{request.user.id}.jpg",
-                    ContentFile(output.getvalue()),
-                    save=True,
-                )
-
                 return JsonResponse(
                     {
                         "success": True,
                         "message": "Cập nhật avatar thành công!",
-                        "avatar_url": request.user.avatar.url,
+                        "avatar_url": user.avatar.url,
                     }
                 )
 
@@ -0,0 +1,143 @@
+"""
+Các phiên bản kích thước của avatar
+
+View upload chỉ lưu file gốc và xếp hàng background task `users.process_avatar`;
+task tạo các ảnh vuông AVATAR_SIZES ở hai định dạng (WebP gọn nhẹ và JPEG dự
+phòng) rồi ghi danh sách vào User.avatar_variants:
+
+    {"source": "avatars/a.jpg", "48": {"webp": "...", "jpeg": "..."}, ...}
+
+Khi "source" khác avatar hiện tại (chưa xử lý xong) thì dùng ảnh gốc. Ảnh không
+đọc được được ghi {"source": ..., "failed": "<lỗi>"} để không bị xếp hàng lại
+mỗi lần lưu user; giao diện tiếp tục dùng ảnh gốc.
+"""
+
+import logging
+import os
+import uuid
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# 48: header/danh sách (32-48px), 96: màn hình mật độ cao, 300: trang cá nhân
+AVATAR_SIZES = (48, 96, 300)
+AVATAR_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True}),
+}
+DEFAULT_FORMAT = "webp"
+
+VARIANT_DIR = "avatars/variants"
+
+# Lỗi của chính file ảnh (hỏng, không phải ảnh, quá nhiều pixel)
+AVATAR_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def _variant_names(variants):
+    return [
+        name
+        for size, formats in variants.items()
+        if isinstance(formats, dict)
+        for name in formats.values()
+    ]
+
+
+def _delete_files(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Could not delete avatar variant %s", name)
+
+
+def needs_processing(user):
+    """Avatar hiện tại chưa có phiên bản kích thước (và chưa bị ghi lỗi)"""
+    source = user.avatar.name if user.avatar else ""
+    return bool(source) and (user.avatar_variants or {}).get("source") != source
+
+
+def generate_avatar_variants(user):
+    """
+    Tạo các phiên bản avatar cho user
+
+    Ghi bằng UPDATE có điều kiện avatar chưa đổi, nên task của một avatar cũ
+    chạy muộn không ghi đè kết quả của avatar mới.
+
+    Returns:
+        bool: False nếu không có avatar, đã xử lý, hoặc avatar đổi giữa chừng
+
+    Raises:
+        AVATAR_ERRORS: ảnh không đọc được (đã ghi dấu lỗi vào avatar_variants)
+    """
+    if not needs_processing(user):
+        return False
+
+    source = user.avatar.name
+    storage = user.avatar.storage
+    try:
+        with user.avatar.open("rb") as f:
+            image = Image.open(f)
+            image.draft("RGB", (max(AVATAR_SIZES), max(AVATAR_SIZES)))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except AVATAR_ERRORS as e:
+        _save_variants(user, source, {"source": source, "failed": str(e)[:255]})
+        raise
+
+    token = uuid.uuid4().hex[:12]
+    variants = {"source": source}
+    for size in AVATAR_SIZES:
+        resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        variants[str(size)] = {}
+        for fmt, (pil_format, options) in AVATAR_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            name = os.path.join(VARIANT_DIR, str(user.pk), f"{token}_{size}.{fmt}")
+            variants[str(size)][fmt] = storage.save(
+                name, ContentFile(buffer.getvalue())
+            )
+
+    if not _save_variants(user, source, variants):
+        _delete_files(storage, _variant_names(variants))
+        return False
+    return True
+
+
+def _save_variants(user, source, variants):
+    """Ghi avatar_variants nếu avatar vẫn là `source`, xoá các file cũ"""
+    old_variants = user.avatar_variants or {}
+    updated = (
+        type(user)
+        .objects.filter(pk=user.pk, avatar=source)
+        .update(avatar_variants=variants)
+    )
+    if not updated:
+        return False
+
+    user.avatar_variants = variants
+    _delete_files(user.avatar.storage, _variant_names(old_variants))
+    return True
+
+
+def avatar_url(user, size=48, fmt=DEFAULT_FORMAT):
+    """
+    URL avatar nhỏ nhất không bé hơn `size`, quay về ảnh gốc khi chưa có
+
+    Returns:
+        str | None: None nếu user không có avatar
+    """
+    if not user or not getattr(user, "avatar", None):
+        return None
+
+    variants = user.avatar_variants or {}
+    if variants.get("source") == user.avatar.name:
+        size = int(size)
+        sizes = [s for s in AVATAR_SIZES if str(s) in variants]
+        fitting = [s for s in sizes if s >= size] or sizes[-1:]
+        if fitting:
+            formats = variants[str(fitting[0])]
+            name = formats.get(fmt) or next(iter(formats.values()))
+            return user.avatar.storage.url(name)
+    return user.avatar.url
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.avatars import AVATAR_ERRORS, generate_avatar_variants
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Tạo các phiên bản kích thước cho avatar cũ (avatar mới được xử lý bởi "
+        "background task users.process_avatar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Số user đọc mỗi lô",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size phải lớn hơn 0")
+
+        queryset = User.objects.exclude(avatar="").exclude(avatar__isnull=True)
+        processed = failed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "avatar", "avatar_variants")[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for user in batch:
+                try:
+                    processed += generate_avatar_variants(user)
+                except AVATAR_ERRORS as e:
+                    failed += 1
+                    self.stderr.write(f"User {user.pk}: không xử lý được avatar ({e})")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Đã xử lý {processed} avatar, lỗi {failed}")
+        )
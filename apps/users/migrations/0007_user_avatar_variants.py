@@ -0,0 +1,22 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_office_location"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Các phiên bản kích thước của avatar (xem apps.users.avatars)",
+            ),
+        ),
+    ]
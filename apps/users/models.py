@@ -132,6 +132,11 @@ class User(AbstractUser):
     avatar = models.ImageField(
         upload_to="avatars/", blank=True, null=True, help_text="Ảnh đại diện"
     )
+    avatar_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Các phiên bản kích thước của avatar (xem apps.users.avatars)",
+    )
     date_of_birth = models.DateField(null=True, blank=True, help_text="Ngày sinh")
     gender = models.CharField(
         max_length=10,
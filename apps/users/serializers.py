@@ -1,8 +1,31 @@
 from rest_framework import serializers
 
+from .avatars import DEFAULT_FORMAT, avatar_url
 from .models import Department, User, UserRole
 
 
+class AvatarUrlField(serializers.Field):
+    """
+    URL avatar vừa với kích thước hiển thị (chỉ đọc)
+
+    Ví dụ: avatar_small = AvatarUrlField(size=48)
+    """
+
+    def __init__(self, size=48, fmt=DEFAULT_FORMAT, **kwargs):
+        self.size = size
+        self.fmt = fmt
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        url = avatar_url(user, self.size, self.fmt)
+        request = self.context.get("request")
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
 class DepartmentSerializer(serializers.ModelSerializer):
     """Serializer cho Department"""
 
@@ -29,6 +52,7 @@ class UserSerializer(serializers.ModelSerializer):
     department_name = serializers.SerializerMethodField()
     full_name = serializers.SerializerMethodField()
     role_display = serializers.SerializerMethodField()
+    avatar_small = AvatarUrlField(size=48)
 
     class Meta:
         model = User
@@ -45,6 +69,7 @@ class UserSerializer(serializers.ModelSerializer):
             "department_name",
             "phone",
             "avatar",
+            "avatar_small",
             "date_of_birth",
             "gender",
             "address",
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.common.tasks import enqueue
+
+from .avatars import needs_processing
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def enqueue_avatar_processing(sender, instance, update_fields=None, **kwargs):
+    """Xếp hàng tạo các phiên bản avatar khi avatar thay đổi"""
+    if update_fields is not None and "avatar" not in update_fields:
+        return
+    if needs_processing(instance):
+        enqueue("users.process_avatar", user_id=instance.pk)
@@ -0,0 +1,21 @@
+"""
+Background task của users (xem apps.common.tasks)
+"""
+
+from apps.common.tasks import background_task
+
+from .avatars import AVATAR_ERRORS, generate_avatar_variants
+from .models import User
+
+
+@background_task("users.process_avatar")
+def process_avatar(job, user_id):
+    """Tạo các phiên bản kích thước của avatar (xem avatars.py)"""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return {"processed": False}
+    try:
+        return {"processed": generate_avatar_variants(user)}
+    except AVATAR_ERRORS as e:
+        # Ảnh hỏng: thử lại cũng không được, dấu lỗi đã được ghi
+        return {"processed": False, "error": str(e)}
@@ -0,0 +1,33 @@
+from django import template
+
+from apps.users.avatars import DEFAULT_FORMAT
+from apps.users.avatars import avatar_url as _avatar_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(user, size=48, fmt=DEFAULT_FORMAT):
+    """
+    URL avatar vừa với kích thước hiển thị
+
+    Ví dụ: <img src="{% avatar_url user 48 %}">
+    """
+    return _avatar_url(user, size, fmt) or ""
+
+
+@register.simple_tag
+def avatar_srcset(user, size=48, fmt=DEFAULT_FORMAT):
+    """
+    srcset 1x/2x cho avatar hiển thị ở `size` px
+
+    Ví dụ: <img src="{% avatar_url user 48 %}" srcset="{% avatar_srcset user 48 %}">
+    """
+    size = int(size)
+    urls = []
+    for density in (1, 2):
+        url = _avatar_url(user, size * density, fmt)
+        if not url or (urls and url == urls[-1][0]):
+            break
+        urls.append((url, density))
+    return ", ".join(f"{url} {density}x" for url, density in urls)
@@ -0,0 +1,120 @@
+"""
+Test cases for users app
+"""
+
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .avatars import AVATAR_SIZES, avatar_url
+from .models import User
+from .serializers import UserSerializer
+
+
+class AvatarVariantsTest(TestCase):
+    """Test cases for background avatar variants"""
+
+    def setUp(self):
+        """Set up test data"""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.login(username="testuser", password="pass")
+
+    def _upload(self):
+        buffer = BytesIO()
+        Image.new("RGB", (1200, 900), (30, 60, 90)).save(buffer, "JPEG")
+        return SimpleUploadedFile("me.jpg", buffer.getvalue(), "image/jpeg")
+
+    def test_upload_generates_variants_after_commit(self):
+        """The view stores the original and the job renders every size"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("personal:avatar_upload"), {"avatar": self._upload()}
+            )
+            self.assertTrue(response.json()["success"])
+            self.user.refresh_from_db()
+            # Chưa xử lý: dùng ảnh gốc
+            self.assertEqual(avatar_url(self.user, 48), self.user.avatar.url)
+
+        self.user.refresh_from_db()
+        variants = self.user.avatar_variants
+        self.assertEqual(variants["source"], self.user.avatar.name)
+        storage = self.user.avatar.storage
+        for size in AVATAR_SIZES:
+            for name in variants[str(size)].values():
+                with storage.open(name) as f, Image.open(f) as image:
+                    self.assertEqual(image.size, (size, size))
+
+        small = storage.url(variants["48"]["webp"])
+        self.assertEqual(avatar_url(self.user, 32), small)
+        self.assertEqual(avatar_url(self.user, 64), storage.url(variants["96"]["webp"]))
+        self.assertEqual(UserSerializer(self.user).data["avatar_small"], small)
+
+        html = Template(
+            "{% load avatars %}{% avatar_url user 48 %}|{% avatar_srcset user 48 %}"
+        ).render(Context({"user": self.user}))
+        self.assertEqual(
+            html, f"{small}|{small} 1x, {storage.url(variants['96']['webp'])} 2x"
+        )
+
+    def test_replacing_avatar_removes_old_variants(self):
+        """Old variant files are deleted once the new avatar is processed"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.avatar.save("a.jpg", self._upload())
+        self.user.refresh_from_db()
+        old = self.user.avatar_variants["48"]["jpeg"]
+        storage = self.user.avatar.storage
+        self.assertTrue(storage.exists(old))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.avatar.save("b.jpg", self._upload())
+
+        self.user.refresh_from_db()
+        self.assertFalse(storage.exists(old))
+        self.assertEqual(self.user.avatar_variants["source"], self.user.avatar.name)
+
+    def test_broken_avatar_is_marked_and_not_requeued(self):
+        """A failed avatar records a marker so later saves skip the job"""
+        from apps.common.models import BackgroundJob
+
+        broken = SimpleUploadedFile("me.jpg", b"not an image", "image/jpeg")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.avatar.save("me.jpg", broken)
+
+        self.user.refresh_from_db()
+        variants = self.user.avatar_variants
+        self.assertEqual(variants["source"], self.user.avatar.name)
+        self.assertIn("failed", variants)
+        self.assertEqual(avatar_url(self.user, 48), self.user.avatar.url)
+        job = BackgroundJob.objects.get(task="users.process_avatar")
+        self.assertEqual(job.status, BackgroundJob.STATUS_DONE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "An"
+            self.user.save()
+        self.assertEqual(
+            BackgroundJob.objects.filter(task="users.process_avatar").count(), 1
+        )
+
+    def test_edit_page_uses_resized_variant(self):
+        """Pages showing an avatar never load the full-size original"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.avatar.save("me.jpg", self._upload())
+        self.user.refresh_from_db()
+
+        response = self.client.get(reverse("personal:edit"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, avatar_url(self.user, 96))
+        self.assertNotContains(response, f'src="{self.user.avatar.url}"')
@@ -1,3 +1,12 @@
+"""
+ASGI entrypoint
+
+Cần cho các view async chạy lâu như luồng SSE thông báo
+(/notifications/api/stream/). Chạy bằng gunicorn với worker uvicorn:
+
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+"""
+
 import os
 
 from django.core.asgi import get_asgi_application
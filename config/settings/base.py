@@ -85,6 +85,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 # Database Configuration
 DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "django.db.backends.sqlite3")
@@ -196,6 +197,29 @@ EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "0") == "1"
 
+# Background jobs (apps.common.tasks)
+# Khi bật, job chạy ngay sau khi transaction commit thay vì chờ worker
+# `python manage.py run_background_jobs`
+BACKGROUND_JOBS_EAGER = os.environ.get("BACKGROUND_JOBS_EAGER", "0") == "1"
+# Job đang chạy không báo tiến độ quá số giây này bị coi là worker đã chết và
+# được xếp lại (tính là một lần thử)
+BACKGROUND_JOBS_LEASE_SECONDS = int(
+    os.environ.get("BACKGROUND_JOBS_LEASE_SECONDS", "900")
+)
+
+# Giới hạn dung lượng ảnh check-in/checkout (apps.checkin.uploads)
+CHECKIN_PHOTO_MAX_UPLOAD_SIZE = int(
+    os.environ.get("CHECKIN_PHOTO_MAX_UPLOAD_SIZE", str(10 * 1024 * 1024))
+)
+
+# Module settings cache (apps.module_settings.cache)
+# Bật khi chạy nhiều worker để đồng bộ phiên bản cache qua cache dùng chung
+MODULE_SETTINGS_SHARED_CACHE = False
+
+# Broker sự kiện cho luồng SSE thông báo (apps.notifications.events)
+# Mặc định chỉ phát trong process; thay bằng broker dùng chung khi chạy nhiều worker
+NOTIFICATION_EVENT_BROKER = "apps.notifications.events.InProcessBroker"
+
 # Logging Configuration
 # Create logs directory if it doesn't exist
 LOGS_DIR = BASE_DIR / "logs"
@@ -31,3 +31,6 @@ if DEBUG:
 
     # Debug toolbar is already configured in base.py
     INTERNAL_IPS = ["127.0.0.1", "localhost", "0.0.0.0"]
+
+# Run background jobs inline after commit so no worker is needed locally
+BACKGROUND_JOBS_EAGER = os.environ.get("BACKGROUND_JOBS_EAGER", "1") == "1"
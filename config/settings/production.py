@@ -29,6 +29,9 @@ CACHES = {
     }
 }
 
+# Đồng bộ cache ModuleSettings giữa các gunicorn worker qua Redis
+MODULE_SETTINGS_SHARED_CACHE = True
+
 # Session configuration
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
@@ -47,6 +47,9 @@ LOGGING = {
     },
 }
 
+# Run background jobs right after commit
+BACKGROUND_JOBS_EAGER = True
+
 # Cache backend for tests
 CACHES = {
     "default": {
@@ -159,6 +159,8 @@ print_status "Starting PRODUCTION services..."
 systemctl daemon-reload
 systemctl enable reco-qly-production
 systemctl start reco-qly-production
+# Worker nền (background jobs, email outbox, SLA) và dọn dẹp hằng đêm
+bash $PROJECT_DIR/deploy/install-workers.sh $PROJECT_DIR $USER reco-qly-production
 systemctl restart nginx
 
 # Wait for services
@@ -122,6 +122,8 @@ print_status "Starting services..."
 sudo systemctl daemon-reload
 sudo systemctl enable nov-reco
 sudo systemctl start nov-reco
+# Worker nền (background jobs, email outbox, SLA) và dọn dẹp hằng đêm
+sudo bash $PROJECT_DIR/deploy/install-workers.sh $PROJECT_DIR $USER nov-reco
 sudo systemctl restart nginx
 
 print_success "🎉 Deployment completed!"
@@ -172,6 +172,8 @@ print_status "Starting TEST services..."
 systemctl daemon-reload
 systemctl enable checkin-taylaibui-test
 systemctl start checkin-taylaibui-test
+# Worker nền (background jobs, email outbox, SLA) và dọn dẹp hằng đêm
+bash $PROJECT_DIR/deploy/install-workers.sh $PROJECT_DIR $USER checkin-taylaibui-test
 systemctl restart nginx
 
 # Wait for services to start
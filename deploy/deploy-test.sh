@@ -322,6 +322,8 @@ print_status "Starting test services..."
 systemctl daemon-reload
 systemctl enable nov-reco-test
 systemctl start nov-reco-test
+# Worker nền (background jobs, email outbox, SLA) và dọn dẹp hằng đêm
+bash $PROJECT_DIR/deploy/install-workers.sh $PROJECT_DIR $USER nov-reco-test
 systemctl restart nginx
 
 print_success "🎉 Test environment deployment completed!"
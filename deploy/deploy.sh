@@ -128,6 +128,8 @@ print_status "Starting services..."
 systemctl daemon-reload
 systemctl enable nov-reco
 systemctl start nov-reco
+# Worker nền (background jobs, email outbox, SLA) và dọn dẹp hằng đêm
+bash $PROJECT_DIR/deploy/install-workers.sh $PROJECT_DIR $USER nov-reco
 systemctl restart nginx
 
 print_success "Deployment completed successfully!"
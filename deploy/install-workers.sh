@@ -0,0 +1,107 @@
+#!/bin/bash
+# Cài các tiến trình nền của NOV-RECO dưới dạng systemd unit
+#
+# Gunicorn chỉ phục vụ request; các việc sau cần tiến trình riêng:
+#   <web>-jobs.service         run_background_jobs (ảnh check-in, avatar,
+#                              tính lại khoảng cách, xuất file lớn)
+#   <web>-email.service        send_outbox_emails --loop (email thông báo)
+#   <web>-sla.service          process_approval_sla --loop (nhắc/chuyển cấp)
+#   <web>-maintenance.timer    dọn blob media và file xuất mỗi đêm
+#
+# Các unit dùng chung biến Environment= của service web và khởi động lại cùng
+# nó (PartOf), nên deploy code mới chỉ cần restart service web.
+#
+# Cách dùng (root): ./deploy/install-workers.sh PROJECT_DIR USER WEB_SERVICE
+# Ví dụ:            ./deploy/install-workers.sh /var/www/reco.qly.vn www-data reco-qly-production
+
+set -e
+
+PROJECT_DIR="$1"
+USER="$2"
+WEB_SERVICE="$3"
+
+if [ -z "$PROJECT_DIR" ] || [ -z "$USER" ] || [ -z "$WEB_SERVICE" ]; then
+    echo "Usage: $0 PROJECT_DIR USER WEB_SERVICE" >&2
+    exit 1
+fi
+
+if [ "$EUID" -ne 0 ]; then
+    echo "Please run as root (use sudo)" >&2
+    exit 1
+fi
+
+UNIT_DIR="/etc/systemd/system"
+WEB_UNIT="$UNIT_DIR/$WEB_SERVICE.service"
+if [ ! -f "$WEB_UNIT" ]; then
+    echo "Web service unit not found: $WEB_UNIT" >&2
+    exit 1
+fi
+
+# Dùng lại đúng các biến môi trường của gunicorn (DJANGO_ENVIRONMENT, SECRET_KEY...)
+ENVIRONMENT_LINES=$(grep '^Environment=' "$WEB_UNIT" || true)
+MANAGE="$PROJECT_DIR/venv/bin/python $PROJECT_DIR/manage.py"
+
+write_worker() {
+    local name=$1
+    local description=$2
+    local command=$3
+
+    tee "$UNIT_DIR/$WEB_SERVICE-$name.service" > /dev/null << EOF
+[Unit]
+Description=$description ($WEB_SERVICE)
+After=network.target $WEB_SERVICE.service
+PartOf=$WEB_SERVICE.service
+
+[Service]
+User=$USER
+Group=$USER
+WorkingDirectory=$PROJECT_DIR
+$ENVIRONMENT_LINES
+ExecStart=$MANAGE $command
+Restart=always
+RestartSec=5
+
+[Install]
+WantedBy=multi-user.target
+EOF
+}
+
+write_worker jobs "NOV-RECO background jobs" "run_background_jobs"
+write_worker email "NOV-RECO notification email outbox" "send_outbox_emails --loop"
+write_worker sla "NOV-RECO absence approval SLA" "process_approval_sla --loop"
+
+tee "$UNIT_DIR/$WEB_SERVICE-maintenance.service" > /dev/null << EOF
+[Unit]
+Description=NOV-RECO nightly cleanup ($WEB_SERVICE)
+
+[Service]
+Type=oneshot
+User=$USER
+Group=$USER
+WorkingDirectory=$PROJECT_DIR
+$ENVIRONMENT_LINES
+ExecStart=$MANAGE gc_media_blobs
+ExecStart=$MANAGE cleanup_checkin_exports
+ExecStart=$MANAGE prune_notifications --policy expired
+EOF
+
+tee "$UNIT_DIR/$WEB_SERVICE-maintenance.timer" > /dev/null << EOF
+[Unit]
+Description=NOV-RECO nightly cleanup ($WEB_SERVICE)
+
+[Timer]
+OnCalendar=*-*-* 03:00:00
+Persistent=true
+
+[Install]
+WantedBy=timers.target
+EOF
+
+systemctl daemon-reload
+for name in jobs email sla; do
+    systemctl enable "$WEB_SERVICE-$name"
+    systemctl restart "$WEB_SERVICE-$name"
+done
+systemctl enable --now "$WEB_SERVICE-maintenance.timer"
+
+echo "Workers installed: $WEB_SERVICE-{jobs,email,sla}.service, $WEB_SERVICE-maintenance.timer"
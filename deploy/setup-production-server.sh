@@ -117,6 +117,8 @@ print_status "Starting services..."
 systemctl daemon-reload
 systemctl enable checkin-taylaibui
 systemctl start checkin-taylaibui
+# Worker nền (background jobs, email outbox, SLA) và dọn dẹp hằng đêm
+bash $PROJECT_DIR/deploy/install-workers.sh $PROJECT_DIR $USER checkin-taylaibui
 systemctl restart nginx
 
 print_success "🎉 NOV-RECO deployment completed!"
@@ -29,10 +29,41 @@ class NotificationManager {
         // Load notifications
         this.loadNotifications();
         
-        // Auto refresh every 30 seconds
-        setInterval(() => {
+        // Nhận thông báo qua SSE, quay về poll 30 giây khi server không hỗ trợ
+        this.connectStream();
+    }
+    
+    connectStream() {
+        if (!window.EventSource) {
+            this.startPolling(30000);
+            return;
+        }
+        
+        // Broker trong tiến trình chỉ đẩy sự kiện của chính worker đang giữ
+        // stream, nên vẫn poll chậm để nhận thông báo tạo ở tiến trình khác
+        this.startPolling(60000);
+        this.stream = new EventSource('/notifications/api/stream/');
+        this.stream.addEventListener('unread_count', (e) => {
+            this.updateBadge(JSON.parse(e.data).unread_count);
+        });
+        this.stream.addEventListener('notification', () => {
+            this.loadNotifications();
+        });
+        this.stream.onerror = () => {
+            // EventSource tự kết nối lại, trừ khi server trả lỗi (vd. chạy WSGI)
+            if (this.stream.readyState === EventSource.CLOSED) {
+                this.startPolling(30000);
+            }
+        };
+    }
+    
+    startPolling(interval) {
+        if (this.pollTimer && this.pollInterval <= interval) return;
+        clearInterval(this.pollTimer);
+        this.pollInterval = interval;
+        this.pollTimer = setInterval(() => {
             this.loadNotifications();
-        }, 30000);
+        }, interval);
     }
     
     toggleDropdown() {